@@ -8,11 +8,11 @@ import sys
 import atexit
 import argparse
 from pathlib import Path
-from flatland.xuml.xuml_classdiagram import XumlClassDiagram
-from flatland.xuml.xuml_statemachine_diagram import XumlStateMachineDiagram
-from flatland.configuration.config import Config
+from flatland.flatland_exceptions import FlatlandException
 from flatland import version
-from flatland.masl.maslout import MaslOut
+
+# Anything that needs the database, cairo or the parsers is imported only when an option calls for it
+# so that quick requests like printing the version don't pay to load them
 
 _logpath = Path("flatland.log")
 
@@ -36,7 +36,29 @@ def parse(cl_input):
                         help='Flatland layout file defining all layout information with light\
                          references to model file.')
     parser.add_argument('-d', '--diagram', action='store', default='diagram.pdf',
-                        help='Name of file to generate, .pdf extension automatically added')
+                        help='Name of file to generate. Its extension selects the format: .pdf (default), .svg or .png')
+    parser.add_argument('-AF', '--also_formats', action='store', nargs='+', default=[], choices=['pdf', 'svg', 'png'],
+                        help='Also write the diagram in each of these formats, named like the diagram file,\
+                         without laying it out again')
+    parser.add_argument('-DPI', '--dpi', action='store', type=float, default=96,
+                        help='Resolution of png output in pixels per inch')
+    parser.add_argument('-B', '--batch', action='store',
+                        help='Generate every diagram listed in this manifest file (model layout [diagram] per line)\
+                         or every same named model and .mls layout pair in this directory')
+    parser.add_argument('-O', '--output_dir', action='store', default='.',
+                        help='Directory where batch generated diagrams are written')
+    parser.add_argument('-W', '--watch', action='store_true',
+                        help='Keep running and generate the diagram again whenever the model or layout file is saved')
+    parser.add_argument('-I', '--incremental', action='store_true',
+                        help='Skip any diagram that was already generated from the same model, layout and styles')
+    parser.add_argument('-J', '--jobs', action='store', type=int, default=1,
+                        help='Number of processes used to generate batch diagrams')
+    parser.add_argument('-SV', '--serve', action='store_true',
+                        help='Run a local HTTP server that renders diagrams posted to /render, using --jobs workers')
+    parser.add_argument('-P', '--port', action='store', type=int, default=8765,
+                        help='Port for the render server')
+    parser.add_argument('-H', '--host', action='store', default='127.0.0.1',
+                        help='Address the render server listens on')
     parser.add_argument('-D', '--docs', action='store_true',
                         help='Copy the project documentation directory into the local directory')
     parser.add_argument('-CF', '--config', action='store_true',
@@ -60,6 +82,18 @@ def parse(cl_input):
                         help='Show the list of background color names')
     parser.add_argument('-MASL', '--masl', action='store_true',
                         help='Create file of MASL class and relationship definitions')
+    parser.add_argument('-TC', '--text_cache', action='store_true',
+                        help="Reuse text measurements saved in the user's flatland home and save any new ones")
+    parser.add_argument('-PC', '--parser_cache', action='store_true',
+                        help="Reuse grammars compiled on a previous run, saved in the user's flatland home")
+    parser.add_argument('-MEM', '--in_memory', action='store_true',
+                        help='Load the flatland database into memory instead of querying the installed file')
+    parser.add_argument('-S', '--sort_styles', action='store_true',
+                        help='Group line segments and text by style within each layer for smaller, faster output')
+    parser.add_argument('-BS', '--batch_strokes', action='store_true',
+                        help='Stroke all lines of the same style together, joining connected segments into polylines')
+    parser.add_argument('-FI', '--fit_images', action='store_true',
+                        help='Scale logos and other images down to fit their frame fields')
     parser.add_argument('-x', '--translate', action='store', default='masl.mod',
                         help='Name of file for MASL translation')
     return parser.parse_args(cl_input)
@@ -76,6 +110,10 @@ def main():
     # Parse the command line args
     args = parse(sys.argv[1:])
 
+    if args.in_memory:
+        from flatland.database.flatlanddb import FlatlandDB
+        FlatlandDB.In_memory = True
+
     if not args.log:
         # If no log file is requested, remove the log file before termination
         atexit.register(clean_up)
@@ -87,6 +125,7 @@ def main():
 
     if args.colors:
         # Just print the database colors and quit
+        from flatland.configuration.config import Config
         Config(rebuild_db=args.rebuild)  # Do any configuration tasks necessary before starting up the app
         already_configured = True  # Don't run it again
         from flatland.drawing_domain.styledb import StyleDB
@@ -141,36 +180,75 @@ def main():
 
     # Do any configuration tasks necessary before starting up the app
     # The database will be rebuilt if requested
-    if not already_configured:
+    # MASL translation doesn't use the database, so we skip it if that's all we are doing
+    masl_only = args.masl and not (args.layout or args.batch or args.rebuild)
+    if not already_configured and not masl_only:
+        from flatland.configuration.config import Config
         Config(rebuild_db=args.rebuild)
 
+    from flatland.drawing_domain.text_metrics import TextMetrics
+    from flatland.input.parser_cache import ParserCache
+    ParserCache.Persist = args.parser_cache
+    if args.sort_styles or args.batch_strokes or args.fit_images:
+        from flatland.drawing_domain.layer import Layer
+        Layer.Sort_styles = args.sort_styles
+        Layer.Batch_strokes = args.batch_strokes
+        Layer.Fit_images = args.fit_images
+    if args.also_formats or args.dpi != 96:
+        from flatland.drawing_domain.tablet import Tablet
+        Tablet.Also_formats = args.also_formats
+        Tablet.Dpi = args.dpi
+    if args.text_cache:
+        # Load any saved text measurements and save the updated cache when we are done
+        TextMetrics.load()
+        atexit.register(TextMetrics.save)
+
     if args.model and args.layout:  # Just making sure we have them both
         model_path = Path(args.model)
         layout_path = Path(args.layout)
         diagram_path = Path(args.diagram)
 
-        # Generate the xuml class diagram (we don't do anything with the returned variable yet)
-        mtype = model_path.suffix
-        if mtype == '.xmm' or mtype == '.xcm':
-            class_diagram = XumlClassDiagram(
-                xuml_model_path=model_path,
-                flatland_layout_path=layout_path,
-                diagram_file_path=diagram_path,
-                show_grid=args.grid,
-                nodes_only=args.nodes_only,
-                no_color=args.no_color,
-            )
-        elif mtype == '.xsm':
-            statemodel_diagram = XumlStateMachineDiagram(
-                xuml_model_path=model_path,
-                flatland_layout_path=layout_path,
-                diagram_file_path=diagram_path,
+        if args.watch:
+            from flatland.xuml.watch import watch
+            watch(model_path=model_path, layout_path=layout_path, diagram_path=diagram_path,
+                  show_grid=args.grid, nodes_only=args.nodes_only, no_color=args.no_color)
+            sys.exit(0)
+
+        # Generate the xuml class or state machine diagram (we don't do anything with the returned variable yet)
+        from flatland.xuml.render import render_diagram
+        try:
+            diagram = render_diagram(
+                model_path=model_path,
+                layout_path=layout_path,
+                diagram_path=diagram_path,
                 show_grid=args.grid,
                 nodes_only=args.nodes_only,
                 no_color=args.no_color,
+                incremental=args.incremental,
             )
+        except FlatlandException as e:
+            sys.exit(e)
+
+    if args.batch:
+        import time
+        from flatland.xuml.batch import read_manifest, render_batch, report
+        start = time.perf_counter()
+        try:
+            jobs = read_manifest(manifest=Path(args.batch), output_dir=Path(args.output_dir))
+        except FlatlandException as e:
+            sys.exit(e)
+        results = render_batch(jobs, show_grid=args.grid, nodes_only=args.nodes_only, no_color=args.no_color,
+                               incremental=args.incremental, workers=args.jobs, text_cache=args.text_cache)
+        print(report(results, total_seconds=time.perf_counter() - start))
+        if any(r.error for r in results):
+            sys.exit(1)
+
+    if args.serve:
+        from flatland.xuml.serve import serve
+        serve(host=args.host, port=args.port, workers=args.jobs, text_cache=args.text_cache)
 
     if args.model and args.masl:
+        from flatland.masl.maslout import MaslOut
         model_path = Path(args.model)
         masl_path = Path(args.translate)
         success = MaslOut(
@@ -178,6 +256,8 @@ def main():
             masl_file_path=masl_path,
         )
 
+    logger.info(f"Text metrics cache: {TextMetrics.stats()}")
+    logger.info(f"Parsers compiled: {ParserCache.Compiled}, loaded: {ParserCache.Loaded}, reused: {ParserCache.Reused}")
     logger.info("No problemo")  # We didn't die on an exception, basically
 
 
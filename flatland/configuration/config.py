@@ -1,27 +1,32 @@
 """
 config.py - Configures flatland and rebuilds the database
 """
-import yaml
+import json
+import hashlib
 import logging
 import sys
 from pathlib import Path
-import inspect
 from flatland.database.flatlanddb import FlatlandDB
-from flatland.sheet_subsystem.titleblock_placement import TitleBlockPlacement
+from flatland.database.snapshot import Snapshot
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from typing import Dict
 from collections import namedtuple
 
-TableSpec = namedtuple("TableSpec", "name header folder")
+TableSpec = namedtuple("TableSpec", "name header relvar")
 
 
 class Config:
     """
     Here we overlay user configuration on top of built in system configuration.
+
+    The configuration files are hashed on every startup. When they change, only the rows of the configurable
+    tables that differ are updated in the database, so a user color tweak doesn't require a rebuild.
     """
     logger = logging.getLogger(__name__)
     # Structure of each Flatland DB table holding configurable system/user data
     tables = [
-        TableSpec(name="color", header=["Name", "R", "G", "B", "Canvas"], folder="drawing"),
+        TableSpec(name="color", header=["Name", "R", "G", "B", "Canvas"], relvar="Color"),
     ]
 
     # Where we look for system configuration data
@@ -30,7 +35,7 @@ class Config:
     # Where we look for the user supplied configuration data, if any
     user_config_home = Path.home() / '.flatland' / 'config'
 
-    # Population home
+    # Population home, the initial population of every table when the database is rebuilt
     pop_home = Path(__file__).parent.parent / "database" / "population"
 
     def __init__(self, rebuild_db: bool = True):
@@ -39,78 +44,176 @@ class Config:
 
         :param rebuild_db: True if the database needs to be rebuilt
         """
-        if rebuild_db:
-            # Before rebuilding, generate any new instance population files
-            update_populations()
-
         # Initialize and possible reload the flatland database
+        # A rebuild also computes the title block placements
         FlatlandDB(rebuild=rebuild_db)
 
-        # Regen title blocks and insert into the flatland database
-        # TODO: Make this part of the population update
-        if rebuild_db:
-            TitleBlockPlacement()
+        # Apply any configuration changes to the database
+        if update_config_tables():
+            Snapshot.discard()  # It was compiled before these changes
 
+        # Compile a fresh snapshot for fast startup if the database was rebuilt or changed since the last one.
+        # A database in memory is never saved as a snapshot, so there each diagram loads only what it needs.
+        if not Snapshot.Loaded and FlatlandDB.Engine.url.database:
+            build_snapshot()
 
-def update_populations():
-    """
-    Generate database population _instances.py files for each table containing any user configurable attributes
-    These need to be generated before the database is rebuilt since it will use these files to load the db
+
+def config_files(table: TableSpec) -> tuple:
+    """The system and user configuration files of a table"""
+    return Config.system_config_home / f'{table.name}.yaml', Config.user_config_home / f'{table.name}.yaml'
+
+
+def config_digest(table: TableSpec) -> str:
     """
-    Config.logger.info("Updating user configurable instance populations...")
+    Hash the system and user configuration files of a table without parsing them
 
-    for table in Config.tables:
-        # Load system configuration values first
-        system_config_file = Config.system_config_home / f'{table.name}.yaml'
-        try:
-            with open(system_config_file, 'r') as scf:
-                system_config_dict = yaml.load(scf, Loader=yaml.FullLoader)
-        except FileNotFoundError as e:
-            Config.logger.error(f"System config file: [{system_config_file}] not found")
-            sys.exit(1)
-
-        # Now overlay any user configuration
-        user_config_file = Config.user_config_home / f'{table.name}.yaml'
+    :param table: The configuration table spec
+    :return: A hex digest that changes whenever either file does
+    """
+    h = hashlib.sha256()
+    for config_file in config_files(table):
         try:
-            with open(user_config_file, 'r') as ucf:
-                user_config_dict = yaml.load(ucf, Loader=yaml.FullLoader)
-        except FileNotFoundError as e:
-            Config.logger.info(f"No user config file found. [{user_config_file}]  Using system config only.")
-            user_config_dict = None
-        gen_pop_file(
-            tuples_dict=system_config_dict | ({} if not user_config_dict else user_config_dict),
-            table=table,
-        )
-
-
-def gen_pop_file(tuples_dict: Dict[str, str], table: TableSpec):
+            h.update(config_file.read_bytes())
+        except FileNotFoundError:
+            pass
+        h.update(b'\0')  # So moving content from one file to the other still changes the digest
+    return h.hexdigest()
+
+
+def digest_file() -> Path:
+    """Records the configuration digests last applied to the database file, kept in the user's cache"""
+    return Snapshot.cache_file(FlatlandDB.File, '.config')
+
+
+def applied_digests() -> Dict[str, str]:
+    """The digest of each table's configuration when it was last applied to the database file"""
+    try:
+        return json.loads(digest_file().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def update_config_tables() -> bool:
+    """
+    Bring each configurable table up to date with the system and user configuration files. Usually the files
+    haven't changed since they were last applied, and all it costs to find that out is hashing them.
+
+    :return: True if the database was changed
     """
-    Generate a population file to be loaded by the database
+    digests = {t.name: config_digest(t) for t in Config.tables}
+    applied = {} if FlatlandDB.Rebuilt else applied_digests()  # Rebuilt from the population modules
+    stale = [t for t in Config.tables if applied.get(t.name) != digests[t.name]]
+    if not stale:
+        return False
+    changed = False
+    with FlatlandDB.Connection.begin():
+        for table in stale:
+            changed |= apply_config(table)
+    if not FlatlandDB.Engine.url.database:
+        # The database is in memory, so the file is unchanged and must be updated again next time
+        return changed
+    try:
+        digest_file().parent.mkdir(parents=True, exist_ok=True)
+        digest_file().write_text(json.dumps(digests))
+    except OSError as e:
+        Config.logger.warning(f"Could not record configuration digest: [{digest_file()}] ({e})")
+    return changed
+
+
+def load_config(table: TableSpec) -> Dict[str, dict]:
+    """
+    Load the system configuration of a table and overlay any user configuration
 
-    :param tuples_dict: A dictionary of named tuples where each tuple can be inserted into a table
-    :param table: The configuration table spec so we know how to format the population file
+    :param table: The configuration table spec
+    :return: Each row by its key attribute value
+    """
+    import yaml  # Only needed when the configuration changes
+    system_config_file, user_config_file = config_files(table)
+    try:
+        with open(system_config_file, 'r') as scf:
+            system_config_dict = yaml.load(scf, Loader=yaml.FullLoader)
+    except FileNotFoundError as e:
+        Config.logger.error(f"System config file: [{system_config_file}] not found")
+        sys.exit(1)
+
+    # Now overlay any user configuration
+    try:
+        with open(user_config_file, 'r') as ucf:
+            user_config_dict = yaml.load(ucf, Loader=yaml.FullLoader)
+    except FileNotFoundError as e:
+        Config.logger.info(f"No user config file found. [{user_config_file}]  Using system config only.")
+        user_config_dict = None
+    tuples_dict = system_config_dict | ({} if not user_config_dict else user_config_dict)
+    key_attr_name = table.header[0]
+    return {k: {key_attr_name: k, **{a: v[a] for a in table.header[1:]}} for k, v in tuples_dict.items()}
+
+
+def apply_config(table: TableSpec) -> bool:
+    """
+    Insert, update and delete only those rows of a configurable table that differ from its configuration
+
+    :param table: The configuration table spec
+    :return: True if any rows changed
+    """
+    relvar = FlatlandDB.MetaData.tables[table.relvar]
+    key = relvar.c[table.header[0]]
+    wanted = load_config(table)
+    current = {r[key.name]: {a: r[a] for a in table.header}
+               for r in FlatlandDB.Connection.execute(select([relvar.c[a] for a in table.header])).fetchall()}
+    removed = [k for k in current if k not in wanted]
+    added = [row for k, row in wanted.items() if k not in current]
+    updated = [row for k, row in wanted.items() if k in current and current[k] != row]
+    Config.logger.info(f"Configuration of {table.relvar}: {len(added)} added, {len(updated)} updated, "
+                       f"{len(removed)} removed")
+    try:
+        if removed:
+            FlatlandDB.Connection.execute(relvar.delete().where(key.in_(removed)))
+        if added:
+            FlatlandDB.Connection.execute(relvar.insert(), added)
+        for row in updated:
+            FlatlandDB.Connection.execute(relvar.update().where(key == row[key.name]).values(row))
+    except IntegrityError:
+        Config.logger.error(f"Configuration removes {table.relvar} still in use: {', '.join(removed)}")
+        sys.exit(1)
+    return bool(removed or added or updated)
+
+
+def build_snapshot():
     """
-    pop_fname = f'{table.name}_instances.py'
-    # The top and bottom text in the generated population file
-    top = inspect.cleandoc(f'''"""
-    {pop_fname} (generated)
+    Load everything that would otherwise be loaded from the database on every run and save it all as a
+    snapshot of the current database. This includes the styles, every Presentation, every Diagram Type for each
+    of its Notations and all Symbols. A database held in memory is never saved as a snapshot.
     """
-    population = [
-    ''') + '\n'
-    bottom = ']'
-
-    pop_path = Config.pop_home / table.folder / pop_fname
-
-    with open(pop_path, 'w') as pop:
-        pop.write(top)
-        key_attr_name = table.header[0]
-        for tuple_key, tuple_data in tuples_dict.items():
-            line = f'    {{"{key_attr_name}": "{tuple_key}", '
-            for attr_name in table.header[1:]:
-                line += f'"{attr_name}": {tuple_data[attr_name]}, '
-            line = line.rstrip(", ") + '},\n'
-            pop.write(line)
-        pop.write(bottom)
+    # These load the drawing and decoration subsystems, which we don't want to import just to start up
+    from flatland.drawing_domain.styledb import StyleDB
+    from flatland.drawing_domain.presentation import Presentation
+    from flatland.node_subsystem.diagram_type import DiagramType
+    from flatland.decoration_subsystem.symbol import Symbol
+    Config.logger.info("Compiling database snapshot...")
+    StyleDB()
+    content = {'Schema': FlatlandDB.MetaData, 'StyleDB': StyleDB.compiled(),
+               'Presentation': {}, 'DiagramType': {}, 'Symbol': {}}
+
+    pres_t = FlatlandDB.MetaData.tables['Presentation']
+    for r in FlatlandDB.Connection.execute(select([pres_t])).fetchall():
+        p = Presentation(name=r.Name, drawing_type=r['Drawing type'])
+        content['Presentation'][(r.Name, r['Drawing type'])] = p.compiled()
+
+    dnotation_t = FlatlandDB.MetaData.tables['Diagram Notation']
+    diagram_notations = [(r['Diagram type'], r.Notation)
+                         for r in FlatlandDB.Connection.execute(select([dnotation_t])).fetchall()]
+    for dtype_name, notation in diagram_notations:
+        dtype = DiagramType(name=dtype_name, notation=notation)
+        content['DiagramType'][(dtype_name, notation)] = (dtype.NodeTypes, dtype.ConnectorTypes)
+        Symbol(diagram_type=dtype_name, notation=notation)
+    content['Symbol'] = Symbol.loaded
+
+    if not FlatlandDB.Engine.url.database:
+        # Any configuration changes were applied only in memory, so the content no longer matches the database
+        # file the snapshot would be stamped with
+        Config.logger.info("Database is in memory, not saving the snapshot")
+        return
+    Snapshot.save(FlatlandDB.File, content)
 
 
 if __name__ == '__main__':
@@ -74,7 +74,7 @@ class RenderedSymbol:
 
     def draw_arrow(self, layer: 'Layer', arrow_symbol: str, location: Position) -> Position:
         """Draw an arrow symbol at the indicated location pointing toward our face"""
-        # Get the numpy polygon matrix with the rotation pointing toward the Node face
+        # Get the polygon with the rotation pointing toward the Node face
         orientation = self.Stem.Node_face  # Will not work for a tertiary stem!
         if self.End == 'vine':
             # reverse orientation since the vine symbol points away from the node face
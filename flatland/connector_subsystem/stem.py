@@ -2,9 +2,8 @@
 stem.py
 """
 
-import sys
 import logging
-from flatland.flatland_exceptions import InvalidNameSide
+from flatland.flatland_exceptions import InvalidNameSide, StemNameOutOfBounds
 from flatland.connector_subsystem.stem_type import StemType
 from flatland.datatypes.geometry_types import Position, HorizAlign
 from flatland.connector_subsystem.rendered_symbol import RenderedSymbol
@@ -117,9 +116,7 @@ class Stem:
                     name_x > diagram.Origin.x + diagram.Size.width or \
                     name_y < diagram.Origin.y or \
                     name_y > diagram.Origin.y + diagram.Size.height:
-                self.logger.error(f"Stem text {self.Name.text.text} out of bounds on connector [{self.Connector.Name.text}]"
-                                  f"\n\tConsider wrapping name across more lines of text or move it to the other side of the stem")
-                sys.exit(1)
+                raise StemNameOutOfBounds(text=self.Name.text.text, connector=self.Connector.Name.text)
 
             layer.add_text_block(asset=self.Stem_type.Name + ' name', lower_left=Position(name_x, name_y),
                                   text=self.Name.text.text, align=align)
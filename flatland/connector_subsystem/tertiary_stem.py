@@ -3,7 +3,7 @@ tertiary_stem.py
 """
 
 import logging
-import sys
+from flatland.flatland_exceptions import TernaryStemMissesConnector
 from flatland.connector_subsystem.anchored_stem import AnchoredStem
 from flatland.connector_subsystem.stem_type import StemType
 from flatland.datatypes.connection_types import HorizontalFace, NodeFace, AnchorPosition, StemName
@@ -51,8 +51,7 @@ class TertiaryStem(AnchoredStem):
             axis = nearest_parallel_segment(psegs=parallel_segs, point=self.Root_end, ascending=asc)
         except ValueError:
             cname = 'Unnamed' if not self.Connector else self.Connector.Name.text
-            self.logger.error(f"Ternary stem does not intersect binary connector [{cname}]")
-            sys.exit(1)
+            raise TernaryStemMissesConnector(cname) from None
 
         self.Vine_end = Position(self.Root_end.x, axis) if face in HorizontalFace else Position(axis, self.Root_end.y)
 
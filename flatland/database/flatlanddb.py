@@ -1,14 +1,18 @@
 """
 flatlanddb.py - Loads the existing flatland database
 """
-import sys
+import sqlite3
 import logging
+import importlib
 import logging.config
 from pathlib import Path
+from typing import Optional
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
 from sqlite3 import Connection as SQLite3Connection
+from flatland.database.snapshot import Snapshot
 
 
 @event.listens_for(Engine, "connect")
@@ -28,7 +32,7 @@ def Create_relvars():
     """
     from flatland.database import relvars
     FlatlandDB.Relvars = relvars.define(FlatlandDB)
-    FlatlandDB.MetaData.create_all(FlatlandDB.Engine)
+    FlatlandDB.MetaData.create_all(FlatlandDB.Connection)
 
 
 def Populate():
@@ -36,25 +40,71 @@ def Populate():
     Assign a value to each Flatland relvar (table). A value consists of a set of relations.
     In Sqlalchemy terms, the tables are all updated with initial row data.
     """
-    # We need to append each population subirectory to our module search path
-    # because when we iterate through the file names in our relvar dictionary
-    # we don't know which file is in which subdirectory. So we can't just
-    # refer to each population module by the same path
-    here = Path(__file__).parent / "population"  # Adjacent population directory
-    pop_dirs = [  # Subdirectories organizing all population modules
-        here / "connector", here / "decorator", here / "drawing", here / "node", here / "sheet"
-    ]
-    # Convert each Path object to a string and tack it on the end of our module search path
-    sys.path.extend([str(p) for p in pop_dirs])
+    # The population modules are organized into subdirectories of the adjacent population package,
+    # but the relvar dictionary only gives us each file name, so we find the subdirectory of each one
+    here = Path(__file__).parent / "population"
+    modules = {p.stem: '.'.join([__package__, 'population', p.parent.name, p.stem])
+               for p in here.glob('*/*_instances.py')}  # Each population filename ends with '_instances.py'
 
     # Iterate through the relvar dictionary to get each population and the table it goes into
     for instances, relvar in FlatlandDB.Relvars.items():
         # Set i to the initial population of row values (set of relation values)
-        i = __import__(instances + '_instances')  # Each population filename ends with '_instances.py'
+        i = importlib.import_module(modules[instances + '_instances'])
         if i.population:  # A computed relations may start with an empty population, so skip the insert if empty
             FlatlandDB.Connection.execute(relvar.insert(), i.population)  # Sqlalchemy populates the table schema
 
 
+def Build():
+    """
+    Create and populate every relvar and compute the derived Symbol lengths and Box Placements
+    in a single transaction.
+    Foreign keys are checked once, when it commits, so the populations can be inserted in any order.
+    """
+    connection = FlatlandDB.Connection
+    # Nobody else uses the database until it is built, and a build that fails is thrown away,
+    # so there is no need for a rollback journal on disk or to wait for each write to reach the disk
+    journal_mode = connection.execute("PRAGMA journal_mode").scalar()
+    synchronous = connection.execute("PRAGMA synchronous").scalar()
+    connection.execute("PRAGMA journal_mode=MEMORY")
+    connection.execute("PRAGMA synchronous=OFF")
+    try:
+        with connection.begin():
+            # pysqlite doesn't begin a transaction before DDL statements, so we begin it ourselves
+            connection.execute("BEGIN")
+            connection.execute("PRAGMA defer_foreign_keys=ON")
+            Create_relvars()
+            Populate()
+            # Derived attributes
+            from flatland.decoration_subsystem.symbol import Symbol
+            from flatland.sheet_subsystem.titleblock_placement import TitleBlockPlacement
+            Symbol.update_symbol_lengths()
+            TitleBlockPlacement()
+    finally:
+        # Anything written after the build, such as configuration changes, is protected as usual
+        connection.execute(f"PRAGMA journal_mode={journal_mode}")
+        connection.execute(f"PRAGMA synchronous={synchronous}")
+
+
+def Memory_engine(db_file: Optional[Path]) -> Engine:
+    """
+    Create an engine for a database held entirely in memory. The database file is only opened, read only,
+    long enough to copy it with the SQLite backup API, so every query afterward runs against RAM and
+    concurrent processes never contend for the file.
+
+    :param db_file: Database file to copy, or None to start with an empty database
+    :return: The engine, whose connections all share the same in memory database
+    """
+    memory = sqlite3.connect(':memory:', check_same_thread=False)
+    if db_file:
+        source = sqlite3.connect(f"{db_file.as_uri()}?mode=ro", uri=True)
+        try:
+            source.backup(memory)
+        finally:
+            source.close()
+    # A new connection to sqlite:// would open a different, empty database, so always hand out this one
+    return create_engine('sqlite://', creator=lambda: memory, poolclass=StaticPool)
+
+
 class FlatlandDB:
     """
     Flatland database containing all predefined Flatland data. We want to avoid having any predefined
@@ -69,6 +119,10 @@ class FlatlandDB:
         - Connection -- Sqlalchemy database connection
         - Engine -- Sqlalchemy database engine
         - Relvars -- Dictionary of all relvar names and values (table names and row populations)
+        - In_memory -- Load the database into memory rather than querying the file. If there is no file, the
+          database is built in memory from the population modules instead. A requested rebuild still
+          writes the file. Also set from the command line.
+        - Rebuilt -- True if the database was just built from the population modules
     """
     File = Path(__file__).parent / "flatland.db"
     LogFile = Path(__file__).parent / "db.log"
@@ -76,15 +130,20 @@ class FlatlandDB:
     Connection = None
     Engine = None
     Relvars = None
+    In_memory = False
+    Rebuilt = False
 
-    def __init__(self, rebuild: bool):
+    def __init__(self, rebuild: bool, in_memory: Optional[bool] = None):
         """
         Create the sqlite3 database using Sqlalchemy
 
         :param rebuild: During development this will usually be true.  For deployment it should be false.
+        :param in_memory: Load the database into memory, by default as set in In_memory
         """
         self.logger = logging.getLogger(__name__)
         self.rebuild = rebuild
+        # A rebuild is written to the file, but otherwise we never write to it in memory mode
+        self.in_memory = (FlatlandDB.In_memory if in_memory is None else in_memory) and not rebuild
 
         if self.rebuild:  # DB rebuild requested
             self.logger.warning("Database rebuild requested, rebuilding flatland database")
@@ -97,24 +156,45 @@ class FlatlandDB:
             else:  # We're going to have to rebuild it anyway
                 self.rebuild = True
                 self.logger.info("No db file, rebuilding flatland database")
+        FlatlandDB.Rebuilt = self.rebuild
 
         db_path_str = str( FlatlandDB.File )
 
-        # Configure sql logger
-        db_file_handler = logging.FileHandler(FlatlandDB.LogFile, 'w')
-        # db_file_handler.setLevel(logging.DEBUG)
-        dblogger = logging.getLogger('sqlalchemy.engine')
-        dblogger.setLevel(logging.DEBUG)
-        dblogger.addHandler(db_file_handler)
-        dblogger.propagate = False  # To keep sql events from bleeding into the flatland log
-
-        FlatlandDB.Engine = create_engine(f'sqlite:///{db_path_str}', echo=False)
+        # Configure sql logger, but don't have every process in memory mode rewrite the same log file
+        if not self.in_memory:
+            try:
+                db_file_handler = logging.FileHandler(FlatlandDB.LogFile, 'w')
+            except OSError as e:
+                self.logger.warning(f"Cannot write database log: [{FlatlandDB.LogFile}] ({e})")
+            else:
+                # db_file_handler.setLevel(logging.DEBUG)
+                dblogger = logging.getLogger('sqlalchemy.engine')
+                dblogger.setLevel(logging.DEBUG)
+                dblogger.addHandler(db_file_handler)
+                dblogger.propagate = False  # To keep sql events from bleeding into the flatland log
+
+        if self.in_memory:
+            self.logger.info("Loading flatland database into memory")
+            FlatlandDB.Engine = Memory_engine(db_file=None if self.rebuild else FlatlandDB.File)
+        else:
+            FlatlandDB.Engine = create_engine(f'sqlite:///{db_path_str}', echo=False)
         FlatlandDB.Connection = FlatlandDB.Engine.connect()
         FlatlandDB.MetaData = MetaData(FlatlandDB.Engine)
         if self.rebuild:
-            self.logger.info(f"Re-creating database file at: {db_path_str}")
-            Create_relvars()
-            Populate()
+            self.logger.info(f"Re-creating database {'in memory' if self.in_memory else f'file at: {db_path_str}'}")
+            try:
+                Build()
+            except BaseException:
+                # Don't leave an incomplete database file to be loaded next time
+                if not self.in_memory:
+                    FlatlandDB.Connection.close()
+                    FlatlandDB.Engine.dispose()
+                    FlatlandDB.File.unlink(missing_ok=True)
+                raise
+        elif Snapshot.load(FlatlandDB.File):
+            # The snapshot compiled from this database already has all the relvar/table schemas
+            FlatlandDB.MetaData = Snapshot.lookup('Schema')
+            FlatlandDB.MetaData.bind = FlatlandDB.Engine
         else:
             # Just interrogate the existing database to get all the relvar/table names
             FlatlandDB.MetaData.reflect()
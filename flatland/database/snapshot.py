@@ -0,0 +1,131 @@
+"""
+snapshot.py – Compiled snapshot of the flatland database lookups loaded on every run
+"""
+import pickle
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional, Any, Dict
+from sqlalchemy import __version__ as sqlalchemy_version
+from flatland import version
+
+
+class Snapshot:
+    """
+    Singleton class holding everything we otherwise load from the flatland database each time the app starts:
+    the table schema (normally obtained by reflection), the common styles, each Presentation, each Diagram Type
+    with its Node, Connector and Stem Types for each Notation, and the Symbols.
+
+    The snapshot is compiled whenever the database is rebuilt and saved in a single pickle file in the user's
+    flatland cache, so it can be loaded in one read and flatland never writes into the directory it is installed
+    in. It is stamped with the size and modification time of the database
+    file it was compiled from and the flatland and SQLAlchemy versions. If the stamp doesn't match, or the
+    file can't be read, the snapshot is ignored and everything is loaded from the database as usual.
+
+        Attributes
+
+        - Directory -- Where the snapshot of each database file is saved
+        - Format -- Incremented whenever the content of the snapshot changes shape
+        - Content -- Lookup tables by section name, populated only when a current snapshot is loaded
+        - Loaded -- True if a current snapshot was loaded at startup
+    """
+    Directory = Path.home() / '.flatland' / 'cache' / 'database'
+    Format = 3
+    Content = {}
+    Loaded = False
+
+    @staticmethod
+    def cache_file(db_file: Path, suffix: str) -> Path:
+        """
+        A file in the user's cache belonging to a database file. Each installed database gets its own.
+
+        :param db_file: The flatland database file
+        :param suffix: Distinguishes the kinds of file kept for each database
+        :return: Path to the cache file
+        """
+        key = hashlib.sha256(str(db_file.resolve()).encode('utf-8')).hexdigest()[:16]
+        return Snapshot.Directory / f'{db_file.stem}-{key}{suffix}'
+
+    @staticmethod
+    def stamp(db_file: Path) -> Optional[tuple]:
+        """Identifies the database content and the software that compiled it, or None if there is no database"""
+        try:
+            s = db_file.stat()
+        except OSError:
+            return None
+        return Snapshot.Format, version, sqlalchemy_version, s.st_size, s.st_mtime_ns
+
+    @staticmethod
+    def load(db_file: Path) -> bool:
+        """
+        Load the snapshot if it was compiled from the current database
+
+        :param db_file: The flatland database file
+        :return: True if the snapshot can be used
+        """
+        logger = logging.getLogger(__name__)
+        path = Snapshot.cache_file(db_file, '.snapshot')
+        try:
+            with open(path, 'rb') as f:
+                stamp, content = pickle.load(f)
+        except FileNotFoundError:
+            logger.info(f"No database snapshot at: [{path}]")
+            return False
+        except (OSError, EOFError, ValueError, AttributeError, ImportError, pickle.UnpicklingError) as e:
+            logger.warning(f"Ignoring unreadable database snapshot: [{path}] ({e})")
+            return False
+        if stamp != Snapshot.stamp(db_file):
+            logger.info("Database snapshot is stale, loading from the database")
+            return False
+        Snapshot.Content = content
+        Snapshot.Loaded = True
+        logger.info("Using database snapshot")
+        return True
+
+    @staticmethod
+    def discard():
+        """Stop using a loaded snapshot because the database has changed since it was compiled"""
+        Snapshot.Content = {}
+        Snapshot.Loaded = False
+
+    @staticmethod
+    def lookup(section: str, key: Any = None) -> Optional[Any]:
+        """
+        Look up some compiled data in the loaded snapshot
+
+        :param section: Usually the name of the class that would otherwise load the data
+        :param key: Identifies an entry in the section, or None for the whole section
+        :return: The entry or None if it must be loaded from the database
+        """
+        if not Snapshot.Loaded:
+            return None
+        entries = Snapshot.Content.get(section)
+        return entries if key is None or entries is None else entries.get(key)
+
+    @staticmethod
+    def save(db_file: Path, content: Dict[str, Any]):
+        """
+        Save a newly compiled snapshot of the current database. A failure here just means that the
+        next startup loads from the database, so we only warn about it.
+
+        :param db_file: The flatland database file the content was loaded from
+        :param content: Lookup tables by section name
+        """
+        logger = logging.getLogger(__name__)
+        path = Snapshot.cache_file(db_file, '.snapshot')
+        temp_path = None
+        try:
+            Snapshot.Directory.mkdir(parents=True, exist_ok=True)
+            # Several processes may compile a snapshot at once, so each writes its own temporary file
+            with tempfile.NamedTemporaryFile(dir=Snapshot.Directory, prefix=path.stem, suffix='.tmp',
+                                             delete=False) as f:
+                temp_path = Path(f.name)
+                pickle.dump((Snapshot.stamp(db_file), content), f, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+        except (OSError, pickle.PicklingError) as e:
+            if temp_path:
+                temp_path.unlink(missing_ok=True)
+            logger.warning(f"Could not save database snapshot: [{path}] ({e})")
+            return
+        logger.info(f"Saved database snapshot: [{path}]")
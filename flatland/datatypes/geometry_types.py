@@ -28,6 +28,7 @@ class HorizAlign(Enum):
 
 Rectangle = namedtuple('Rectangle', 'line_style lower_left, size')
 Position = namedtuple('Position', 'x y')
+Points = namedtuple('Points', 'x y')  # Many positions held as an x and a y coordinate array
 Line_Segment = namedtuple('Line_Segment', 'from_position to_position')
 Rect_Size = namedtuple('Rect_Size', 'height width')
 Alignment = namedtuple('Alignment', 'vertical horizontal')
@@ -0,0 +1,84 @@
+"""
+rotation.py – Rotates symbol shapes defined in symbol coordinates, with 0,0 at the symbol's attachment point
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+from flatland.datatypes.geometry_types import Position
+from flatland.datatypes.connection_types import NodeFace
+
+# A 2x2 rotation matrix [[a, b], [c, d]] held as the tuple (a, b, c, d)
+Matrix = Tuple[float, float, float, float]
+
+# Each symbol shape is defined facing the bottom node face, so these are the quarter turns
+# that orient it toward each face. They are exact so that integer coordinates stay integers.
+face_rotation: Dict[NodeFace, Matrix] = {
+    NodeFace.BOTTOM: (1, 0, 0, 1),
+    NodeFace.LEFT: (0, 1, -1, 0),
+    NodeFace.TOP: (-1, 0, 0, -1),
+    NodeFace.RIGHT: (0, -1, 1, 0),
+}
+
+# With at least this many points, it's worth handing a batch to numpy, if it's installed
+numpy_threshold = 1000
+
+
+def rotation_matrix(degrees: float) -> Matrix:
+    """
+    Counterclockwise rotation by any angle. Quarter turns are exact.
+
+    :param degrees: Angle of rotation
+    :return: Rotation matrix
+    """
+    quarter, remainder = divmod(degrees, 90)
+    if not remainder:
+        return face_rotation[(NodeFace.BOTTOM, NodeFace.RIGHT, NodeFace.TOP, NodeFace.LEFT)[int(quarter) % 4]]
+    r = math.radians(degrees)
+    return math.cos(r), -math.sin(r), math.sin(r), math.cos(r)
+
+
+def rotate(points: Sequence[Position], matrix: Matrix) -> List[Position]:
+    """
+    Rotate each point about the origin
+
+    :param points: Shape vertices
+    :param matrix: Rotation matrix
+    :return: Rotated vertices
+    """
+    a, b, c, d = matrix
+    return [Position(a * p.x + b * p.y, c * p.x + d * p.y) for p in points]
+
+
+def rotate_all(shapes: Sequence[Sequence[Position]], matrix: Matrix) -> List[List[Position]]:
+    """
+    Rotate many shapes at once. A large batch is multiplied as a single numpy array
+    if numpy is available. Otherwise, or for a small batch, it's quicker to just do it in Python.
+
+    :param shapes: Vertices of each shape
+    :param matrix: Rotation matrix
+    :return: Rotated vertices of each shape in the same order
+    """
+    if sum(len(s) for s in shapes) < numpy_threshold:
+        return [rotate(s, matrix) for s in shapes]
+    try:
+        import numpy as np
+    except ImportError:
+        return [rotate(s, matrix) for s in shapes]
+    a, b, c, d = matrix
+    points = np.array([(p.x, p.y) for s in shapes for p in s]) @ np.array([[a, c], [b, d]])
+    rotated = []
+    start = 0
+    for s in shapes:
+        rotated.append([Position(x, y) for x, y in points[start:start + len(s)].tolist()])
+        start += len(s)
+    return rotated
+
+
+def face_rotations(shapes: Sequence[Sequence[Position]]) -> List[Dict[NodeFace, List[Position]]]:
+    """
+    Orient each shape, defined facing the bottom node face, toward every node face
+
+    :param shapes: Vertices of each shape
+    :return: For each shape, its vertices keyed by node face
+    """
+    by_face = {face: rotate_all(shapes, m) for face, m in face_rotation.items()}
+    return [{face: by_face[face][i] for face in face_rotation} for i in range(len(shapes))]
@@ -3,17 +3,18 @@ symbol.py - Symbols from the Decoration Subsystem, loaded from the database
 """
 from flatland.datatypes.geometry_types import Position
 from flatland.datatypes.connection_types import NodeFace
-from sqlalchemy import select, join, func, and_
+from sqlalchemy import select, join, func, and_, union
 from collections import namedtuple
 from flatland.database.flatlanddb import FlatlandDB as fdb
-from typing import Dict
-import numpy as np
+from flatland.database.snapshot import Snapshot
+from flatland.decoration_subsystem.rotation import face_rotations
+from typing import Dict, List, Tuple
 
 
 # Symbol subclasses in the Decoration Subsystem are implemented as named tuples
 # See Decoration Subsystem class model descriptions for full details on named tuple attributes summarized here
 
-SymbolSpec = namedtuple('Symbol', 'length type spec')
+SymbolSpec = namedtuple('SymbolSpec', 'length type spec')
 """
 Symbol
 
@@ -47,24 +48,19 @@ A sequence of these constitues the spec for a Compound Symbol
 ArrowSymbol = namedtuple('ArrowSymbol', 'half_base height fill rotations')
 CircleSymbol = namedtuple('CircleSymbol', 'radius solid')
 CrossSymbol = namedtuple('CrossSymbol', 'root_offset vine_offset width angle')
-# TODO: Add rotations for Cross symbol as well
-
-
-# TODO: For each Arrow Symbol we need to compute the points of a polygon facing upward
-# TODO: Then we apply a rotation matrix to get each of the other 90 deg orientations and store
-# TODO: Those indexed by node face
-# TODO: https://www.varsitytutors.com/hotmath/hotmath_help/topics/transformation-of-graphs-using-matrices-rotations
-
-r90 = np.array([ [0, 1], [-1, 0] ])
-r180 = np.array([ [-1, 0], [0, -1] ])
-r270 = np.array([ [0, -1], [1, 0] ])
 
 
 class Symbol:
     """
     All Symbols are loaded from the database and held in the instances dictionary keyed by Symbol.Name
+
+    Since a Symbol is defined by its name alone, symbols loaded for one diagram type and notation can
+    safely be shared with any other. The symbols of each combination are loaded with a single query and
+    kept by diagram type and notation, so they are only loaded once per process and switching to
+    another diagram type costs a dictionary lookup.
     """
     instances = {}
+    loaded: Dict[Tuple[str, str], Dict[str, SymbolSpec]] = {}  # Symbols by (diagram type, notation)
 
     def __init__(self, diagram_type: str, notation: str):
         """
@@ -73,8 +69,24 @@ class Symbol:
         :param diagram_type:
         :param notation:
         """
-        self.update_symbol_lengths()
+        key = (diagram_type, notation)
+        symbols = Symbol.loaded.get(key)
+        if symbols is None:
+            # Compiled into the database snapshot, otherwise loaded from the database
+            symbols = Snapshot.lookup('Symbol', key) or Symbol.load(diagram_type=diagram_type, notation=notation)
+            Symbol.loaded[key] = symbols
+        Symbol.instances.update(symbols)
 
+    @staticmethod
+    def load(diagram_type: str, notation: str) -> Dict[str, SymbolSpec]:
+        """
+        Load every symbol decorating a stem end on this diagram type for this notation, along with the simple
+        symbols stacked in any of its compound symbols, from a single query
+
+        :param diagram_type: Name of the diagram type
+        :param notation: Name of the notation
+        :return: Each symbol by name
+        """
         # Tables
         sdecs_t = fdb.MetaData.tables['Stem End Decoration']
         arrow_t = fdb.MetaData.tables['Arrow Symbol']
@@ -82,7 +94,6 @@ class Symbol:
         cross_t = fdb.MetaData.tables['Cross Symbol']
         symbol_t = fdb.MetaData.tables['Symbol']
         s_symbol_t = fdb.MetaData.tables['Simple Symbol']
-        cmp_symbol_t = fdb.MetaData.tables['Compound Symbol']
         stackp_t = fdb.MetaData.tables['Symbol Stack Placement']
 
         # Filter out only those symbols defined for this diagram type and notation
@@ -90,17 +101,28 @@ class Symbol:
             (sdecs_t.c['Diagram type'] == diagram_type),
             (sdecs_t.c['Notation'] == notation)
         )
+        decorations = select([sdecs_t.c.Symbol]).where(f)
+        stacked = select([stackp_t.c['Simple symbol']]).where(stackp_t.c['Compound symbol'].in_(decorations))
+
+        # One row for each simple symbol with the attributes of its shape
+        # and one row for each placement in the stack of each compound symbol
+        p = [symbol_t.c.Name, symbol_t.c.Shape, symbol_t.c.Length, s_symbol_t.c['Terminal offset'],
+             arrow_t.c['Half base'], arrow_t.c.Height, arrow_t.c.Fill, circle_t.c.Radius, circle_t.c.Solid,
+             cross_t.c['Root offset'], cross_t.c['Vine offset'], cross_t.c.Width, cross_t.c.Angle,
+             stackp_t.c.Position, stackp_t.c['Simple symbol'], stackp_t.c.Arrange,
+             stackp_t.c['Offset x'], stackp_t.c['Offset y']]
+        j = symbol_t.outerjoin(s_symbol_t).outerjoin(arrow_t).outerjoin(circle_t).outerjoin(cross_t).outerjoin(
+            stackp_t, symbol_t.c.Name == stackp_t.c['Compound symbol'])
+        f = symbol_t.c.Name.in_(union(decorations, stacked))
+        q = select(p).select_from(j).where(f).order_by(symbol_t.c.Name, stackp_t.c.Position)
+        rows = fdb.Connection.execute(q).fetchall()
 
+        symbols = {}
         # Simple symbols
-        # Arrow symbols
-        p = [symbol_t.c.Name, symbol_t.c.Length, s_symbol_t.c['Terminal offset'], arrow_t.c['Half base'], arrow_t.c.Height,
-             arrow_t.c.Fill]
-        j = sdecs_t.join(symbol_t, sdecs_t.c.Symbol == symbol_t.c.Name).join(s_symbol_t).join(arrow_t)
-        q = select(p).select_from(j).where(f)
-        rows = fdb.Connection.execute(q).fetchall()
-        for r in rows:
-            rotations = Symbol.compute_arrow_rotations(r['Half base'], r.Height)
-            Symbol.instances[r.Name] = SymbolSpec(
+        arrows = [r for r in rows if r.Shape == 'arrow']
+        arrow_rotations = Symbol.compute_arrow_rotations([(r['Half base'], r.Height) for r in arrows])
+        for r, rotations in zip(arrows, arrow_rotations):
+            symbols[r.Name] = SymbolSpec(
                 length=r.Length,
                 type='arrow',
                 spec=SimpleSymbol(
@@ -108,71 +130,26 @@ class Symbol:
                     shape=ArrowSymbol(half_base=r['Half base'], height=r.Height, fill=r.Fill, rotations=rotations)
                 ),
             )
-        # Circle symbols
-        # Circle components of any Compound Symbols
-        # TODO: This section should be copied in front of the cross and arrow symbols as well
-        # TODO: Better yet, figure out a smarter way to query the database so that a single
-        # TODO: table is built and only one row iteration is required per symbol type
-        p = [symbol_t.c.Length, stackp_t.c['Simple symbol'],
-             s_symbol_t.c.Stroke, s_symbol_t.c['Terminal offset'], circle_t.c.Radius, circle_t.c.Solid]
-        j = sdecs_t.join(symbol_t, sdecs_t.c.Symbol == symbol_t.c.Name).join(cmp_symbol_t).join(
-            stackp_t, symbol_t.c.Name == stackp_t.c['Compound symbol']
-        ).join(s_symbol_t, stackp_t.c['Simple symbol'] == s_symbol_t.c.Name).join(circle_t)
-        q = select(p).select_from(j).where(f)
-        rows = fdb.Connection.execute(q).fetchall()
-        for r in rows:
-            Symbol.instances[r['Simple symbol']] = SymbolSpec(
-                length=r.Length,
-                type='circle',
-                spec=SimpleSymbol(
-                    terminal_offset=r['Terminal offset'],
-                    shape=CircleSymbol(radius=r.Radius, solid=r.Solid)
-                ),
-            )
-        # Circle components of any Simple Symbols
-        # If there is overlap, that's okay. Just overwrite the compound elmeent (it will be the same data anyway)
-        p = [symbol_t.c.Name, symbol_t.c.Length, s_symbol_t.c['Terminal offset'], circle_t.c.Radius, circle_t.c.Solid]
-        j = sdecs_t.join(symbol_t, sdecs_t.c.Symbol == symbol_t.c.Name).join(s_symbol_t).join(circle_t)
-        q = select(p).select_from(j).where(f)
-        rows = fdb.Connection.execute(q).fetchall()
-        for r in rows:
-            Symbol.instances[r.Name] = SymbolSpec(
-                length=r.Length,
-                type='circle',
-                spec=SimpleSymbol(
-                    terminal_offset=r['Terminal offset'],
-                    shape=CircleSymbol(radius=r.Radius, solid=r.Solid)
-                ),
-            )
-        # Cross symbols
-        p = [symbol_t.c.Name, symbol_t.c.Length, s_symbol_t.c['Terminal offset'],
-             cross_t.c['Root offset'], cross_t.c['Vine offset'], cross_t.c.Width, cross_t.c.Angle]
-        j = sdecs_t.join(symbol_t, sdecs_t.c.Symbol == symbol_t.c.Name).join(s_symbol_t).join(cross_t)
-        q = select(p).select_from(j).where(f)
-        rows = fdb.Connection.execute(q).fetchall()
         for r in rows:
-            Symbol.instances[r.Name] = SymbolSpec(
-                length=r.Length,
-                type='cross',
-                spec=SimpleSymbol(
-                    terminal_offset=r['Terminal offset'],
-                    shape=CrossSymbol(
-                        root_offset=r['Root offset'], vine_offset=r['Vine offset'], width=r.Width, angle=r.Angle
-                    )
-                ),
+            if r.Shape == 'circle':
+                shape = CircleSymbol(radius=r.Radius, solid=r.Solid)
+            elif r.Shape == 'cross':
+                shape = CrossSymbol(
+                    root_offset=r['Root offset'], vine_offset=r['Vine offset'], width=r.Width, angle=r.Angle
+                )
+            else:
+                continue
+            symbols[r.Name] = SymbolSpec(
+                length=r.Length, type=r.Shape, spec=SimpleSymbol(terminal_offset=r['Terminal offset'], shape=shape)
             )
 
-        # Compound symbols
-        p = [symbol_t.c.Name, symbol_t.c.Length, stackp_t.c.Position, stackp_t.c['Simple symbol'],
-             stackp_t.c.Arrange, stackp_t.c['Offset x'], stackp_t.c['Offset y']]
-        j = sdecs_t.join(symbol_t, sdecs_t.c.Symbol == symbol_t.c.Name).join(
-            stackp_t, symbol_t.c.Name == stackp_t.c['Compound symbol'])
-        q = select(p).select_from(j).distinct().where(f).order_by("Name", "Position")
-        rows = fdb.Connection.execute(q).fetchall()
+        # Compound symbols, whose stacked simple symbols have all been loaded by now
         for r in rows:
+            if r.Shape != 'compound':
+                continue
             # Determine the type of the Simple Symbol positioned within the stack
             # Must be one of the Simple Symbol subclass names and not 'compound' or anything else
-            simple_symbol_type = self.instances[r['Simple symbol']].type
+            simple_symbol_type = symbols[r['Simple symbol']].type
             assert simple_symbol_type in ('arrow', 'circle', 'cross'), "Bad type for simple symbol in stack"
             if r.Position == 1:  # First item of new stack
                 # Start a new stack of simple symbols
@@ -189,92 +166,65 @@ class Symbol:
                     arrange=arrange,  offset=Position(r['Offset x'], r['Offset y']))
                 )
                 if not arrange:
-                    # No more simple symbols on this stack, so add the compound symbol to the instance dict
-                    Symbol.instances[r.Name] = SymbolSpec(length=r.Length, type='compound', spec=stack[:])  # COPY the stack
+                    # No more simple symbols on this stack, so add the compound symbol
+                    symbols[r.Name] = SymbolSpec(length=r.Length, type='compound', spec=stack[:])  # COPY the stack
+        return symbols
 
     @staticmethod
-    def compute_arrow_rotations( half_base: int, height: int ) -> Dict[ NodeFace, np.ndarray ]:
+    def compute_arrow_rotations(arrows: List[tuple]) -> List[Dict[NodeFace, List[Position]]]:
         """
-        Create a dictionary of arrow polygons each rotated 90 degree rotations and keyed to the appropriate
-        Node Face orientation where the arrow head would attach or point toward the face.
-        system with 0,0 at the arrow head.
+        For each arrow, create a dictionary of arrow polygons each rotated 90 degree rotations and keyed to the
+        appropriate Node Face orientation where the arrow head would attach or point toward the face.
+        Each polygon is in a coordinate system with 0,0 at the arrow head.
 
-        :param half_base:  1/2 the arrow triangle base
-        :param height: height of the arrow triangle
-        :return: dictionary of all four arrow rotations, one per node face
+        :param arrows: The half base (1/2 the arrow triangle base) and height of each arrow triangle
+        :return: dictionary of all four arrow rotations, one per node face, for each arrow
         """
-        # Prior to rotation each row is a set of coordinates on the same dimension (x or y)
-        bottom_arrow = np.array([[0, half_base, -half_base], [0, -height, -height]])  # x values, y values
-        rotations = {
-            NodeFace.BOTTOM: bottom_arrow,
-            NodeFace.LEFT: np.dot(r90, bottom_arrow),
-            NodeFace.TOP: np.dot(r180, bottom_arrow),
-            NodeFace.RIGHT: np.dot(r270, bottom_arrow)
-        }
-        # Now that the rotate operations are complete, return a flipped matrix
-        # so that each row is a coordinate pair using the numpy reshape operation
-        for k,v in rotations.items():
-            rotations[k] = [Position(z[0],z[1]) for z in zip(v[0],v[1])]
-        return rotations
+        bottom_arrows = [[Position(0, 0), Position(half_base, -height), Position(-half_base, -height)]
+                         for half_base, height in arrows]
+        return face_rotations(bottom_arrows)
 
     @staticmethod
     def update_symbol_lengths():
         """
         Symbol.Length is a derived attribute in the Decoration Subsystem class model
         Compute total drawn length along Connector axis for each Symbol and update the database
+
+        Each kind of Symbol is updated all at once by a single statement. This is done when the database is
+        built, so loading Symbols never writes to the database.
         """
-        # Simple Symbols first
         arrow_t = fdb.MetaData.tables['Arrow Symbol']
         circle_t = fdb.MetaData.tables['Circle Symbol']
         cross_t = fdb.MetaData.tables['Cross Symbol']
         symbol_t = fdb.MetaData.tables['Symbol']
+        splace_t = fdb.MetaData.tables['Symbol Stack Placement']
 
-        query = select([symbol_t]).where(symbol_t.c.Shape != 'compound')
-        simple_symbols = fdb.Connection.execute(query).fetchall()
-        for ssym in simple_symbols:
-            if ssym.Shape == 'arrow':
-                query = select([arrow_t.c.Height]).where(arrow_t.c.Name == ssym.Name)
-                v = fdb.Connection.execute(query).scalar()
-                u = symbol_t.update().where(symbol_t.c.Name == ssym.Name).values(Length=v)
-                fdb.Connection.execute(u)
-            if ssym.Shape == 'circle':
-                query = select([circle_t.c.Radius]).where(circle_t.c.Name == ssym.Name)
-                v = 2 * fdb.Connection.execute(query).scalar()
-                u = symbol_t.update().where(symbol_t.c.Name == ssym.Name).values(Length=v)
-                fdb.Connection.execute(u)
-            if ssym.Shape == 'cross':
-                query = select([cross_t.c['Root offset'], cross_t.c['Vine offset']]).where(cross_t.c.Name == ssym.Name)
-                result = fdb.Connection.execute(query).fetchone()
-                v = result['Root offset'] + result['Vine offset']
-                u = symbol_t.update().where(symbol_t.c.Name == ssym.Name).values(Length=v)
-                fdb.Connection.execute(u)
+        # Simple Symbols first since compound lengths are computed from them
+        simple_lengths = {
+            'arrow': select([arrow_t.c.Height]).where(arrow_t.c.Name == symbol_t.c.Name),
+            'circle': select([2 * circle_t.c.Radius]).where(circle_t.c.Name == symbol_t.c.Name),
+            'cross': select([cross_t.c['Root offset'] + cross_t.c['Vine offset']]).where(
+                cross_t.c.Name == symbol_t.c.Name),
+        }
+        for shape, length in simple_lengths.items():
+            u = symbol_t.update().where(symbol_t.c.Shape == shape).values(Length=length.as_scalar())
+            fdb.Connection.execute(u)
 
         # Compound symbols
         # We want the sum for side-by-side simple symbols and the max for vertically stacked symbols
-        splace_t = fdb.MetaData.tables['Symbol Stack Placement']
-        j = join(symbol_t, splace_t, splace_t.c['Simple symbol'] == symbol_t.c.Name)
-        q = select(  # simple symbol inclusions in adjacency arrangement, compound, simple, length
-            [splace_t.c['Compound symbol'], splace_t.c['Simple symbol'], symbol_t.c.Length,
-             func.sum(symbol_t.c.Length).label("Total")]
-        ).select_from(j).where(splace_t.c.Arrange.in_(['adjacent', 'last'])).group_by(splace_t.c['Compound symbol'])
-        found = fdb.Connection.execute(q).fetchall()
-        for r in found:
-            u = symbol_t.update().where(symbol_t.c.Name == r['Compound symbol']).values(Length=r.Total)
-            fdb.Connection.execute(u)
-
-        q = select(  # simple symbol inclusions in adjacency arrangement, compound, simple, length
-            [splace_t.c['Compound symbol'], splace_t.c['Simple symbol'], symbol_t.c.Length,
-             func.max(symbol_t.c.Length).label("Max")]
-        ).select_from(j).where(splace_t.c.Arrange.in_(['layer', 'top'])).group_by(splace_t.c['Compound symbol'])
-        found = fdb.Connection.execute(q).fetchall()
-        for r in found:
-            u = symbol_t.update().where(symbol_t.c.Name == r['Compound symbol']).values(Length=r.Max)
+        # A compound symbol with both arrangements gets the max
+        simple_t = symbol_t.alias('simple')
+        for arrangements, total in ((['adjacent', 'last'], func.sum), (['layer', 'top'], func.max)):
+            included = and_(splace_t.c['Compound symbol'] == symbol_t.c.Name, splace_t.c.Arrange.in_(arrangements))
+            length = select([total(simple_t.c.Length)]).select_from(
+                join(splace_t, simple_t, splace_t.c['Simple symbol'] == simple_t.c.Name)).where(included)
+            compounds = select([splace_t.c['Compound symbol']]).where(splace_t.c.Arrange.in_(arrangements))
+            u = symbol_t.update().where(symbol_t.c.Name.in_(compounds)).values(Length=length.as_scalar())
             fdb.Connection.execute(u)
 
 
 if __name__ == "__main__":
-    fdb()
-    Symbol.update_symbol_lengths()
+    fdb(rebuild=False)
     starr = 'Starr'
     sm = 'Shlaer-Mellor'
     x = 'xUML'
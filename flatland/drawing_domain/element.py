@@ -8,12 +8,12 @@ Circle = namedtuple('_Circle', 'center radius border_style fill')
 Polygon = namedtuple('_Polygon', 'vertices border_style fill')
 """Closed polygon (other than a rectangle) that can be filled"""
 Line_Segment = namedtuple('_Line_Segment', 'from_here to_there style')
-"""A line segment is drawn from one point on the Tablet to another using some line drawing style"""
+"""A line segment is drawn from one point on the Tablet to another using a resolved line style record index"""
 Rectangle = namedtuple('_Rectangle', 'upper_left size border_style fill radius top bottom')
 """A rectangle is positioned at its lower left corner and then drawn with the specified size"""
 FillRect = namedtuple('_FillRect', 'upper_left size color')
-"""A borderless rectangle is filled with the specified color"""
+"""A borderless rectangle is filled with the specified rgb color"""
 Text_line = namedtuple('_Text_line', 'lower_left text style')
-"""A line of text (no CR/LF characters) rendered with a given style"""
+"""A line of text (no CR/LF characters) rendered with a resolved text style record index"""
 Image = namedtuple('_Image', 'resource_path upper_left size')
 """A png or jpeg image file and a position"""
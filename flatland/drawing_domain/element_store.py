@@ -0,0 +1,160 @@
+"""
+element_store.py – Columnar storage for the drawing elements of a Layer
+"""
+from array import array
+from typing import Dict, Iterator, List, Sequence
+from flatland.datatypes.geometry_types import Position, Points, Rect_Size
+
+# How each kind of element field is broken into columns
+# position -- x and y coordinate columns
+# size -- height and width columns
+# positions -- a variable number of positions per element held in shared x and y columns with a start offset column
+#   and added either as a sequence of Positions or as Points
+# float -- a single coordinate column
+# index -- a single column of integers, such as a style record index
+# object -- a plain list for anything else, like a text string, an rgb fill or a file path
+Field_kinds = {'position', 'size', 'positions', 'float', 'index', 'object'}
+
+
+class ElementStore:
+    """
+    Holds all of a Layer's drawing elements of one kind as parallel columns instead of as a list of namedtuples
+    each with its own nested Position and Rect_Size tuples. A large sheet has thousands of elements, so this
+    saves a lot of small allocations. Coordinates are kept in array('d') columns and style record indices
+    in array('l') columns. Both support the buffer protocol, so a column can be viewed as a numpy array
+    without copying if coordinates need to be transformed all at once.
+
+    Elements are added as their field values and iterated over as element namedtuples, so the columns are only
+    visible to code that asks for them.
+
+        Attributes
+
+        - Element -- The element namedtuple type that we store
+        - Layout -- The kind of each element field (see Field_kinds)
+        - Columns -- Each column by name. The column of a single valued field has the same name as the field
+          and multi valued fields use the field name with a suffix, like 'from_here_x'
+        - Count -- Number of elements stored
+    """
+
+    def __init__(self, element_type, **layout: str):
+        """
+        Constructor
+
+        :param element_type: The element namedtuple type
+        :param layout: The kind of each element field in namedtuple order
+        """
+        assert tuple(layout) == element_type._fields, f"Layout does not match fields of {element_type.__name__}"
+        assert set(layout.values()) <= Field_kinds, "Unknown field kind in layout"
+        self.Element = element_type
+        self.Layout = layout
+        self.Columns: Dict[str, Sequence] = {}
+        self.clear()
+
+    def clear(self):
+        """Remove all elements"""
+        for field, kind in self.Layout.items():
+            if kind in ('position', 'positions'):
+                self.Columns[field + '_x'] = array('d')
+                self.Columns[field + '_y'] = array('d')
+                if kind == 'positions':
+                    self.Columns[field + '_start'] = array('l', [0])
+            elif kind == 'size':
+                self.Columns[field + '_height'] = array('d')
+                self.Columns[field + '_width'] = array('d')
+            elif kind == 'float':
+                self.Columns[field] = array('d')
+            elif kind == 'index':
+                self.Columns[field] = array('l')
+            else:
+                self.Columns[field] = []
+        self.Count = 0
+
+    def append(self, *values):
+        """
+        Add an element
+
+        :param values: Element field values in namedtuple order
+        """
+        c = self.Columns
+        for (field, kind), v in zip(self.Layout.items(), values):
+            if kind == 'position':
+                c[field + '_x'].append(v[0])
+                c[field + '_y'].append(v[1])
+            elif kind == 'positions' and isinstance(v, Points):
+                c[field + '_x'].extend(v.x)
+                c[field + '_y'].extend(v.y)
+                c[field + '_start'].append(len(c[field + '_x']))
+            elif kind == 'positions':
+                c[field + '_x'].extend(p[0] for p in v)
+                c[field + '_y'].extend(p[1] for p in v)
+                c[field + '_start'].append(len(c[field + '_x']))
+            elif kind == 'size':
+                c[field + '_height'].append(v.height)
+                c[field + '_width'].append(v.width)
+            else:
+                c[field].append(v)
+        self.Count += 1
+
+    def extend(self, count: int, **values):
+        """
+        Add many elements at once, a column at a time
+
+        :param count: Number of elements added
+        :param values: For each field, Points for a position, otherwise a sequence with a value for each element
+        """
+        c = self.Columns
+        for field, kind in self.Layout.items():
+            v = values[field]
+            assert kind != 'positions', "Elements with a variable number of positions must be appended"
+            assert len(v.x if kind == 'position' else v) == count, f"Expected {count} values for {field}"
+            if kind == 'position':
+                c[field + '_x'].extend(v.x)
+                c[field + '_y'].extend(v.y)
+            elif kind == 'size':
+                c[field + '_height'].extend(s.height for s in v)
+                c[field + '_width'].extend(s.width for s in v)
+            else:
+                c[field].extend(v)
+        self.Count += count
+
+    def __len__(self) -> int:
+        return self.Count
+
+    def __getitem__(self, i: int):
+        """Rebuild element i as its namedtuple"""
+        values = []
+        c = self.Columns
+        for field, kind in self.Layout.items():
+            if kind == 'position':
+                values.append(Position(c[field + '_x'][i], c[field + '_y'][i]))
+            elif kind == 'positions':
+                start, end = c[field + '_start'][i], c[field + '_start'][i + 1]
+                values.append([Position(x, y) for x, y in zip(c[field + '_x'][start:end], c[field + '_y'][start:end])])
+            elif kind == 'size':
+                values.append(Rect_Size(height=c[field + '_height'][i], width=c[field + '_width'][i]))
+            else:
+                values.append(c[field][i])
+        return self.Element(*values)
+
+    def __iter__(self) -> Iterator:
+        return (self[i] for i in range(self.Count))
+
+    def reorder(self, order: List[int]):
+        """
+        Rearrange the elements
+
+        :param order: Element indices in their new order
+        """
+        elements = list(self)
+        self.clear()
+        for i in order:
+            self.append(*elements[i])
+
+    def sort_by(self, name: str):
+        """
+        Stable sort of the elements on a single valued column, so elements with equal values keep their order
+
+        :param name: Column to sort by, like 'style'
+        """
+        key = self.Columns[name]
+        self.reorder(sorted(range(self.Count), key=key.__getitem__))
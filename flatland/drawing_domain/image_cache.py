@@ -0,0 +1,108 @@
+"""
+image_cache.py – Decoded png images shared by every Tablet in a process
+"""
+import os
+import logging
+import cairo
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from flatland.datatypes.geometry_types import Rect_Size
+
+
+class ImageCache:
+    """
+    The same organization logos appear on diagram after diagram, so each png file is decoded only once per
+    process. A decoded image is kept along with the modification time of its file, so an image that changes on
+    disk is decoded again the next time it is drawn.
+
+    An image can also be scaled down to fit the area reserved for it, such as a title block field. The scaled
+    copy is cached too, so only the pixels that are actually drawn are embedded in the output.
+
+        Attributes
+
+        - Decoded -- Each decoded image surface and the modification time of its file by file path
+        - Scaled -- Each scaled copy of a decoded image by file path, modification time and fitted size
+        - Missing -- Paths of files we could not load, so we only warn about each one once
+    """
+    Decoded: Dict[str, Tuple[int, cairo.ImageSurface]] = {}
+    Scaled: Dict[Tuple[str, int, float, float], cairo.ImageSurface] = {}
+    Missing: Set[Tuple[str, Optional[int]]] = set()
+
+    @staticmethod
+    def version(path: Path) -> Optional[int]:
+        """
+        Modification time of an image file in nanoseconds
+
+        :param path: Path to the image file
+        :return: The modification time, or None if there is no such file
+        """
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def image(cls, path: Path, fit: Optional[Rect_Size] = None) -> Optional[cairo.ImageSurface]:
+        """
+        Get a decoded png image, decoding it only if it is new or its file has changed
+
+        :param path: Path to a png image file
+        :param fit: If the image is larger than this, scale it down to fit, keeping its proportions
+        :return: The image surface, or None if the file can't be read
+        """
+        key = str(path)
+        mtime = cls.version(path)
+        decoded = cls.Decoded.get(key)
+        if mtime is None or not decoded or decoded[0] != mtime:
+            image = cls.decode(key, mtime)
+            if not image:
+                return None
+            # Drop anything derived from an older version of the file
+            cls.Scaled = {k: v for k, v in cls.Scaled.items() if k[0] != key}
+            decoded = cls.Decoded[key] = (mtime, image)
+        image = decoded[1]
+        if not fit:
+            return image
+        scale = min(fit.width / image.get_width(), fit.height / image.get_height())
+        if scale >= 1:
+            return image  # Already fits
+        scaled_key = (key, mtime, fit.width, fit.height)
+        if scaled_key not in cls.Scaled:
+            cls.Scaled[scaled_key] = cls.scale(image, scale)
+        return cls.Scaled[scaled_key]
+
+    @classmethod
+    def decode(cls, path: str, mtime: Optional[int]) -> Optional[cairo.ImageSurface]:
+        """Read a png file, warning once if it can't be read"""
+        try:
+            return cairo.ImageSurface.create_from_png(path)
+        except (cairo.Error, OSError):
+            if (path, mtime) not in cls.Missing:
+                cls.Missing.add((path, mtime))
+                logging.getLogger(__name__).warning(f"Cannot locate png image file: [{path}] -- Skipping")
+            return None
+
+    @staticmethod
+    def scale(image: cairo.ImageSurface, scale: float) -> cairo.ImageSurface:
+        """
+        Make a smaller copy of an image
+
+        :param image: The image
+        :param scale: Factor less than one
+        :return: The scaled copy
+        """
+        width = max(1, round(image.get_width() * scale))
+        height = max(1, round(image.get_height() * scale))
+        scaled = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        context = cairo.Context(scaled)
+        context.scale(width / image.get_width(), height / image.get_height())
+        context.set_source_surface(image, 0, 0)
+        context.paint()
+        return scaled
+
+    @classmethod
+    def clear(cls):
+        """Forget every image"""
+        cls.Decoded.clear()
+        cls.Scaled.clear()
+        cls.Missing.clear()
@@ -1,18 +1,22 @@
 """
 layer.py - A layer of graphics drawn on a Tablet
 """
-import sys
 import logging
+from array import array
 from typing import List
 import cairo
 import math  # For rounded corners
-from flatland.flatland_exceptions import TabletBoundsExceeded
+from collections import OrderedDict
+from flatland.flatland_exceptions import TabletBoundsExceeded, OutsideTabletDrawArea, UndefinedColor
 from flatland.drawing_domain.styledb import StyleDB
+from flatland.drawing_domain.text_metrics import TextMetrics
 import flatland.drawing_domain.element as element
-from flatland.datatypes.geometry_types import Rect_Size, Position, HorizAlign
+from flatland.drawing_domain.element_store import ElementStore
+from flatland.drawing_domain.image_cache import ImageCache
+from flatland.datatypes.geometry_types import Rect_Size, Position, Points, HorizAlign
 from flatland.drawing_domain.presentation import  Presentation
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 if TYPE_CHECKING:
     from flatland.drawing_domain.tablet import Tablet
@@ -51,13 +55,37 @@ class Layer:
 
         Attributes
 
-        - Line_segments -- A list of geometric lines each with start and end coordinates.
-        - Rectangles -- A list of rectangles each with a lower left corner, height and width
-        - Polygons -- A list of closed polygons
-        - Text -- A list of text lines (new lines are not supported)
+        - Line_segments -- Geometric lines each with start and end coordinates.
+        - Circles -- Circles each with a center and radius
+        - Rectangles -- Rectangles each with an upper left corner, height and width
+        - Polygons -- Closed polygons
+        - TextUnderlayRects -- Filled rectangles drawn underneath text
+        - Text -- Text lines (new lines are not supported)
+        - Images -- Image files each with an upper left corner and size
+
+        Each kind of element is held in an ElementStore, which keeps the element coordinates and style
+        indices in compact columns rather than as many small tuples.
+        - Sort_styles -- When rendering, group line segments and text lines by style so that
+          the style changes less often. Only these are sorted since they never hide one another the way filled
+          shapes can. Set for all Layers from the command line.
+        - Batch_strokes -- Draw all line segments of the same line style with a single stroke,
+          joining connected segments into polylines. Also set from the command line.
+        - Fit_images -- Scale each image down to fit the area reserved for it rather than drawing it at full
+          size. Also set from the command line.
+        - Cache_key -- If set, the content of this Layer is fully determined by this key. The Layer is
+          rendered once onto a cairo recording surface which is replayed by every Layer with the same key.
+          So the static sheet and frame layers are only laid out and drawn once for many diagrams.
+        - Recording -- The recording surface replayed by this Layer, once it is known
+        - Recordings -- Class level cache of each recording surface by cache key, least recently used first
     """
-
-    def __init__(self, name: str, tablet: 'Tablet', presentation: str, drawing_type: str, fill: str = None):
+    Sort_styles = False
+    Batch_strokes = False
+    Fit_images = False
+    Recordings: Dict[tuple, 'cairo.RecordingSurface'] = OrderedDict()
+    Recording_limit = 64  # Least recently used recordings are dropped beyond this many
+
+    def __init__(self, name: str, tablet: 'Tablet', presentation: str, drawing_type: str, fill: str = None,
+                 cache_key: Optional[tuple] = None):
         """
         Constructor
 
@@ -66,10 +94,13 @@ class Layer:
         :param presentation: Presentation to be applied to this Layer
         :param drawing_type: The Presentation's Drawing Type
         :param fill: A color to fill the drawing area
+        :param cache_key: Inputs that fully determine the content of this Layer, if it can be reused
         """
         self.logger = logging.getLogger(__name__)
         self.Name = name
         self.Fill = fill
+        self.Cache_key = cache_key
+        self.Recording = None
         self.Tablet = tablet
         self.Drawing_type = drawing_type
 
@@ -77,14 +108,17 @@ class Layer:
 
         # Create one giant fill rect for the background if this layer is filled
         self.BackgroundRect = None if not self.Fill else element.FillRect(
-            upper_left=Position(0,0), size=tablet.Size, color=fill)
-        self.Line_segments: List[element.Line_Segment] = []
-        self.Circles: List[element.Circle] = []
-        self.Polygons: List[element.Polygon] = []
-        self.Rectangles: List[element.Rectangle] = []
-        self.TextUnderlayRects: List[element.FillRect] = []
-        self.Text: List[element.Text_line] = []
-        self.Images: List[element.Image] = []
+            upper_left=Position(0,0), size=tablet.Size, color=self.fill_color(fill))
+        self.Line_segments = ElementStore(element.Line_Segment, from_here='position', to_there='position',
+                                          style='index')
+        self.Circles = ElementStore(element.Circle, center='position', radius='float', border_style='index',
+                                    fill='object')
+        self.Polygons = ElementStore(element.Polygon, vertices='positions', border_style='index', fill='object')
+        self.Rectangles = ElementStore(element.Rectangle, upper_left='position', size='size', border_style='index',
+                                       fill='object', radius='float', top='object', bottom='object')
+        self.TextUnderlayRects = ElementStore(element.FillRect, upper_left='position', size='size', color='object')
+        self.Text = ElementStore(element.Text_line, lower_left='position', text='object', style='index')
+        self.Images = ElementStore(element.Image, resource_path='object', upper_left='position', size='size')
 
         # Load this Layer's presentation assets if they haven't been already
         # Unique ID (see Tablet Subsystem class diagram) of a Presentation is both
@@ -96,12 +130,51 @@ class Layer:
             self.Presentation = Presentation(name=presentation, drawing_type=self.Drawing_type)
             self.Tablet.Presentations[pres_index] = self.Presentation
 
+    @property
+    def recorded(self) -> bool:
+        """
+        Has a Layer with the same content already been rendered? If so, nothing needs to be added.
+        We hold on to the recording, so it is replayed even if it is dropped from the cache before we render.
+        """
+        if self.Recording is None and self.Cache_key is not None:
+            self.Recording = Layer.Recordings.get(self.Cache_key)
+            if self.Recording is not None:
+                Layer.Recordings.move_to_end(self.Cache_key)
+        return self.Recording is not None
+
     def render(self):
-        """Renders all Elements on this Layer"""
+        """Renders all Elements on this Layer, or replays the same content rendered earlier"""
 
         self.logger.info(f'Rendering layer: {self.Name}')
+        if self.Cache_key is None:
+            self.render_elements()
+            return
+        if not self.recorded:
+            self.Recording = self.record()
+        self.Tablet.Context.set_source_surface(self.Recording, 0, 0)
+        self.Tablet.State.forget('set_source_rgb')
+        self.Tablet.Context.paint()
+
+    def record(self) -> 'cairo.RecordingSurface':
+        """Render all Elements onto a new recording surface and cache it"""
+        self.logger.info(f'Recording layer: {self.Name}')
+        size = self.Tablet.Size
+        recording = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, cairo.Rectangle(0, 0, size.width, size.height))
+        with self.Tablet.drawing_on(cairo.Context(recording)):
+            self.render_elements()
+        if len(Layer.Recordings) >= Layer.Recording_limit:
+            Layer.Recordings.popitem(last=False)
+        Layer.Recordings[self.Cache_key] = recording
+        return recording
+
+    def render_elements(self):
+        """Renders all Elements on this Layer onto the Tablet's current context"""
         # For now, always assume output to cairo
         self.Tablet.Context.set_line_join(cairo.LINE_JOIN_ROUND)
+        if Layer.Sort_styles:
+            # A stable sort keeps the original order of elements with the same style
+            self.Line_segments.sort_by('style')
+            self.Text.sort_by('style')
         # Rendering order determines what can potentially overlap on this Layer, so order matters
         if self.Fill:
             self.render_background()
@@ -122,18 +195,17 @@ class Layer:
         for u in self.TextUnderlayRects:
             self.render_fillrect(u)
 
-    def render_fillrect(self, frect: element.FillRect):
-        """Render a filled retangle"""
-
-        # Lookup the RGB color value from the user color name
+    def fill_color(self, color: str):
+        """Lookup the RGB color value from the user color name"""
         try:
-            fill_rgb_color_value = StyleDB.rgbF[frect.color]
+            return StyleDB.rgbF[color]
         except KeyError:
-            self.logger.error(f'Fill rect color [{frect.color}] not defined in system or user configuration')
-            sys.exit(1)
+            raise UndefinedColor(color) from None
 
+    def render_fillrect(self, frect: element.FillRect):
+        """Render a filled retangle"""
         self.Tablet.Context.rectangle(frect.upper_left.x, frect.upper_left.y, frect.size.width, frect.size.height)
-        self.Tablet.Context.set_source_rgb(*fill_rgb_color_value)
+        self.Tablet.State.set_source_rgb(frect.color)
         self.Tablet.Context.fill()
         self.Tablet.Context.stroke()
 
@@ -153,7 +225,7 @@ class Layer:
         # Use upper left corner instead
         ul = Position(x=ll_dc.x, y=ll_dc.y - size.height)
 
-        self.TextUnderlayRects.append(element.FillRect(upper_left=ul, size=size, color=fill))
+        self.TextUnderlayRects.append(ul, size, self.fill_color(fill))
 
     def add_text_line(self, asset: str, lower_left: Position, text: str):
         """
@@ -167,15 +239,9 @@ class Layer:
             underlay_pos = Position(lower_left.x-2, lower_left.y-3)
             self.add_text_underlay(lower_left=underlay_pos, size=underlay_size)
         try:
-            self.Text.append(
-                element.Text_line(
-                    lower_left=self.Tablet.to_dc(lower_left), text=text,
-                    style=self.Presentation.Text_presentation[asset],
-                )
-            )
+            self.Text.append(self.Tablet.to_dc(lower_left), text, self.Presentation.Text_record[asset])
         except TabletBoundsExceeded:
-            self.logger.error(f"Asset: [{asset}] Text: [{text}] outside of tablet draw area")
-            sys.exit(1)
+            raise OutsideTabletDrawArea(f"Asset: [{asset}] Text: [{text}]") from None
         self.logger.info('Text added')
 
     def text_line_size(self, asset: str, text_line: str) -> Rect_Size:
@@ -187,15 +253,20 @@ class Layer:
         """
         style_name = self.Presentation.Text_presentation[asset]  # Look up the text style for this asset
         style = StyleDB.text_style[style_name]
+        size = TextMetrics.lookup(style, text_line)
+        if size:
+            return size
         # Configure the Cairo context with style properties and the text line
-        self.Tablet.Context.select_font_face(
+        self.Tablet.State.select_font_face(
             style.typeface, Cairo_font_slant[style.slant], Cairo_font_weight[style.weight],
         )
-        self.Tablet.Context.set_font_size(style.size)
+        self.Tablet.State.set_font_size(style.size)
         te = self.Tablet.Context.text_extents(text_line)
         # Add x_bearing to account for any indented whitespace
         # Otherwise you just get the width of the text after the whitespace
-        return Rect_Size(height=te.height, width=te.width+te.x_bearing)
+        size = Rect_Size(height=te.height, width=te.width+te.x_bearing)
+        TextMetrics.store(style, text_line, size)
+        return size
 
     def text_block_size(self, asset: str, text_block: List[str]) -> Rect_Size:
         """
@@ -214,9 +285,7 @@ class Layer:
         num_lines = len(text_block)
         assert num_lines > 0, "Text block size requested for empty text block"
         # The text block is the width of its widest ink render extent
-        widths = [self.text_line_size(asset, line).width for line in text_block]
-        widest_line = text_block[widths.index(max(widths))]
-        block_width = self.text_line_size(asset=asset, text_line=widest_line).width
+        block_width = max(self.text_line_size(asset, line).width for line in text_block)
         block_height = num_lines*spacing - inter_line_spacing  # Deduct that one unneeded line of spacing on the top
 
         return Rect_Size(width=block_width, height=block_height)
@@ -267,10 +336,38 @@ class Layer:
         :param to_there:
         """
         self.Line_segments.append(
-            element.Line_Segment(from_here=self.Tablet.to_dc(from_here), to_there=self.Tablet.to_dc(to_there),
-                                 style=self.Presentation.Shape_presentation[asset])
+            self.Tablet.to_dc(from_here), self.Tablet.to_dc(to_there), self.Presentation.Line_record[asset]
         )
 
+    def add_line_segments(self, asset: str, from_here: List[Position], to_there: List[Position]):
+        """
+        Add many line segments drawn with the same Asset, converting all of their coordinates at once
+
+        :param asset: Used to look up the line style
+        :param from_here: Start of each line segment
+        :param to_there: End of each line segment
+        """
+        count = len(from_here)
+        assert count == len(to_there), "Each line segment needs a start and an end"
+        dc = self.device_points(asset, from_here + to_there)
+        self.Line_segments.extend(
+            count, from_here=Points(x=dc.x[:count], y=dc.y[:count]), to_there=Points(x=dc.x[count:], y=dc.y[count:]),
+            style=[self.Presentation.Line_record[asset]] * count
+        )
+
+    def device_points(self, asset: str, points: List[Position]) -> Points:
+        """
+        Convert an Asset's coordinates to device coordinates all at once
+
+        :param asset: Reported if any point lies outside of the tablet draw area
+        :param points: Positions in Cartesian coordinates
+        :return: Converted coordinate arrays
+        """
+        try:
+            return self.Tablet.to_dc_all(points)
+        except TabletBoundsExceeded:
+            raise OutsideTabletDrawArea(f"Asset: [{asset}]") from None
+
     def add_image(self, resource_path: Path, lower_left: Position, size: Rect_Size):
         """
         Adds the image
@@ -283,14 +380,13 @@ class Layer:
         try:
             ll_dc = self.Tablet.to_dc(Position(x=lower_left.x, y=lower_left.y))
         except TabletBoundsExceeded:
-            self.logger.exception(f"Lower left corner of image [{resource_path.name}] is outside tablet draw region")
-            sys.exit(1)
+            raise OutsideTabletDrawArea(f"Lower left corner of image [{resource_path.name}]") from None
 
         # Use upper left corner instead
         ul = Position(x=ll_dc.x, y=ll_dc.y - size.height)
 
         # Add it to the list
-        self.Images.append(element.Image(resource_path=resource_path, upper_left=ul, size=size))
+        self.Images.append(resource_path, ul, size)
         self.logger.info(f'Drawing>> Layer {self.Name} registered resource at: {resource_path}')
 
     def add_circle(self, asset: str, center: Position, radius: float):
@@ -303,9 +399,9 @@ class Layer:
         # Check to see if this circle is filled
         fill = self.Presentation.Closed_shape_fill.get(asset)
 
-        self.Circles.append(element.Circle(
-            center=center_dc, radius=radius, border_style=self.Presentation.Shape_presentation[asset], fill=fill,
-        ))
+        self.Circles.append(
+            center_dc, radius, self.Presentation.Line_record[asset], None if not fill else StyleDB.rgbF[fill]
+        )
 
     def add_rectangle(self, asset: str, lower_left: Position, size: Rect_Size, color_usage: Optional['str'] = None):
         """
@@ -340,10 +436,32 @@ class Layer:
         # If no corner spec, assume 0 radius corners
         radius, top, bottom = (0, False, False) if not cspec else (cspec.radius, cspec.top, cspec.bottom)
 
-        self.Rectangles.append(element.Rectangle(
-            upper_left=ul, size=size, border_style=self.Presentation.Shape_presentation[asset], fill=fill,
-            radius=radius, top=top, bottom=bottom
-        ))
+        self.Rectangles.append(
+            ul, size, self.Presentation.Line_record[asset], None if not fill else StyleDB.rgbF[fill],
+            radius, top, bottom
+        )
+
+    def add_rectangles(self, asset: str, lower_left: List[Position], size: List[Rect_Size]):
+        """
+        Adds many rectangles of the same Asset, like the boxes of a title block, converting all of their
+        positions to device coordinates at once. Any Closed Shape Fill for the Asset is applied.
+
+        :param asset:  Draw this Asset
+        :param lower_left:  Lower left corner position of each rectangle in Cartesian coordinates
+        :param size: The Size of each rectangle in points
+        """
+        count = len(lower_left)
+        ll_dc = self.device_points(asset, lower_left)
+        # Use upper left corners instead
+        ul = Points(x=ll_dc.x, y=array('d', [y - s.height for y, s in zip(ll_dc.y, size)]))
+        fill = self.Presentation.Closed_shape_fill.get(asset)
+        cspec = self.Presentation.Corner_spec.get(asset)
+        radius, top, bottom = (0, False, False) if not cspec else (cspec.radius, cspec.top, cspec.bottom)
+        self.Rectangles.extend(
+            count, upper_left=ul, size=size, border_style=[self.Presentation.Line_record[asset]] * count,
+            fill=[None if not fill else StyleDB.rgbF[fill]] * count,
+            radius=[radius] * count, top=[top] * count, bottom=[bottom] * count
+        )
 
     def add_polygon(self, asset: str, vertices: List[Position]):
         """
@@ -353,13 +471,11 @@ class Layer:
         :param asset: Used to determine draw style
         :param vertices: Polygon vertices in tablet coordinates
         """
-        # Flip each position to device coordinates
-        device_vertices = [self.Tablet.to_dc(v) for v in vertices]
-        self.Polygons.append(element.Polygon(
-            vertices= device_vertices,
-            border_style=self.Presentation.Shape_presentation[asset],
-            fill=self.Presentation.Closed_shape_fill[asset]
-        ))
+        # Flip all positions to device coordinates
+        self.Polygons.append(
+            self.device_points(asset, vertices), self.Presentation.Line_record[asset],
+            StyleDB.rgbF[self.Presentation.Closed_shape_fill[asset]]
+        )
 
     def add_open_polygon(self, asset: str, vertices: List[Position]):
         """
@@ -368,75 +484,87 @@ class Layer:
         :param asset: Used to look up the line style
         :param vertices: A sequences of 2 or more vertices
         """
-        for v1, v2 in zip(vertices, vertices[1:]):
-            assert len(vertices) > 1, "Open pollygon has less than two vertices"
-            self.add_line_segment(asset=asset, from_here=v1, to_there=v2)
+        assert len(vertices) > 1, "Open pollygon has less than two vertices"
+        dc = self.device_points(asset, vertices)
+        count = len(vertices) - 1
+        self.Line_segments.extend(
+            count, from_here=Points(x=dc.x[:-1], y=dc.y[:-1]), to_there=Points(x=dc.x[1:], y=dc.y[1:]),
+            style=[self.Presentation.Line_record[asset]] * count
+        )
 
     def render_text(self):
         """Draw all text lines"""
-        for t in self.Text:
-            style = StyleDB.text_style[t.style]
-            text_color_name = StyleDB.text_style[t.style].color
-            text_rgb_color_value = StyleDB.rgbF[text_color_name]
-            self.Tablet.Context.set_source_rgb(*text_rgb_color_value)
-            self.Tablet.Context.select_font_face(
+        c = self.Text.Columns
+        for x, y, text, s in zip(c['lower_left_x'], c['lower_left_y'], c['text'], c['style']):
+            style = StyleDB.text_records[s]
+            self.Tablet.State.set_source_rgb(style.rgb)
+            self.Tablet.State.select_font_face(
                 style.typeface, Cairo_font_slant[style.slant], Cairo_font_weight[style.weight]
             )
-            self.Tablet.Context.set_font_size(style.size)
-            self.Tablet.Context.move_to(t.lower_left.x, t.lower_left.y)
-            self.Tablet.Context.show_text(t.text)
+            self.Tablet.State.set_font_size(style.size)
+            self.Tablet.Context.move_to(x, y)
+            self.Tablet.Context.show_text(text)
+
+    def set_line_style(self, style: int):
+        """Set the dash pattern, color and width of a resolved line style"""
+        record = StyleDB.line_records[style]
+        self.Tablet.State.set_dash(record.dash)  # If the dash is [], line will be solid
+        self.Tablet.State.set_source_rgb(record.rgb)
+        self.Tablet.State.set_line_width(record.width)
 
     def render_line_segments(self):
         """Draw the line segments"""
-        for l in self.Line_segments:
-            # Set the dash pattern
-            pname = StyleDB.line_style[l.style].pattern  # name of line style's pattern
-            pvalue = StyleDB.dash_pattern[pname]  # find pattern value in dash pattern dict
-            self.Tablet.Context.set_dash(pvalue)  # If pvalue is [], line will be solid
-            # Set color and width
-            cname = StyleDB.line_style[l.style].color
-            c = StyleDB.rgbF[cname]
-            self.Tablet.Context.set_source_rgb(*c)
-            w = StyleDB.line_style[l.style].width
-            self.Tablet.Context.set_line_width(w)
+        if Layer.Batch_strokes:
+            self.render_line_segments_batched()
+            return
+        c = self.Line_segments.Columns
+        for x0, y0, x1, y1, style in zip(
+                c['from_here_x'], c['from_here_y'], c['to_there_x'], c['to_there_y'], c['style']):
+            self.set_line_style(style)
             # Set line segment and draw
-            self.Tablet.Context.move_to(*l.from_here)
-            self.Tablet.Context.line_to(*l.to_there)
+            self.Tablet.Context.move_to(x0, y0)
+            self.Tablet.Context.line_to(x1, y1)
+            self.Tablet.Context.stroke()
+
+    def render_line_segments_batched(self):
+        """
+        Draw all line segments of the same style as a single path with one stroke. A segment that starts where
+        the previous one ended, as with the segments of an open polygon, continues the same polyline.
+        """
+        c = self.Line_segments.Columns
+        x0, y0, x1, y1 = c['from_here_x'], c['from_here_y'], c['to_there_x'], c['to_there_y']
+        by_style = {}  # Dictionaries keep the order in which each style first appears
+        for i, style in enumerate(c['style']):
+            by_style.setdefault(style, []).append(i)
+        for style, segments in by_style.items():
+            self.set_line_style(style)
+            end = None  # End of the polyline we are drawing, if any
+            for i in segments:
+                if (x0[i], y0[i]) != end:
+                    self.Tablet.Context.move_to(x0[i], y0[i])
+                self.Tablet.Context.line_to(x1[i], y1[i])
+                end = x1[i], y1[i]
             self.Tablet.Context.stroke()
 
     def render_circles(self):
         """Draw the circle shapes"""
         for c in self.Circles:
-            # Set the dash pattern
-            pname = StyleDB.line_style[c.border_style].pattern  # name of border line style's pattern
-            pvalue = StyleDB.dash_pattern[pname]  # find pattern value in dash pattern dict
-            self.Tablet.Context.set_dash(pvalue)  # If pvalue is [], line will be solid
-            # Set color and width
-            line_color_name = StyleDB.line_style[c.border_style].color
-            line_rgb_color_value = StyleDB.rgbF[line_color_name]
-            fill_rgb_color_value = None if not c.fill else StyleDB.rgbF[c.fill]
-            w = StyleDB.line_style[c.border_style].width
-            self.Tablet.Context.set_line_width(w)
+            border = StyleDB.line_records[c.border_style]
+            self.Tablet.State.set_dash(border.dash)  # If the dash is [], line will be solid
+            self.Tablet.State.set_line_width(border.width)
             self.Tablet.Context.arc(c.center.x, c.center.y, c.radius, 0, 2*math.pi)
             if c.fill:
-                self.Tablet.Context.set_source_rgb(*fill_rgb_color_value)
+                self.Tablet.State.set_source_rgb(c.fill)
                 self.Tablet.Context.fill_preserve()
-            self.Tablet.Context.set_source_rgb(*line_rgb_color_value)
+            self.Tablet.State.set_source_rgb(border.rgb)
             self.Tablet.Context.stroke()
 
     def render_rects(self):
         """Draw the rectangle shapes"""
         for r in self.Rectangles:
-            # Set the dash pattern
-            pname = StyleDB.line_style[r.border_style].pattern  # name of border line style's pattern
-            pvalue = StyleDB.dash_pattern[pname]  # find pattern value in dash pattern dict
-            self.Tablet.Context.set_dash(pvalue)  # If pvalue is [], line will be solid
-            # Set color and width
-            line_color_name = StyleDB.line_style[r.border_style].color
-            line_rgb_color_value = StyleDB.rgbF[line_color_name]
-            fill_rgb_color_value = None if not r.fill else StyleDB.rgbF[r.fill]
-            w = StyleDB.line_style[r.border_style].width
-            self.Tablet.Context.set_line_width(w)
+            border = StyleDB.line_records[r.border_style]
+            self.Tablet.State.set_dash(border.dash)  # If the dash is [], line will be solid
+            self.Tablet.State.set_line_width(border.width)
             # Set rectangle extents and draw
             top_radius = r.radius if r.top else 0
             bottom_radius = r.radius if r.bottom else 0
@@ -445,41 +573,35 @@ class Layer:
                        r.upper_left.x, r.upper_left.y, r.size.width, r.size.height,
                        top_radius, bottom_radius )
             if r.fill:
-                self.Tablet.Context.set_source_rgb(*fill_rgb_color_value)
+                self.Tablet.State.set_source_rgb(r.fill)
                 self.Tablet.Context.fill_preserve()
-            self.Tablet.Context.set_source_rgb(*line_rgb_color_value)
+            self.Tablet.State.set_source_rgb(border.rgb)
             self.Tablet.Context.stroke()
 
     def render_polygons(self):
         """Draw the closed non-rectangular shapes"""
         for p in self.Polygons:
-            pattern_name = StyleDB.line_style[p.border_style].pattern  # name of border line style's pattern
-            pattern_value = StyleDB.dash_pattern[pattern_name]  # find pattern value in dash pattern dict
-            self.Tablet.Context.set_dash(pattern_value)  # If pattern_value is [], line will be solid
-            # Set color and width
-            line_color_name = StyleDB.line_style[p.border_style].color
-            line_rgb_color_value = StyleDB.rgbF[line_color_name]
-            fill_rgb_color_value = StyleDB.rgbF[p.fill]
-            w = StyleDB.line_style[p.border_style].width
-            self.Tablet.Context.set_line_width(w)
+            border = StyleDB.line_records[p.border_style]
+            self.Tablet.State.set_dash(border.dash)  # If the dash is [], line will be solid
+            self.Tablet.State.set_line_width(border.width)
             # Draw a closed polygon
             self.Tablet.Context.move_to(*p.vertices[0])  # Start drawing here
             for v in p.vertices[1:]:
                 self.Tablet.Context.line_to(*v)
             self.Tablet.Context.close_path()
-            self.Tablet.Context.set_source_rgb(*fill_rgb_color_value)
+            self.Tablet.State.set_source_rgb(p.fill)
             self.Tablet.Context.fill_preserve()
-            self.Tablet.Context.set_source_rgb(*line_rgb_color_value)
+            self.Tablet.State.set_source_rgb(border.rgb)
             self.Tablet.Context.stroke()
 
     def render_images(self):
         """Render all images"""
         for i in self.Images:
-            try:
-                image_surface = cairo.ImageSurface.create_from_png(i.resource_path)
-            except cairo.Error:
-                self.logger.warning(f"Cannot locate png image file: [{i.resource_path}] -- Skipping")
+            # Decoded images are shared across diagrams
+            image_surface = ImageCache.image(i.resource_path, fit=i.size if Layer.Fit_images else None)
+            if not image_surface:
                 continue
             self.Tablet.Context.set_source_surface(image_surface, i.upper_left.x, i.upper_left.y)
+            self.Tablet.State.forget('set_source_rgb')
             self.Tablet.Context.paint()
 
@@ -3,10 +3,12 @@ presentation.py – Presentation class in Drawing domain
 """
 import logging
 from flatland.database.flatlanddb import FlatlandDB as fdb
+from flatland.database.snapshot import Snapshot
+from flatland.drawing_domain.styledb import StyleDB
 from sqlalchemy import select, and_
 from collections import namedtuple
 
-CornerSpec = namedtuple('Corner_Spec', 'radius top bottom')
+CornerSpec = namedtuple('CornerSpec', 'radius top bottom')
 
 class Presentation:
     """
@@ -29,11 +31,31 @@ class Presentation:
         self.Shape_presentation = {}
         self.Closed_shape_fill = {}
         self.Corner_spec = {}
+        self.Line_record = {}  # Index of each shape asset's resolved line style
+        self.Text_record = {}  # Index of each text asset's resolved text style
 
         # Load Asset Presentations for all Assets in this Presentation
-        self.logger.info(f"Loading assets for Presentation [{self.Name}]")
-        self.load_text_presentations()
-        self.load_shape_presentations()
+        assets = Snapshot.lookup('Presentation', (self.Name, self.Drawing_type))
+        if assets:
+            (self.Text_presentation, self.Underlays, self.Shape_presentation,
+             self.Closed_shape_fill, self.Corner_spec) = assets
+        else:
+            self.logger.info(f"Loading assets for Presentation [{self.Name}]")
+            self.load_text_presentations()
+            self.load_shape_presentations()
+        self.resolve_styles()
+
+    def resolve_styles(self):
+        """
+        Resolve the style of each Asset into a render record once, now, rather than every time an Asset is drawn
+        """
+        self.Line_record = {a: StyleDB.line_record(s) for a, s in self.Shape_presentation.items()}
+        self.Text_record = {a: StyleDB.text_record(s) for a, s in self.Text_presentation.items()}
+
+    def compiled(self) -> tuple:
+        """All Asset Presentations, for the database snapshot"""
+        return (self.Text_presentation, self.Underlays, self.Shape_presentation,
+                self.Closed_shape_fill, self.Corner_spec)
 
     def load_text_presentations(self):
         """
@@ -0,0 +1,68 @@
+"""
+render_state.py – Tracks the graphics state of a cairo context so that redundant state changes are skipped
+"""
+
+
+class RenderState:
+    """
+    Remembers the dash pattern, color, line width and font last set on a cairo context so that each is only
+    set again when an element actually needs something different. Consecutive elements usually share a style,
+    and every redundant state change would otherwise end up in the output content stream.
+
+    Anything that changes the context state without going through us must call forget() for that state.
+
+        Attributes
+
+        - Context -- The cairo context we are tracking
+        - Current -- Value last set for each kind of state, None if unknown
+        - Changed -- Number of state changes passed on to the context
+        - Elided -- Number of state changes skipped since the state was already set
+    """
+
+    def __init__(self, context):
+        """
+        Constructor
+
+        :param context: A new cairo context
+        """
+        self.Context = context
+        self.Current = {}
+        self.Changed = 0
+        self.Elided = 0
+
+    def change(self, state: str, value) -> bool:
+        """Is value different from the current state? If so, it becomes the current state"""
+        if self.Current.get(state) == value:
+            self.Elided += 1
+            return False
+        self.Current[state] = value
+        self.Changed += 1
+        return True
+
+    def forget(self, state: str):
+        """
+        The state was changed directly on the context, so we don't know what it is anymore
+
+        :param state: Name of the cairo context setter, like 'set_source_rgb'
+        """
+        self.Current.pop(state, None)
+
+    def set_dash(self, pattern):
+        if self.change('set_dash', pattern):
+            self.Context.set_dash(pattern)
+
+    def set_source_rgb(self, rgb):
+        if self.change('set_source_rgb', rgb):
+            self.Context.set_source_rgb(*rgb)
+
+    def set_line_width(self, width: float):
+        if self.change('set_line_width', width):
+            self.Context.set_line_width(width)
+
+    def select_font_face(self, typeface: str, slant, weight):
+        if self.change('select_font_face', (typeface, slant, weight)):
+            self.Context.select_font_face(typeface, slant, weight)
+
+    def set_font_size(self, size: float):
+        if self.change('set_font_size', size):
+            self.Context.set_font_size(size)
@@ -3,6 +3,7 @@ styledb.py - Loads styles from the flatland database common to all Presentations
 """
 import logging
 from flatland.database.flatlanddb import FlatlandDB as fdb
+from flatland.database.snapshot import Snapshot
 from sqlalchemy import select
 from collections import namedtuple
 
@@ -10,6 +11,10 @@ Float_RGB = namedtuple('Float_RGB', 'R G B')
 Line_Style = namedtuple('Line_Style', 'pattern width color')
 Text_Style = namedtuple('Text_Style', 'typeface size slant weight color spacing')
 Dash_Pattern = namedtuple('Dash_Pattern', 'solid blank')
+Line_Record = namedtuple('Line_Record', 'dash rgb width')
+"""A line style with its dash pattern and color resolved, ready to render"""
+Text_Record = namedtuple('Text_Record', 'typeface slant weight size rgb')
+"""A text style with its typeface and color resolved, ready to render"""
 
 def report_colors():
     colors = fdb.MetaData.tables['Color']
@@ -75,6 +80,10 @@ class StyleDB:
     Singleton class interface to the Presentation and Styles in the Flatland database. Created with an initial
     Presentation and loads all presentation/style data for that Presentation for easy access by
     the Tablet.
+
+    Each style used by a loaded Presentation is also resolved into a render record, so that drawing an
+    element takes one list index rather than a chain of lookups by name. Drawing elements refer to their
+    style by the index of its record.
     """
     rgbF = {}  # rgb color float representation
     dash_pattern = {}
@@ -82,6 +91,11 @@ class StyleDB:
     typeface = {}
     text_style = {}
     color_usage = {}
+    line_records = []  # Resolved line styles
+    line_record_index = {}  # Index of each line style name's record
+    text_records = []  # Resolved text styles
+    text_record_index = {}  # Index of each text style name's record
+    loaded = False  # Styles are loaded once and then shared by every Tablet created in this process
 
     def __init__(self, print_colors=False, rebuild=False):
         """
@@ -96,10 +110,48 @@ class StyleDB:
         if print_colors:
             # The user wants a list of avaialable colors
             report_colors()
-        else:
-            load_colors()
-            load_color_usages()
-            load_dash_patterns()
-            load_line_styles()
-            load_typefaces()
-            load_text_styles()
\ No newline at end of file
+        elif not StyleDB.loaded:
+            styles = Snapshot.lookup('StyleDB')
+            if styles:
+                # Already compiled into the database snapshot
+                for name, table in styles.items():
+                    setattr(StyleDB, name, table)
+            else:
+                load_colors()
+                load_color_usages()
+                load_dash_patterns()
+                load_line_styles()
+                load_typefaces()
+                load_text_styles()
+            StyleDB.loaded = True
+
+    @staticmethod
+    def line_record(name: str) -> int:
+        """Index of the render record for a line style, resolved the first time it is requested"""
+        i = StyleDB.line_record_index.get(name)
+        if i is None:
+            style = StyleDB.line_style[name]
+            i = len(StyleDB.line_records)
+            StyleDB.line_records.append(Line_Record(
+                dash=StyleDB.dash_pattern[style.pattern], rgb=StyleDB.rgbF[style.color], width=style.width))
+            StyleDB.line_record_index[name] = i
+        return i
+
+    @staticmethod
+    def text_record(name: str) -> int:
+        """Index of the render record for a text style, resolved the first time it is requested"""
+        i = StyleDB.text_record_index.get(name)
+        if i is None:
+            style = StyleDB.text_style[name]
+            i = len(StyleDB.text_records)
+            StyleDB.text_records.append(Text_Record(
+                typeface=style.typeface, slant=style.slant, weight=style.weight, size=style.size,
+                rgb=StyleDB.rgbF[style.color]))
+            StyleDB.text_record_index[name] = i
+        return i
+
+    @staticmethod
+    def compiled() -> dict:
+        """All loaded style tables by attribute name, for the database snapshot"""
+        return {name: getattr(StyleDB, name) for name in (
+            'rgbF', 'dash_pattern', 'line_style', 'typeface', 'text_style', 'color_usage')}
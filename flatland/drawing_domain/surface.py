@@ -0,0 +1,80 @@
+"""
+surface.py – The cairo surface for each kind of output a Tablet can render
+"""
+import math
+import cairo
+from pathlib import Path
+from flatland.datatypes.geometry_types import Rect_Size
+
+Output_formats = ('pdf', 'svg', 'png')
+"""Supported output formats, each named by its file extension"""
+Default_format = 'pdf'
+"""Used when the format can't be determined from the output file name"""
+points_per_inch = 72
+"""The Tablet draws in points. A pixel image has some other number of pixels per inch (dpi)"""
+
+
+def format_of(output_file) -> str:
+    """
+    Choose an output format by the extension of the output file name
+
+    :param output_file: A file name or a binary stream
+    :return: The output format, pdf if the extension isn't supported or there isn't one
+    """
+    if isinstance(output_file, (str, Path)):
+        ext = Path(output_file).suffix.lower().lstrip('.')
+        if ext in Output_formats:
+            return ext
+    return Default_format
+
+
+class OutputSurface:
+    """
+    A cairo surface in one of the Output_formats. Vector formats are written as they are drawn while
+    a png image is drawn in memory at the requested resolution and written out when finished.
+
+        Attributes
+
+        - Format -- One of the Output_formats
+        - Target -- A file name or a writable binary stream such as an io.BytesIO
+        - Dpi -- Pixels per inch for png output
+        - Surface -- The cairo surface
+    """
+
+    def __init__(self, target, fmt: str, size: Rect_Size, dpi: float):
+        """
+        Constructor
+
+        :param target: Output file name or binary stream
+        :param fmt: One of the Output_formats
+        :param size: Size of the Tablet in points
+        :param dpi: Pixels per inch when the output is an image
+        """
+        assert fmt in Output_formats, f"Unsupported output format: {fmt}"
+        self.Format = fmt
+        self.Target = str(target) if isinstance(target, Path) else target
+        self.Dpi = dpi
+        if fmt == 'pdf':
+            self.Surface = cairo.PDFSurface(self.Target, size.width, size.height)
+        elif fmt == 'svg':
+            self.Surface = cairo.SVGSurface(self.Target, size.width, size.height)
+        else:
+            scale = dpi / points_per_inch
+            self.Surface = cairo.ImageSurface(
+                cairo.FORMAT_ARGB32, math.ceil(size.width * scale), math.ceil(size.height * scale))
+
+    def context(self) -> cairo.Context:
+        """A new context for drawing on this surface in points"""
+        context = cairo.Context(self.Surface)
+        if self.Format == 'png':
+            # Start with white paper, like a pdf, rather than transparent pixels
+            context.set_source_rgb(1, 1, 1)
+            context.paint()
+            context.scale(self.Dpi / points_per_inch, self.Dpi / points_per_inch)
+        return context
+
+    def finish(self):
+        """Complete the output"""
+        if self.Format == 'png':
+            self.Surface.write_to_png(self.Target)
+        self.Surface.finish()
@@ -2,13 +2,18 @@
 tablet.py – Flatland binds a Canvas instance in the Flatland Application domain to a Tablet instance
 in the drawing domain. The Tablet can be drawn using cairo or some other graphics drawing framework.
 """
+import io
 import logging
+from contextlib import contextmanager
+from array import array
+from pathlib import Path
 from flatland.flatland_exceptions import NonSystemInitialLayer, TabletBoundsExceeded
-from flatland.datatypes.geometry_types import Rect_Size, Position
-import cairo
+from flatland.datatypes.geometry_types import Rect_Size, Position, Points
 from flatland.drawing_domain.styledb import StyleDB
 from flatland.drawing_domain.layer import Layer
-from typing import Optional
+from flatland.drawing_domain.render_state import RenderState
+from flatland.drawing_domain.surface import OutputSurface, format_of
+from typing import List, Optional, Sequence
 
 
 class Tablet:
@@ -47,18 +52,27 @@ class Tablet:
 
         - Size -- The size of the whatever surface (PDF, RGB, SVG, etc) Tablet supports.
         - Output_file -- A filename or output stream object to be output as a drawing
-        - PDF_sheet -- For now we only support PDF output as defined in Cairo.  So this is a Cairo surface
-        - Context -- A Cairo context object for drawing on the PDF sheet
+        - Output_format -- pdf, svg or png, normally chosen by the output file extension
+        - Sheet -- The OutputSurface we draw on, a cairo surface in the output format
+        - Context -- A Cairo context object for drawing on the sheet
+        - State -- Sets the graphics state of the Context only when it changes
+        - Also_formats -- Once rendered, replay the same layer draw lists to a file in each of these formats
+          next to the output file. Set for all Tablets from the command line.
+        - Dpi -- Resolution of png output in pixels per inch, also set from the command line
     """
+    Also_formats: List[str] = []
+    Dpi = 96
 
-    def __init__(self, size: Rect_Size, output_file, drawing_type: str, presentation: str, layer: str):
+    def __init__(self, size: Rect_Size, output_file, drawing_type: str, presentation: str, layer: str,
+                 output_format: Optional[str] = None):
         """
         Constructs a new Tablet instance
         :param size: Vertical and horizontal span of the entire draw surface in points
-        :param output_file: Name of the drawing file to be generated, PDF only for now
+        :param output_file: Name of the drawing file to be generated or a binary stream
         :param drawing_type: Type of drawing so we can determine what kinds text and graphics can be drawn
         :param presentation: The layer's Presentation to load
         :param layer: The initial layer to be created on this Tablet (usually 'diagram')
+        :param output_format: pdf, svg or png. By default, chosen by the output file extension
         """
         self.logger = logging.getLogger(__name__)
 
@@ -73,7 +87,7 @@ class Tablet:
         self.Presentations = {}  # Presentations loaded from the Flatland database, updated by Layer class
 
         if layer not in self.layer_order:
-            raise NonSystemInitialLayer
+            raise NonSystemInitialLayer(layer)
         self.layers = {layer: Layer(name=layer, tablet=self, presentation=presentation, drawing_type=drawing_type)}
         # Initialize the first layer at the indicated position. If the position is not in the system layer order
         # list, it will be placed as the topmost layer. Usually, though, the initial layer should be diagram
@@ -81,16 +95,28 @@ class Tablet:
         self.Drawing_type = drawing_type  # class diagram, state diagram, etc
         self.Size = size
         self.Output_file = output_file
-        self.PDF_sheet = cairo.PDFSurface(self.Output_file, self.Size.width, self.Size.height)
-        self.Context = cairo.Context(self.PDF_sheet)
+        self.Output_format = output_format or format_of(output_file)
+        self.Sheet = OutputSurface(self.Output_file, self.Output_format, self.Size, Tablet.Dpi)
+        self.Context = self.Sheet.context()
+        self.State = RenderState(self.Context)
 
-    def add_layer(self, name: str, presentation: str, drawing_type: str, fill: str = None) -> Optional[Layer]:
-        """Add a new layer if not already instantiated and return it"""
+    def add_layer(self, name: str, presentation: str, drawing_type: str, fill: str = None,
+                  cache_key: Optional[tuple] = None) -> Optional[Layer]:
+        """
+        Add a new layer if not already instantiated and return it
+
+        :param name: The Layer name
+        :param presentation: Presentation to be applied to the Layer
+        :param drawing_type: The Presentation's Drawing Type
+        :param fill: A color to fill the drawing area
+        :param cache_key: For a layer whose content is fully determined by some inputs, like the frame,
+                          those inputs so that the rendered layer can be reused (see Layer)
+        """
         if not self.layers.get(name):
             if name not in self.layer_order:
                 self.layer_order.append(name)
             self.layers[name] = Layer(name=name, tablet=self, presentation=presentation, drawing_type=drawing_type,
-                                      fill=fill)
+                                      fill=fill, cache_key=cache_key)
             return self.layers[name]
         else:
             self.logger.warning(f"Layer: [{name}] previously instantiated")
@@ -100,8 +126,62 @@ class Tablet:
         """
         Renders each instantiated layer of the Tablet moving up the z axis. Any uninstantiated layers are skipped.
         """
+        self.render_layers()
+        self.logger.info(f"Render state changes: {self.State.Changed}, skipped as redundant: {self.State.Elided}")
+        # Complete the output file now rather than whenever the surface happens to be garbage collected
+        self.Sheet.finish()
+        for fmt in Tablet.Also_formats:
+            if fmt == self.Output_format:
+                continue
+            if not isinstance(self.Output_file, (str, Path)):
+                self.logger.warning(f"Can't name a [{fmt}] file after an output stream -- Skipping")
+                continue
+            self.render_to(target=Path(self.Output_file).with_suffix('.' + fmt), fmt=fmt)
+
+    def render_layers(self):
+        """Render each instantiated layer in order onto the current Context"""
         [self.layers[name].render() for name in self.layer_order if self.layers.get(name)]
 
+    def render_to(self, target, fmt: str):
+        """
+        Replay all of the layer draw lists onto another output. Nothing is laid out again and text is
+        not measured again.
+
+        :param target: Output file name or binary stream
+        :param fmt: Output format
+        """
+        self.logger.info(f"Rendering [{fmt}] output")
+        sheet = OutputSurface(target, fmt, self.Size, Tablet.Dpi)
+        with self.drawing_on(sheet.context()):
+            self.render_layers()
+        sheet.finish()
+
+    @contextmanager
+    def drawing_on(self, context):
+        """
+        Temporarily direct all rendering to another cairo context. Text measurement afterward
+        uses the original context again.
+
+        :param context: A new cairo context
+        """
+        saved = self.Context, self.State
+        self.Context, self.State = context, RenderState(context)
+        try:
+            yield
+        finally:
+            self.Context, self.State = saved
+
+    def render_bytes(self, fmt: str) -> bytes:
+        """
+        Replay all of the layer draw lists into memory
+
+        :param fmt: Output format
+        :return: Content of the output file
+        """
+        output = io.BytesIO()
+        self.render_to(target=output, fmt=fmt)
+        return output.getvalue()
+
     def to_dc(self, tablet_coord: Position) -> Position:
         """
         To display coordinates – Convert tablet bottom_left origin coordinate to
@@ -113,6 +193,25 @@ class Tablet:
         assert tablet_coord.y >= 0, "Negative y value"
         return Position(x=tablet_coord.x, y=self.Size.height - tablet_coord.y)
 
+    def to_dc_all(self, tablet_coords: Sequence[Position]) -> Points:
+        """
+        To display coordinates – Convert many tablet coordinates at once, checking the whole batch
+        against the tablet bounds rather than point by point
+
+        :param tablet_coords: Positions with a bottom_left origin
+        :return: The converted x and y coordinate arrays in the same order
+        """
+        xs = array('d', [p.x for p in tablet_coords])
+        ys = array('d', [p.y for p in tablet_coords])
+        if not xs:
+            return Points(x=xs, y=ys)
+        if max(ys) > self.Size.height:
+            raise TabletBoundsExceeded
+        assert min(xs) >= 0, "Negative x value"
+        assert min(ys) >= 0, "Negative y value"
+        height = self.Size.height
+        return Points(x=xs, y=array('d', [height - y for y in ys]))
+
     def __repr__(self):
         return f'Size: {self.Size}, Dtype: {self.Drawing_type},' \
                f'Output: {self.Output_file}'
@@ -0,0 +1,144 @@
+"""
+text_metrics.py – Process wide cache of measured text line extents
+"""
+import json
+import logging
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from typing import Optional
+from flatland.datatypes.geometry_types import Rect_Size
+from flatland import version
+
+Metrics_Stats = namedtuple('Metrics_Stats', 'hits misses entries evictions')
+"""Text Metrics cache usage since the cache was last cleared"""
+
+
+def metrics_key(style, text: str) -> tuple:
+    """
+    Only the typeface, size, slant and weight of a Text Style affect the ink extent of a text line, so
+    two styles that differ only in color or spacing share the same measurements
+
+    :param style: A Text_Style named tuple from the StyleDB
+    :param text: A line of text
+    :return: Cache key
+    """
+    return style.typeface, style.size, style.slant, style.weight, text
+
+
+class TextMetrics:
+    """
+    Singleton class holding the measured extent of every line of text requested by any Layer on any Tablet.
+    Nodes, Compartments, Stems and Frames ask for the size of the same text lines over and over as the
+    Grid and Connectors are laid out, so we only ask the graphics library once for each (style, text) pair.
+
+    The cache is a bounded least recently used dictionary. It can optionally be saved to and loaded from
+    a file in the user's flatland home so that measurements survive between runs. Since measurements depend
+    on the fonts installed on the user's system, just delete the file if fonts are changed.
+
+        Attributes
+
+        - Max_entries -- Least recently used entries are discarded beyond this limit
+        - File -- Default location of the persisted cache
+        - Entries -- Measured text sizes keyed by (typeface, size, slant, weight, text)
+        - Hits, Misses, Evictions -- Usage statistics
+    """
+    Max_entries = 50000
+    File = Path.home() / '.flatland' / 'cache' / 'text_metrics.json'
+    Entries = OrderedDict()
+    Hits = 0
+    Misses = 0
+    Evictions = 0
+
+    @staticmethod
+    def lookup(style, text: str) -> Optional[Rect_Size]:
+        """
+        Returns the cached size of a text line or None if it hasn't been measured yet
+
+        :param style: A Text_Style named tuple
+        :param text: A line of text
+        :return: Size of the text line ink area, if known
+        """
+        key = metrics_key(style, text)
+        size = TextMetrics.Entries.get(key)
+        if size is None:
+            TextMetrics.Misses += 1
+            return None
+        TextMetrics.Hits += 1
+        TextMetrics.Entries.move_to_end(key)  # Most recently used
+        return size
+
+    @staticmethod
+    def store(style, text: str, size: Rect_Size):
+        """
+        Record a measured text line size, discarding the least recently used entry if we are full
+
+        :param style: A Text_Style named tuple
+        :param text: A line of text
+        :param size: Its measured ink area
+        """
+        TextMetrics.Entries[metrics_key(style, text)] = size
+        while len(TextMetrics.Entries) > TextMetrics.Max_entries:
+            TextMetrics.Entries.popitem(last=False)
+            TextMetrics.Evictions += 1
+
+    @staticmethod
+    def stats() -> Metrics_Stats:
+        """Cache usage statistics"""
+        return Metrics_Stats(hits=TextMetrics.Hits, misses=TextMetrics.Misses,
+                             entries=len(TextMetrics.Entries), evictions=TextMetrics.Evictions)
+
+    @staticmethod
+    def clear():
+        """Discard all entries and reset the statistics"""
+        TextMetrics.Entries.clear()
+        TextMetrics.Hits = 0
+        TextMetrics.Misses = 0
+        TextMetrics.Evictions = 0
+
+    @staticmethod
+    def load(path: Optional[Path] = None) -> int:
+        """
+        Load previously saved measurements. A missing, unreadable or out of date file is ignored.
+
+        :param path: Cache file, the default File if not specified
+        :return: Number of entries loaded
+        """
+        logger = logging.getLogger(__name__)
+        path = path if path else TextMetrics.File
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            logger.info(f"No usable text metrics cache at: [{path}]")
+            return 0
+        if saved.get('version') != version:
+            logger.info(f"Ignoring text metrics cache saved by flatland version [{saved.get('version')}]")
+            return 0
+        for typeface, size, slant, weight, text, height, width in saved.get('entries', []):
+            TextMetrics.Entries[(typeface, size, slant, weight, text)] = Rect_Size(height=height, width=width)
+        while len(TextMetrics.Entries) > TextMetrics.Max_entries:
+            TextMetrics.Entries.popitem(last=False)
+        logger.info(f"Loaded {len(TextMetrics.Entries)} text metrics from: [{path}]")
+        return len(TextMetrics.Entries)
+
+    @staticmethod
+    def save(path: Optional[Path] = None):
+        """
+        Save all measurements so that they can be loaded on the next run
+
+        :param path: Cache file, the default File if not specified
+        """
+        logger = logging.getLogger(__name__)
+        path = path if path else TextMetrics.File
+        entries = [[*k, s.height, s.width] for k, s in TextMetrics.Entries.items()]
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that an interrupted save can't leave a corrupt cache behind
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump({'version': version, 'entries': entries}, f)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not save text metrics cache to: [{path}] ({e})")
+            return
+        logger.info(f"Saved {len(entries)} text metrics to: [{path}]")
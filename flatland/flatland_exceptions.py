@@ -32,7 +32,46 @@ class UnknownSheetGroup(FlatlandDBException):
     pass
 
 class NonSystemInitialLayer(FlatlandException):
-    pass
+    def __init__(self, layer):
+        self.layer = layer
+
+    def __str__(self):
+        return f'{pre}Initial layer "{self.layer}" not found in Tablet layer order{post}'
+
+class OutsideTabletDrawArea(FlatlandDrawException):
+    def __init__(self, detail):
+        self.detail = detail
+
+    def __str__(self):
+        return f'{pre}{self.detail} outside of tablet draw area{post}'
+
+class UndefinedColor(FlatlandUserInputException):
+    def __init__(self, color):
+        self.color = color
+
+    def __str__(self):
+        return f'{pre}Fill color "{self.color}" not defined in system or user configuration{post}'
+
+class MissingMetadata(FlatlandUserInputException):
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return f'{pre}No metadata value supplied for: "{self.name}"{post}'
+
+class TernaryStemMissesConnector(FlatlandUserInputException):
+    def __init__(self, connector):
+        self.connector = connector
+
+    def __str__(self):
+        return f'{pre}Ternary stem does not intersect binary connector "{self.connector}"{post}'
+
+class LayoutModelMismatch(FlatlandUserInputException):
+    def __init__(self, detail):
+        self.detail = detail
+
+    def __str__(self):
+        return f'{pre}{self.detail}{post}'
 
 class LayoutParseError(FlatlandUserInputException):
     def __init__(self, layout_file, e):
@@ -153,6 +192,28 @@ class LayoutFileEmpty(FlatlandIOException):
     def __str__(self):
         return f'{pre}For some reason, nothing was read from the diagram layout file: "{self.path}"{post}'
 
+class BatchManifestOpen(FlatlandIOException):
+    def __init__(self, path):
+        self.path = path
+
+    def __str__(self):
+        return f'{pre}Cannot read this batch manifest file or directory: "{self.path}"{post}'
+
+class BatchManifestEntry(FlatlandUserInputException):
+    def __init__(self, path, line):
+        self.path = path
+        self.line = line
+
+    def __str__(self):
+        return f'{pre}Batch manifest "{self.path}" entry must be: model layout [diagram], not "{self.line}"{post}'
+
+class UnsupportedModelType(FlatlandUserInputException):
+    def __init__(self, path):
+        self.path = path
+
+    def __str__(self):
+        return f'{pre}Model file must end with .xmm, .xcm or .xsm: "{self.path}"{post}'
+
 class LayoutFileOpen(FlatlandIOException):
     def __init__(self, path):
         self.path = path
@@ -228,14 +289,14 @@ class UnsupportedConnectorType(FlatlandException):
         return f'Connector Type: "{self.connector_type_name}" is not defined for Diagram Type: "{self.diagram_type_name}"'
 
 
-class StemNameOutOfBounds(FlatlandException):
-    def __init__(self, text: str, x_value: float, y_value: float):
-        self.name = text
-        self.x_value = x_value
-        self.y_value = y_value
+class StemNameOutOfBounds(FlatlandUserInputException):
+    def __init__(self, text: str, connector: str):
+        self.text = text
+        self.connector = connector
 
     def __str__(self):
-        return f'Object [{self.object_type}] outside of diagram bounds at x:{self.x_value}, y:{self.y_value}'
+        return f'{pre}Stem text "{self.text}" out of bounds on connector "{self.connector}"' \
+               f'\n\tConsider wrapping name across more lines of text or move it to the other side of the stem{post}'
 
 class OutofDiagramBounds(FlatlandException):
     def __init__(self, object_type: str, x_value: float, y_value: float):
@@ -259,12 +320,22 @@ class NotationUnsupportedForDiagramType(FlatlandException):
     pass
 
 
-class SheetWidthExceededFE(FlatlandException):
-    pass
+class SheetWidthExceededFE(FlatlandUserInputException):
+    def __init__(self, excess, col):
+        self.excess = excess
+        self.col = col
 
+    def __str__(self):
+        return f'{pre}Max diagram width exceeded by {self.excess}pt at col {self.col}{post}'
 
-class SheetHeightExceededFE(FlatlandException):
-    pass
+
+class SheetHeightExceededFE(FlatlandUserInputException):
+    def __init__(self, excess, row):
+        self.excess = excess
+        self.row = row
+
+    def __str__(self):
+        return f'{pre}Max diagram height exceeded by {self.excess}pt at row {self.row}{post}'
 
 
 class CellOccupiedFE(FlatlandException):
@@ -280,12 +351,12 @@ class UnsupportedNodeType(FlatlandException):
         return f'Node Type: {self.node_type_name} is not defined for Diagram Type: {self.diagram_type_name}'
 
 
-class UnknownSheetSize(FlatlandException):
+class UnknownSheetSize(FlatlandUserInputException):
     def __init__(self, sheet_name):
         self.sheet_name = sheet_name
 
     def __str__(self):
-        return f'Sheet: {self.sheet_name} is not defined'
+        return f'{pre}Unsupported sheet size "{self.sheet_name}"{post}'
 
 
 class CellOutofBounds:
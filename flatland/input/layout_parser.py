@@ -3,7 +3,7 @@
 from flatland.flatland_exceptions import LayoutGrammarFileOpen, LayoutFileOpen, LayoutFileEmpty, LayoutParseError
 from flatland.input.layout_visitor import LayoutVisitor
 from arpeggio import visit_parse_tree, NoMatch
-from arpeggio.cleanpeg import ParserPEG
+from flatland.input.parser_cache import compiled_parser
 from pathlib import Path
 import os
 from collections import namedtuple
@@ -30,12 +30,13 @@ class LayoutParser:
     root_rule_name = "diagram_layout"
     layout_dir = Path(__file__).parent.parent / "examples" / "layouts"
 
-    def __init__(self, layout_file_path, debug=True):
+    def __init__(self, layout_file_path, debug=True, layout_text=None):
         """
         Constructor
 
         :param layout_file_path: Where to find the user supplied layout file
         :param debug: Debug flag
+        :param layout_text: Layout text to parse instead of reading the layout file, which then only names the layout
         """
         self.debug = debug
         self.layout_file_path = layout_file_path
@@ -47,10 +48,13 @@ class LayoutParser:
             raise LayoutGrammarFileOpen(LayoutParser.grammar_file)
 
         # Read the layout file
-        try:
-            self.layout_text = nocomment(open(self.layout_file_path, 'r').read())
-        except OSError as e:
-            raise LayoutFileOpen(self.layout_file_path)
+        if layout_text is not None:
+            self.layout_text = nocomment(layout_text)
+        else:
+            try:
+                self.layout_text = nocomment(open(self.layout_file_path, 'r').read())
+            except OSError as e:
+                raise LayoutFileOpen(self.layout_file_path)
 
         if not self.layout_text:
             raise LayoutFileEmpty(self.layout_file_path)
@@ -62,7 +66,7 @@ class LayoutParser:
         """
         # Create an arpeggio parser for our model grammar that does not eliminate whitespace
         # We interpret newlines and indents in our grammar, so whitespace must be preserved
-        parser = ParserPEG(self.layout_grammar, LayoutParser.root_rule_name, skipws=False, debug=self.debug)
+        parser = compiled_parser(self.layout_grammar, LayoutParser.root_rule_name, debug=self.debug)
         # Now create an abstract syntax tree from our layout text
         try:
             parse_tree = parser.parse(self.layout_text)
@@ -4,7 +4,7 @@ from flatland.flatland_exceptions import ModelGrammarFileOpen, ModelInputFileOpe
 from flatland.flatland_exceptions import ModelParseError
 from flatland.input.model_visitor import SubsystemVisitor
 from arpeggio import visit_parse_tree, NoMatch
-from arpeggio.cleanpeg import ParserPEG
+from flatland.input.parser_cache import compiled_parser
 from collections import namedtuple
 from flatland.input.nocomment import nocomment
 import os
@@ -29,12 +29,13 @@ class ModelParser:
     root_rule_name = 'subsystem'  # We don't draw a diagram larger than a single subsystem
     xuml_model_dir = Path(__file__).parent.parent / "examples" / "xuml_models"
 
-    def __init__(self, model_file_path, debug=True):
+    def __init__(self, model_file_path, debug=True, model_text=None):
         """
         Constructor
 
         :param model_file_path:  Where to find the user supplied model input file
         :param debug:  Debug flag
+        :param model_text:  Model text to parse instead of reading the model file, which then only names the model
         """
         self.debug = debug
         self.model_file_path = model_file_path
@@ -46,10 +47,13 @@ class ModelParser:
             raise ModelGrammarFileOpen(ModelParser.grammar_file)
 
         # Read the model file
-        try:
-            self.model_text = nocomment(open(self.model_file_path, 'r').read())
-        except OSError as e:
-            raise ModelInputFileOpen(self.model_file_path)
+        if model_text is not None:
+            self.model_text = nocomment(model_text)
+        else:
+            try:
+                self.model_text = nocomment(open(self.model_file_path, 'r').read())
+            except OSError as e:
+                raise ModelInputFileOpen(self.model_file_path)
 
         if not self.model_text:
             raise ModelInputFileEmpty(self.model_file_path)
@@ -61,7 +65,7 @@ class ModelParser:
         """
         # Create an arpeggio parser for our model grammar that does not eliminate whitespace
         # We interpret newlines and indents in our grammar, so whitespace must be preserved
-        parser = ParserPEG(self.model_grammar, ModelParser.root_rule_name, skipws=False, debug=self.debug)
+        parser = compiled_parser(self.model_grammar, ModelParser.root_rule_name, debug=self.debug)
         # Now create an abstract syntax tree from our model text
         try:
             parse_tree = parser.parse(self.model_text)
@@ -0,0 +1,115 @@
+"""
+parser_cache.py – Compiled grammars shared by every parser in the process and, optionally, across runs
+"""
+import sys
+import pickle
+import hashlib
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from arpeggio.cleanpeg import ParserPEG
+
+
+class ParserCache:
+    """
+    Singleton class holding each arpeggio parser compiled from a grammar. Compiling a PEG grammar costs
+    much more than parsing a typical model or layout file, so we compile each grammar only once and reuse it
+    for every file parsed in the process.
+
+    Parsers are keyed by a hash of the grammar text, the root rule and the arpeggio version, so an edited
+    grammar file is simply compiled again. When Persist is set, compiled parsers are also pickled into
+    the user's flatland home and loaded on the next run instead of being compiled.
+
+        Attributes
+
+        - Parsers -- Compiled parsers keyed by grammar hash
+        - Directory -- Where persisted parsers are saved
+        - Persist -- Load and save compiled parsers in the Directory
+        - Compiled, Loaded, Reused -- Usage statistics
+    """
+    Parsers = {}
+    Directory = Path.home() / '.flatland' / 'cache' / 'parsers'
+    Persist = False
+    Compiled = 0
+    Loaded = 0
+    Reused = 0
+
+    @staticmethod
+    def key(grammar: str, root_rule_name: str) -> str:
+        """Hash of everything that determines the compiled parser"""
+        import arpeggio
+        h = hashlib.sha256()
+        for part in (grammar, root_rule_name, arpeggio.__version__):
+            h.update(part.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    @staticmethod
+    def clear():
+        """Discard all compiled parsers in the process and reset the statistics"""
+        ParserCache.Parsers.clear()
+        ParserCache.Compiled = 0
+        ParserCache.Loaded = 0
+        ParserCache.Reused = 0
+
+    @staticmethod
+    def load(key: str):
+        """Returns a previously saved parser or None"""
+        try:
+            with open(ParserCache.Directory / f'{key}.pickle', 'rb') as f:
+                parser = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        parser.file = sys.stdout  # Where arpeggio prints debug output, can't be pickled
+        return parser
+
+    @staticmethod
+    def save(key: str, parser: 'ParserPEG'):
+        """Save a compiled parser, ignoring any failure since we can always compile again"""
+        logger = logging.getLogger(__name__)
+        path = ParserCache.Directory / f'{key}.pickle'
+        output = parser.file
+        parser.file = None
+        try:
+            ParserCache.Directory.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'wb') as f:
+                pickle.dump(parser, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+            logger.warning(f"Could not save compiled parser to: [{path}] ({e})")
+        finally:
+            parser.file = output
+
+
+def compiled_parser(grammar: str, root_rule_name: str, debug: bool = False) -> 'ParserPEG':
+    """
+    Returns an arpeggio parser for the grammar, compiling it only if we haven't seen it before.
+    Whitespace is not skipped since we interpret newlines and indents in all of our grammars.
+
+    :param grammar: PEG grammar text with comments already removed
+    :param root_rule_name: Name of the top level grammar element
+    :param debug: A debug parser writes dot files, so it is always compiled fresh and never cached
+    :return: A parser ready to parse any input
+    """
+    # Arpeggio is imported here so that just reporting cache statistics doesn't load it
+    from arpeggio.cleanpeg import ParserPEG
+    if debug:
+        return ParserPEG(grammar, root_rule_name, skipws=False, debug=True)
+    key = ParserCache.key(grammar, root_rule_name)
+    parser = ParserCache.Parsers.get(key)
+    if parser:
+        ParserCache.Reused += 1
+        return parser
+    parser = ParserCache.load(key) if ParserCache.Persist else None
+    if parser:
+        ParserCache.Loaded += 1
+    else:
+        parser = ParserPEG(grammar, root_rule_name, skipws=False, debug=False)
+        ParserCache.Compiled += 1
+        if ParserCache.Persist:
+            ParserCache.save(key, parser)
+    ParserCache.Parsers[key] = parser
+    return parser
@@ -12,7 +12,7 @@ from flatland.input.model_parser import ModelParser
 from collections import namedtuple
 from flatland.input.nocomment import nocomment
 from flatland.text.text_block import TextBlock
-from arpeggio.cleanpeg import ParserPEG
+from flatland.input.parser_cache import compiled_parser
 from arpeggio import visit_parse_tree, NoMatch
 from collections import namedtuple
 from flatland.masl.attr_visitor import AttrVisitor
@@ -35,7 +35,7 @@ class attr_parser:
             self.attr_grammar = nocomment(open(grammar_file, 'r').read())
         except OSError as e:
             raise ModelGrammarFileOpen(grammar_file)
-        self.parser = ParserPEG(self.attr_grammar, self.root_rule_name, skipws=False, debug=False)
+        self.parser = compiled_parser(self.attr_grammar, self.root_rule_name)
 
     def parse_attr(self, attr_text):
         try:
@@ -5,7 +5,7 @@ This is the Flatland (and not the cairo) Canvas class
 """
 import sys
 import logging
-from flatland.flatland_exceptions import InvalidOrientation, NonSystemInitialLayer
+from flatland.flatland_exceptions import InvalidOrientation
 from flatland.node_subsystem.diagram_layout_specification import DiagramLayoutSpecification
 from flatland.connector_subsystem.connector_layout_specification import ConnectorLayoutSpecification
 from flatland.datatypes.geometry_types import Rect_Size, Padding
@@ -13,7 +13,7 @@ from flatland.node_subsystem.diagram import Diagram
 from flatland.drawing_domain.tablet import Tablet
 from flatland.sheet_subsystem.sheet import Sheet, Group
 from flatland.decoration_subsystem.symbol import Symbol
-from typing import Dict
+from typing import Dict, Optional
 
 # All sheet and canvas related constants are kept together here for easy review and editing
 points_in_cm = 28.3465
@@ -42,7 +42,7 @@ class Canvas:
 
     def __init__(self, diagram_type: str, presentation: str, notation: str, standard_sheet_name: str, orientation: str,
                  diagram_padding: Dict[str, int], show_grid: bool, color: str,
-                 no_color: bool, drawoutput=sys.stdout.buffer):
+                 no_color: bool, drawoutput=sys.stdout.buffer, output_format: Optional[str] = None):
         """
         Constructor
 
@@ -52,6 +52,7 @@ class Canvas:
         :param standard_sheet_name: A US or international printer sheet size such as A1, tabloid, letter
         :param orientation: portrait or landscape
         :param drawoutput: A standard IO binary object obtained from sys
+        :param output_format: pdf, svg or png. By default, chosen by the drawoutput file extension
         """
         self.logger = logging.getLogger(__name__)
         # Load layout specifications
@@ -77,22 +78,19 @@ class Canvas:
 
         # Create the one and only Tablet instance and initialize it with the Presentation on the diagram
         # Layer
-        try:
-            self.Tablet = Tablet(
-                size=self.Size, output_file=drawoutput,
-                # Drawing types include notation such as 'xUML class diagram' since notation affects the choice
-                # of shape and text styles.  An xUML class diagram association class stem is dashed, for example.
-                drawing_type=' '.join([notation, diagram_type, 'diagram']), presentation=presentation,
-                layer='diagram'
-            )
-        except NonSystemInitialLayer:
-            self.logger.exception("Initial layer [diagram] not found in Tablet layer order")
-            sys.exit(1)
+        self.Tablet = Tablet(
+            size=self.Size, output_file=drawoutput,
+            # Drawing types include notation such as 'xUML class diagram' since notation affects the choice
+            # of shape and text styles.  An xUML class diagram association class stem is dashed, for example.
+            drawing_type=' '.join([notation, diagram_type, 'diagram']), presentation=presentation,
+            layer='diagram', output_format=output_format
+        )
 
         if not no_color:
             # The user has not disabled the colored background on the command line
+            # Every sheet of the same size and color looks the same, so its layer is drawn once and replayed
             self.Tablet.add_layer(name="sheet", presentation=presentation, drawing_type="background",
-                                  fill=self.Color)
+                                  fill=self.Color, cache_key=('sheet', self.Size, self.Color))
 
         self.Diagram = Diagram(
             self, diagram_type_name=diagram_type, layer=self.Tablet.layers['diagram'],
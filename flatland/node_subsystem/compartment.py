@@ -34,9 +34,16 @@ class Compartment:
         self.Node = node
         self.Content = spec.content  # list of text lines
         self.Expansion = spec.expansion
+        self._text_block_size = None
 
     @property
     def Text_block_size(self) -> Rect_Size:
+        """Size of the text block with required internal compartment padding, computed once"""
+        if not self._text_block_size:
+            self._text_block_size = self.compute_text_block_size()
+        return self._text_block_size
+
+    def compute_text_block_size(self) -> Rect_Size:
         """Compute the size of the text block with required internal compartment padding"""
         layer = self.Node.Grid.Diagram.Layer
         asset = ' '.join([self.Node.Node_type.Name, self.Type.name])
@@ -51,7 +58,8 @@ class Compartment:
     def Size(self) -> Rect_Size:
         """Compute the size of the visible border"""
         # Width matches the node width and the height is the full text block size
-        expanded_height = self.Text_block_size.height + self.Text_block_size.height * self.Expansion
+        text_block_height = self.Text_block_size.height
+        expanded_height = text_block_height + text_block_height * self.Expansion
         return Rect_Size(width=self.Node.Size.width, height=expanded_height)
 
     def render(self, lower_left_corner: Position):
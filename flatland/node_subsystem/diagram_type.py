@@ -5,6 +5,7 @@ from flatland.node_subsystem.node_type import NodeType
 from flatland.datatypes.geometry_types import Rect_Size
 from flatland.connector_subsystem.connector_type import ConnectorType
 from flatland.database.flatlanddb import FlatlandDB as fdb
+from flatland.database.snapshot import Snapshot
 from sqlalchemy import select, and_
 
 
@@ -34,6 +35,12 @@ class DiagramType:
         self.NodeTypes = {}
         self.ConnectorTypes = {}
 
+        types = Snapshot.lookup('DiagramType', (self.Name, notation))
+        if types:
+            # Node and Connector Types for this Notation were compiled into the database snapshot
+            self.NodeTypes, self.ConnectorTypes = types
+            return
+
         # Load Node and Compartment Types for this
         ntypes_t = fdb.MetaData.tables['Node Type']
         p_q = [ntypes_t.c.Name, ntypes_t.c.About, ntypes_t.c['Default height'], ntypes_t.c['Default width'],
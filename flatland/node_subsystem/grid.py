@@ -3,8 +3,7 @@ grid.py
 """
 
 import logging
-import sys
-from flatland.flatland_exceptions import CellOccupiedFE
+from flatland.flatland_exceptions import CellOccupiedFE, SheetWidthExceededFE, SheetHeightExceededFE
 from flatland.connector_subsystem.connector_layout_specification import ConnectorLayoutSpecification as connector_layout
 from flatland.node_subsystem.diagram_layout_specification import DiagramLayoutSpecification as diagram_layout
 from flatland.geometry_domain.linear_geometry import expand_boundaries, span, step_edge_distance
@@ -62,6 +61,8 @@ class Grid:
         - Nodes -- All the nodes on the grid in cplace order
         - Row_boundaries -- Floor y of each row ascending upward
         - Col_boundaries -- Left side x of each column, ascending rightward
+        - Version -- Incremented whenever a row or column boundary changes so that Nodes know when to
+          recompute their cached Canvas positions
         - Cell_padding -- Distances from cell to drawn node boundaries
         - Cell_alignment -- Default alignment for any placed node (can be overidden locally by node)
         - Diagram -- The Diagram that this Grid organizes content of
@@ -77,8 +78,9 @@ class Grid:
         self.Cells = []  # No rows or columns in grid yet
         self.Nodes = []  # No nodes in the grid yet
         self.Connectors = []
-        self.Row_boundaries = [0]
-        self.Col_boundaries = [0]
+        self.Version = 0
+        self._row_boundaries = [0]
+        self._col_boundaries = [0]
         self.Cell_padding = diagram_layout.Default_cell_padding
         self.Cell_alignment = diagram_layout.Default_cell_alignment
         self.Diagram = diagram
@@ -88,6 +90,24 @@ class Grid:
         return f'Cells: {self.Cells}, Row boundaries: {self.Row_boundaries}, Col boundaries: {self.Col_boundaries}' \
                f'Cell padding: {self.Cell_padding}, Cell alignment: {self.Cell_alignment}'
 
+    @property
+    def Row_boundaries(self):
+        return self._row_boundaries
+
+    @Row_boundaries.setter
+    def Row_boundaries(self, boundaries):
+        self._row_boundaries = boundaries
+        self.Version += 1
+
+    @property
+    def Col_boundaries(self):
+        return self._col_boundaries
+
+    @Col_boundaries.setter
+    def Col_boundaries(self, boundaries):
+        self._col_boundaries = boundaries
+        self.Version += 1
+
     def get_rut(self, lane: int, rut: int, orientation: Orientation) -> int:
         """
         Compute a y coordinate above row boundary if lane_orientation is row
@@ -120,11 +140,12 @@ class Grid:
             # Draw rows
             left_extent = self.Diagram.Origin.x
             right_extent = self.Diagram.Origin.x + self.Diagram.Size.width
+            grid_layer.add_line_segments(
+                asset='row boundary',
+                from_here=[Position(left_extent, h + self.Diagram.Origin.y) for h in self.Row_boundaries],
+                to_there=[Position(right_extent, h + self.Diagram.Origin.y) for h in self.Row_boundaries]
+            )
             for r, h in enumerate(self.Row_boundaries):
-                grid_layer.add_line_segment(asset='row boundary',
-                                            from_here=Position(left_extent, h + self.Diagram.Origin.y),
-                                            to_there=Position(right_extent, h + self.Diagram.Origin.y)
-                                            )
                 grid_layer.add_text_line(asset='grid label',
                                          lower_left=Position(max(left_extent - grid_label_gap, min_grid_lable_gap),
                                                              self.Diagram.Origin.y + h + boundary_label_gap),
@@ -134,11 +155,12 @@ class Grid:
             # Draw columns
             bottom_extent = self.Diagram.Origin.y
             top_extent = bottom_extent + self.Diagram.Size.height
+            grid_layer.add_line_segments(
+                asset='column boundary',
+                from_here=[Position(w + self.Diagram.Origin.x, bottom_extent) for w in self.Col_boundaries],
+                to_there=[Position(w + self.Diagram.Origin.x, top_extent) for w in self.Col_boundaries]
+            )
             for c, w in enumerate(self.Col_boundaries):
-                grid_layer.add_line_segment(asset='column boundary',
-                                            from_here=Position(w + self.Diagram.Origin.x, bottom_extent),
-                                            to_there=Position(w + self.Diagram.Origin.x, top_extent)
-                                            )
                 grid_layer.add_text_line(asset='grid label',
                                          lower_left=Position(w + self.Diagram.Origin.x + boundary_label_gap,
                                                              max(bottom_extent - grid_label_gap, min_grid_lable_gap)),
@@ -162,10 +184,10 @@ class Grid:
         # Make sure that it's not above the Diagram area
         if new_row_height > self.Diagram.Size.height:
             excess = round(new_row_height - self.Diagram.Size.height)
-            self.logger.error(f"Max diagram height exceeded by {excess}pt at row {len(self.Row_boundaries)}")
-            sys.exit(1)
+            raise SheetHeightExceededFE(excess=excess, row=len(self.Row_boundaries))
         # Add it to the list of row boundaries
         self.Row_boundaries.append(new_row_height)
+        self.Version += 1
         # Create new empty row with an empty node for each column boundary after the leftmost edge (0)
         empty_row = [None for _ in self.Col_boundaries[1:]]
         # Add it to our list of rows
@@ -178,10 +200,10 @@ class Grid:
         # Make sure that it's not right of the Diagram area
         if new_col_width > self.Diagram.Size.width:
             excess = round(new_col_width - self.Diagram.Size.width)
-            self.logger.error(f"Max diagram width exceeded by {excess}pt at col {len(self.Col_boundaries)}")
-            sys.exit(1)
+            raise SheetWidthExceededFE(excess=excess, col=len(self.Col_boundaries))
         # Add it to the list of column boundaries
         self.Col_boundaries.append(new_col_width)
+        self.Version += 1
         # For each row, add a rightmost empty node space
         [row.append(None) for row in self.Cells]
 
@@ -351,8 +373,7 @@ class Grid:
                 # Check to see if the rightmost column position is now outside the diagram area
                 if self.Col_boundaries[-1] > self.Diagram.Size.width:
                     excess = round(self.Col_boundaries[-1] - self.Diagram.Size.width)
-                    self.logger.error(f"Max diagram width exceeded by {excess}pt at col {len(self.Col_boundaries)}")
-                    sys.exit(1)
+                    raise SheetWidthExceededFE(excess=excess, col=len(self.Col_boundaries))
 
         # Check for vertical overlap
         if not rows_to_add:
@@ -364,8 +385,7 @@ class Grid:
                 # Check to see if the rightmost column position is now outside the diagram area
                 if self.Row_boundaries[-1] > self.Diagram.Size.height:
                     excess = round(self.Row_boundaries[-1] - self.Diagram.Size.height)
-                    self.logger.error(f"Max diagram width exceeded by {excess}pt at row {len(self.Row_boundaries)}")
-                    sys.exit(1)
+                    raise SheetHeightExceededFE(excess=excess, row=len(self.Row_boundaries))
 
         # Add extra rows and columns (must add the rows first)
         for r in range(rows_to_add):
@@ -26,6 +26,9 @@ class Node:
         - Grid -- The Node is positioned into this Grid
         - Compartments -- Each compartment to be filled in
         - Local_alignment -- Position of the node in the spanned area, vertical and horizontal
+
+    Since the Content never changes, the Size is computed once when first requested. The Canvas position
+    is cached until the Grid's row or column boundaries change.
     """
 
     def __init__(self, node_type_name: str, content: List[New_Compartment], grid: 'Grid',
@@ -69,9 +72,19 @@ class Node:
         # The Node will be aligned in the Cell according to either the specified local alignment or, if none,
         # the default cell alignment that we got from the Diagram Layout Specification
         self.Local_alignment = local_alignment if local_alignment else diagram_layout.Default_cell_alignment
+        self._size = None
+        self._canvas_position = None
+        self._grid_version = None  # Grid version when the canvas position was last computed
 
     @property
-    def Canvas_position(self):
+    def Canvas_position(self) -> Position:
+        """Position of lower left corner on the Canvas, recomputed only if the Grid has changed"""
+        if self._grid_version != self.Grid.Version:
+            self._canvas_position = self.compute_canvas_position()
+            self._grid_version = self.Grid.Version
+        return self._canvas_position
+
+    def compute_canvas_position(self) -> Position:
         """
         Must be overidden by each subclass.
         :return: None, None
@@ -79,7 +92,13 @@ class Node:
         return Position(x=None, y=None)
 
     @property
-    def Size(self):
+    def Size(self) -> Rect_Size:
+        """Node size accommodating the text content in each compartment"""
+        if not self._size:
+            self._size = self.compute_size()
+        return self._size
+
+    def compute_size(self) -> Rect_Size:
         """Adjust node size to accommodate text content in each compartment"""
         # For all compartments in this node, get the max height and width
         crects = [c.Text_block_size for c in self.Compartments]
@@ -119,7 +138,7 @@ class Node:
 
         self.logger.info("Drawing node")
         # Start at the bottom of the node and render each compartment upward
-        comp_y = self.Canvas_position.y
+        comp_x, comp_y = self.Canvas_position
         for c in self.Compartments[::-1]:  # Reverse the compartment order to bottom up
-            c.render(Position(x=self.Canvas_position.x, y=comp_y))
+            c.render(Position(x=comp_x, y=comp_y))
             comp_y += c.Size.height  # bottom of next compartment is top of this one
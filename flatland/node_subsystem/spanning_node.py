@@ -57,21 +57,21 @@ class SpanningNode(Node):
         return f'Grid [{self.Low_row}-{self.High_row}, {self.Left_column}-{self.Right_column}] @ ({round(self.Canvas_position.x, 2)}, ' \
                f'{round(self.Canvas_position.y, 2)}), W {round(self.Size.width, 2)} x H {round(self.Size.height, 2)}'
 
-    @property
-    def Canvas_position(self):
+    def compute_canvas_position(self) -> Position:
         """Position of lower left corner on the Canvas"""
         # Workout alignment within Cell
+        size = self.Size
         lower_left_x = align_on_axis(
             axis_alignment=self.Local_alignment.horizontal.value,
             boundaries=self.Grid.Col_boundaries, from_grid_unit=self.Left_column, to_grid_unit=self.Right_column,
             from_padding=self.Grid.Cell_padding.left, to_padding=self.Grid.Cell_padding.right,
-            node_extent=self.Size.width
+            node_extent=size.width
         ) + self.Grid.Diagram.Origin.x # +  self.Grid.Col_boundaries[self.Column-1]
         lower_left_y = align_on_axis(
             axis_alignment=self.Local_alignment.vertical.value,
             boundaries=self.Grid.Row_boundaries, from_grid_unit=self.Low_row, to_grid_unit=self.High_row,
             from_padding=self.Grid.Cell_padding.bottom, to_padding=self.Grid.Cell_padding.top,
-            node_extent=self.Size.height
+            node_extent=size.height
         ) + self.Grid.Diagram.Origin.y # + self.Grid.Row_boundaries[self.Row-1]
         return Position(x=lower_left_x, y=lower_left_y)
 
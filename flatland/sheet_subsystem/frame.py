@@ -1,7 +1,7 @@
 """frame.py – Draws the selected frame sized to a given sheet and fills in the fields"""
 
 import logging
-import sys
+from flatland.flatland_exceptions import MissingMetadata
 from sqlalchemy import select, and_
 from flatland.database.flatlanddb import FlatlandDB as fdb
 from collections import namedtuple
@@ -10,14 +10,27 @@ from flatland.node_subsystem.canvas import points_in_mm
 from flatland.text.text_block import TextBlock
 import math
 from flatland.sheet_subsystem.resource import resource_locator
-from flatland.sheet_subsystem.titleblock_placement import draw_titleblock
-from typing import TYPE_CHECKING, Dict
+from flatland.drawing_domain.image_cache import ImageCache
+from flatland.sheet_subsystem.titleblock_placement import titleblock_borders
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from flatland.node_subsystem.canvas import Canvas
+    from flatland.sheet_subsystem.sheet import Sheet
 
 DataBox = namedtuple('_Databox', 'metadata content position size alignment style')
 FieldPlacement = namedtuple('_FieldPlacement', 'metadata position max_area')
+BoxLayout = namedtuple('_BoxLayout', 'metadata position size alignment style')
+FrameLayout = namedtuple('_FrameLayout', 'title_block_pattern boxes borders margins open_fields')
+"""
+Everything about a Frame on a Sheet in some Orientation loaded from the flatland database
+
+- title_block_pattern -- Name of the Title Block Pattern, if any
+- boxes -- Layout of each Data Box by Box ID with the ordered Metadata names of its text lines
+- borders -- Lower left corner and size of each box border in the title block
+- margins -- Horizontal and vertical Data Box content padding
+- open_fields -- Field Placement of each Open Field
+"""
 
 
 class Frame:
@@ -35,7 +48,10 @@ class Frame:
         - metadata (dict) -- <Metadata> : <Content>, such as 'Title' : 'Sheet Subsystem Class Diagram'
         - Open_fields (list) -- Open field metadata label and positional info loaded from flatland database
         - Databoxes (dict) -- All Databox data loaded from flatland database (See named tuple above)
+        - Layout (FrameLayout) -- Everything loaded from the flatland database for this Frame, Sheet and Orientation
+        - Layouts (class, dict) -- Each Frame Layout loaded so far, so the database is queried only once for each
     """
+    Layouts: Dict[Tuple[str, str, str], FrameLayout] = {}
 
     def __init__(self, name: str, presentation: str, canvas: 'Canvas', metadata: Dict[str, str]):
         """
@@ -64,97 +80,55 @@ class Frame:
         # of sheet size. Frame's, on the other hand are more likely to change proportions with large sheet size
         # differences.  That said, there is nothing preventing us from doing the same for diagram layers on a case by
         # case basis. So an 'xUML Class Diagram tiny' could certainly be defined by us or a user in the future
+        # The Frame is drawn the same way for every diagram with the same Sheet, Orientation and metadata
+        # so the Layer only needs to be drawn once and can then be replayed until an image file changes
+        images = (resource_locator.get('_'.join([content, self.Canvas.Sheet.Size_group, self.Orientation]))
+                  for content, isresource in metadata.values() if isresource)
+        cache_key = ('frame', name, presentation, self.Canvas.Sheet.Name, self.Orientation,
+                     tuple(sorted(metadata.items())), tuple(ImageCache.version(p) for p in images if p))
         self.Layer = self.Canvas.Tablet.add_layer(
-            name='frame', presentation=presentation, drawing_type=drawing_type_name
+            name='frame', presentation=presentation, drawing_type=drawing_type_name, cache_key=cache_key
         )  # We're gonna be drawing metadata and title block borders all over this thing.
 
-        # If there is a title block cplace specified for this Frame, get the name of the pattern
-        tb_placement_t = fdb.MetaData.tables['Title Block Placement']
-        f = and_(
-            (tb_placement_t.c['Frame'] == self.Name),
-            (tb_placement_t.c['Sheet'] == self.Canvas.Sheet.Name),
-            (tb_placement_t.c['Orientation'] == self.Orientation),
-        )
-        query = select([tb_placement_t.c['Title block pattern']]).select_from(tb_placement_t).where(f)
-        row = fdb.Connection.execute(query).fetchone()
-        # Nothing says "I'm a serious engineer or architect" more than a fancy bordered title block on your Frame,
-        # but it is optional
-        self.Title_block_pattern = None if not row else row[0]
+        # The title block and open field layout only depends on our Frame, Sheet and Orientation
+        self.Layout = self.layout(frame=self.Name, sheet=self.Canvas.Sheet, orientation=self.Orientation)
+        self.Title_block_pattern = self.Layout.title_block_pattern
+        self.Open_fields = self.Layout.open_fields
 
-        # If a Title Block Pattern is specified, let's gather all the Data Box content from the flatland database
-        if self.Title_block_pattern:
-            self.logger.info('Assembling title block pattern on frame')
-            # Assemble a text block for each Data Box containing the Metadata Text Content
-            # We'll register that text block with the Layer for rendering
-            # Image (Resource) content is not supported within a Title Block Pattern, so we assume only text content
-            # If any non-text Resources were mistakenly specified by the user, we will ignore them
-            boxplace_t = fdb.MetaData.tables['Box Placement']  # Box positions and sizes, scaled for our Frame
-            databox_t = fdb.MetaData.tables['Data Box']  # Alignment and style of text within box
-            boxline_t = fdb.MetaData.tables['Box Text Line']  # Vertical ordering of metadata within a Data Box
-            # s = select (row criteria), p = project (columns), j = join, q = query
-            s = and_(
-                (boxplace_t.c.Frame == self.Name),
-                (boxplace_t.c.Sheet == self.Canvas.Sheet.Name),
-                (boxplace_t.c.Orientation == self.Orientation),
-                (boxplace_t.c['Title block pattern'] == self.Title_block_pattern),
-            )
-            p = [databox_t.c.ID, boxplace_t.c.X, boxplace_t.c.Y, boxplace_t.c.Width, boxplace_t.c.Height,
-                 databox_t.c['H align'], databox_t.c['V align'], databox_t.c.Style,
-                 boxline_t.c.Box, boxline_t.c.Order, boxline_t.c.Metadata]
-            j = databox_t.join(
-                boxplace_t,
-                and_((databox_t.c.Pattern == boxplace_t.c['Title block pattern']), (databox_t.c.ID == boxplace_t.c.Box))
-            ).join(
-                boxline_t,
-                and_((databox_t.c.Pattern == boxline_t.c['Title block pattern']), (databox_t.c.ID == boxline_t.c.Box))
-            )
-            q = select(p).select_from(j).where(s).order_by(boxplace_t.c.Box, boxline_t.c.Order)
-            rows = fdb.Connection.execute(q).fetchall()
-            # Populate our Databoxes dictionary from the row data we just fetched
-            for r in rows:
-                if r.Box in self.Databoxes:
-                    # The Data Box was recorded with an initial text line, so this must be an additional line
-                    try:
-                        # Extract the user supplied metadata value for this Data Box
-                        metadata_value = metadata[r.Metadata][0]
-                    except KeyError:
-                        self.logger.error(f"No metadata value supplied for: {r.Metadata}")
-                        sys.exit(1)
-                    self.Databoxes[r.Box].content.append(metadata_value)
-                else:
-                    # Rows are ordered by Data Box, so if the box id is new, we create an initial dictioary entry
-                    # With level 1
-                    self.Databoxes[r.Box] = DataBox(
-                        content=[metadata[r.Metadata][0]],  # Text to render:  Leon Starr, mint.flatland.td.1, etc
-                        position=Position(r.X, r.Y),  # Lower left corner of the Data Box
-                        size=Rect_Size(height=r.Height, width=r.Width),
-                        style=r.Style,  # Style of text inside this box such as: Block body, Block title, etc
-                        metadata=r.Metadata,  # Name of data item: Author, Document ID, etc
-                        # Finally, how text is aligned inside this box
-                        alignment=Alignment(vertical=VertAlign[r['V align']], horizontal=HorizAlign[r['H align']])
-                    )
-            # All done with the title block Metacontent. We'll unwind all this when we render to our Layer
-
-        # Gather the Open Field content (other text and graphics scattered around the Frame)
-        self.logger.info('Assembling open fields on frame')
-        open_field_t = fdb.MetaData.tables['Open Field']
-        s = and_(
-            (open_field_t.c['Frame'] == self.Name),
-            (open_field_t.c['Sheet'] == self.Canvas.Sheet.Name),
-            (open_field_t.c['Orientation'] == self.Orientation),
-        )
-        q = select([open_field_t]).where(s)
-        rows = fdb.Connection.execute(q).fetchall()
-        for r in rows:
-            p = Position(round(r['x position'] * points_in_mm, 2), round(r['y position'] * points_in_mm, 2))
-            ma = Rect_Size(round(r['max height'] * points_in_mm, 2), round(r['max width'] * points_in_mm, 2))
-            self.Open_fields.append(
-                FieldPlacement(metadata=r.Metadata, position=p, max_area=ma)
+        # Assemble a text block for each Data Box containing the Metadata Text Content
+        for box, b in self.Layout.boxes.items():
+            content = []
+            for m in b.metadata:
+                try:
+                    # Extract the user supplied metadata value for this Data Box
+                    content.append(metadata[m][0])
+                except KeyError:
+                    raise MissingMetadata(m) from None
+            self.Databoxes[box] = DataBox(
+                content=content, position=b.position, size=b.size, style=b.style, metadata=b.metadata[0],
+                alignment=b.alignment
             )
-        # All done with the Open Fields. Much easier to compute than Boxed Fields!
 
         # Now let's register all text and graphics for everything in our Frame on its Layer
-        self.render()
+        # unless the same Frame has already been drawn
+        if not self.Layer.recorded:
+            self.render()
+
+    @classmethod
+    def layout(cls, frame: str, sheet: 'Sheet', orientation: str) -> FrameLayout:
+        """
+        Get the title block and open field layout of a Frame, loading it from the flatland database
+        the first time it is requested
+
+        :param frame: Name of the Frame
+        :param sheet: Frame is drawn on this Sheet
+        :param orientation: Orientation of the Sheet: 'portrait' or 'landscape'
+        :return: The Frame Layout
+        """
+        key = (frame, sheet.Name, orientation)
+        if key not in cls.Layouts:
+            cls.Layouts[key] = load_layout(frame=frame, sheet=sheet, orientation=orientation)
+        return cls.Layouts[key]
 
     def render(self):
         """Draw the Frame on its Layer"""
@@ -187,21 +161,10 @@ class Frame:
 
         if self.Title_block_pattern:
             # Draw the title block box borders
-            draw_titleblock(frame=self.Name, sheet=self.Canvas.Sheet, orientation=self.Orientation, layer=self.Layer)
-
-            # Get the margins to pad the Data Box content
+            lower_left, size = self.Layout.borders
+            self.Layer.add_rectangles(asset='Block border', lower_left=lower_left, size=size)
             # The same margins are applied to each Data Box in the same Scaled Title Block
-            # So we are looking only for one pair of h,v margin values to use throughout
-            scaledtb_t = fdb.MetaData.tables['Scaled Title Block']
-            s = and_(
-                (scaledtb_t.c['Title block pattern'] == self.Title_block_pattern),
-                (scaledtb_t.c['Sheet size group'] == self.Canvas.Sheet.Size_group),
-            )
-            p = [scaledtb_t.c['Margin H'], scaledtb_t.c['Margin V']]
-            q = select(p).where(s)
-            row = fdb.Connection.execute(q).fetchone()
-            assert row, f"No Title Block Placement for frame: {self.Name}"
-            h_margin, v_margin = row
+            h_margin, v_margin = self.Layout.margins
 
             # Render all the box fields
             for k, v in self.Databoxes.items():
@@ -227,3 +190,103 @@ class Frame:
                 self.Layer.add_text_block(
                     asset=v.style, lower_left=Position(xpos, ypos), text=content, align=v.alignment.horizontal
                 )
+
+
+def load_layout(frame: str, sheet: 'Sheet', orientation: str) -> FrameLayout:
+    """
+    Load the title block and open field layout of a Frame from the flatland database
+
+    :param frame: Name of the Frame
+    :param sheet: Frame is drawn on this Sheet
+    :param orientation: Orientation of the Sheet: 'portrait' or 'landscape'
+    :return: The Frame Layout
+    """
+    # If there is a title block placement specified for this Frame, get the name of the pattern
+    tb_placement_t = fdb.MetaData.tables['Title Block Placement']
+    f = and_(
+        (tb_placement_t.c['Frame'] == frame),
+        (tb_placement_t.c['Sheet'] == sheet.Name),
+        (tb_placement_t.c['Orientation'] == orientation),
+    )
+    query = select([tb_placement_t.c['Title block pattern']]).select_from(tb_placement_t).where(f)
+    row = fdb.Connection.execute(query).fetchone()
+    # Nothing says "I'm a serious engineer or architect" more than a fancy bordered title block on your Frame,
+    # but it is optional
+    title_block_pattern = None if not row else row[0]
+
+    boxes: Dict[int, BoxLayout] = {}
+    borders: Optional[Tuple[List[Position], List[Rect_Size]]] = None
+    margins: Optional[Tuple[float, float]] = None
+    # If a Title Block Pattern is specified, let's gather all the Data Box layout from the flatland database
+    if title_block_pattern:
+        # Image (Resource) content is not supported within a Title Block Pattern, so we assume only text content
+        # If any non-text Resources were mistakenly specified by the user, we will ignore them
+        boxplace_t = fdb.MetaData.tables['Box Placement']  # Box positions and sizes, scaled for our Frame
+        databox_t = fdb.MetaData.tables['Data Box']  # Alignment and style of text within box
+        boxline_t = fdb.MetaData.tables['Box Text Line']  # Vertical ordering of metadata within a Data Box
+        # s = select (row criteria), p = project (columns), j = join, q = query
+        s = and_(
+            (boxplace_t.c.Frame == frame),
+            (boxplace_t.c.Sheet == sheet.Name),
+            (boxplace_t.c.Orientation == orientation),
+            (boxplace_t.c['Title block pattern'] == title_block_pattern),
+        )
+        p = [databox_t.c.ID, boxplace_t.c.X, boxplace_t.c.Y, boxplace_t.c.Width, boxplace_t.c.Height,
+             databox_t.c['H align'], databox_t.c['V align'], databox_t.c.Style,
+             boxline_t.c.Box, boxline_t.c.Order, boxline_t.c.Metadata]
+        j = databox_t.join(
+            boxplace_t,
+            and_((databox_t.c.Pattern == boxplace_t.c['Title block pattern']), (databox_t.c.ID == boxplace_t.c.Box))
+        ).join(
+            boxline_t,
+            and_((databox_t.c.Pattern == boxline_t.c['Title block pattern']), (databox_t.c.ID == boxline_t.c.Box))
+        )
+        q = select(p).select_from(j).where(s).order_by(boxplace_t.c.Box, boxline_t.c.Order)
+        rows = fdb.Connection.execute(q).fetchall()
+        for r in rows:
+            if r.Box in boxes:
+                # Rows are ordered by Data Box, so this must be an additional text line
+                boxes[r.Box].metadata.append(r.Metadata)
+            else:
+                boxes[r.Box] = BoxLayout(
+                    metadata=[r.Metadata],  # Name of each data item: Author, Document ID, etc
+                    position=Position(r.X, r.Y),  # Lower left corner of the Data Box
+                    size=Rect_Size(height=r.Height, width=r.Width),
+                    style=r.Style,  # Style of text inside this box such as: Block body, Block title, etc
+                    # Finally, how text is aligned inside this box
+                    alignment=Alignment(vertical=VertAlign[r['V align']], horizontal=HorizAlign[r['H align']])
+                )
+
+        borders = titleblock_borders(frame=frame, sheet=sheet, orientation=orientation)
+
+        # Get the margins to pad the Data Box content
+        # The same margins are applied to each Data Box in the same Scaled Title Block
+        # So we are looking only for one pair of h,v margin values to use throughout
+        scaledtb_t = fdb.MetaData.tables['Scaled Title Block']
+        s = and_(
+            (scaledtb_t.c['Title block pattern'] == title_block_pattern),
+            (scaledtb_t.c['Sheet size group'] == sheet.Size_group),
+        )
+        p = [scaledtb_t.c['Margin H'], scaledtb_t.c['Margin V']]
+        q = select(p).where(s)
+        row = fdb.Connection.execute(q).fetchone()
+        assert row, f"No Title Block Placement for frame: {frame}"
+        margins = tuple(row)
+
+    # Gather the Open Field layout (other text and graphics scattered around the Frame)
+    open_fields = []
+    open_field_t = fdb.MetaData.tables['Open Field']
+    s = and_(
+        (open_field_t.c['Frame'] == frame),
+        (open_field_t.c['Sheet'] == sheet.Name),
+        (open_field_t.c['Orientation'] == orientation),
+    )
+    q = select([open_field_t]).where(s)
+    rows = fdb.Connection.execute(q).fetchall()
+    for r in rows:
+        p = Position(round(r['x position'] * points_in_mm, 2), round(r['y position'] * points_in_mm, 2))
+        ma = Rect_Size(round(r['max height'] * points_in_mm, 2), round(r['max width'] * points_in_mm, 2))
+        open_fields.append(FieldPlacement(metadata=r.Metadata, position=p, max_area=ma))
+
+    return FrameLayout(title_block_pattern=title_block_pattern, boxes=boxes, borders=borders, margins=margins,
+                       open_fields=open_fields)
@@ -2,7 +2,6 @@
 sheet.py – The canvas is drawn on this instance of sheet
 """
 
-import sys
 import logging
 from sqlalchemy import select
 from flatland.flatland_exceptions import UnknownSheetSize, UnknownSheetGroup
@@ -44,8 +43,7 @@ class Sheet:
         query = select([sheet_t]).where(sheet_t.c.Name == name)
         i = fdb.Connection.execute(query).fetchone()
         if not i:
-            self.logger.error(f"Unsupported sheet size [{name}]")
-            sys.exit(1)
+            raise UnknownSheetSize(name)
         self.Name = name
         self.Size_group = i['Size group']
         if i.Group == 'us':
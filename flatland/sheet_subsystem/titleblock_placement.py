@@ -6,25 +6,23 @@ from collections import namedtuple
 from flatland.database.flatlanddb import FlatlandDB as fdb
 from flatland.datatypes.geometry_types import Position, Rect_Size
 from flatland.node_subsystem.canvas import points_in_mm
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, List, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from flatland.drawing_domain.layer import Layer
     from flatland.sheet_subsystem.sheet import Sheet
 
 CompartmentBox = namedtuple("_CompartmentBox", "distance upper_box lower_box")
 BoxPlacement = namedtuple("_BoxPlacement", "placement size")
 
 
-def draw_titleblock(frame: str, sheet: 'Sheet', orientation: str, layer: 'Layer'):
+def titleblock_borders(frame: str, sheet: 'Sheet', orientation: str) -> Tuple[List[Position], List[Rect_Size]]:
     """
-    Draw each box in the title block on the specified layer
+    Get the border of each box in the title block
 
-    :param layer:  Layer to draw the box on
     :param frame:  Title block is fitted to this frame
     :param sheet:  Frame is drawn on this Sheet (sizing info)
     :param orientation:  Orientation of the frame: 'portrait' or 'landscape'
-    :return:
+    :return: The lower left corner of each box and the size of each box
     """
     bplace_t = fdb.MetaData.tables['Box Placement']
 
@@ -36,11 +34,7 @@ def draw_titleblock(frame: str, sheet: 'Sheet', orientation: str, layer: 'Layer'
     )
     q = select(p).select_from(bplace_t).where(f)
     rows = fdb.Connection.execute(q).fetchall()
-    for r in rows:
-        layer.add_rectangle(
-            asset='Block border', lower_left=Position(r.X, r.Y),
-            size=Rect_Size(height=r.Height, width=r.Width)
-        )
+    return [Position(r.X, r.Y) for r in rows], [Rect_Size(height=r.Height, width=r.Width) for r in rows]
 
 
 def compute_box_placements(pattern: str, placement: Position, size: Rect_Size) -> Dict[int, BoxPlacement]:
@@ -0,0 +1,45 @@
+""" batch_test.py - test batch manifest reading """
+
+import pytest
+from pathlib import Path
+
+pytest.importorskip('cairo')
+from flatland.xuml.batch import read_manifest, report, BatchJob, BatchResult
+from flatland.flatland_exceptions import BatchManifestEntry
+
+
+def test_manifest(tmp_path):
+    manifest = tmp_path / 'diagrams.txt'
+    manifest.write_text('// Nightly doc build\n'
+                        'models/aircraft2.xmm layouts/t001.mls\n'
+                        '\n'
+                        'models/door.xsm layouts/door.mls door_sm.pdf  // state machine\n')
+    out = Path('out')
+    assert read_manifest(manifest, out) == [
+        BatchJob(model=tmp_path / 'models/aircraft2.xmm', layout=tmp_path / 'layouts/t001.mls', diagram=out / 't001.pdf'),
+        BatchJob(model=tmp_path / 'models/door.xsm', layout=tmp_path / 'layouts/door.mls', diagram=out / 'door_sm.pdf'),
+    ]
+
+
+def test_bad_manifest_entry(tmp_path):
+    manifest = tmp_path / 'diagrams.txt'
+    manifest.write_text('aircraft2.xmm\n')
+    with pytest.raises(BatchManifestEntry):
+        read_manifest(manifest, tmp_path)
+
+
+def test_directory_pairs(tmp_path):
+    for name in ('atc.xsm', 'atc.mls', 'door.xsm', 'notes.txt', 'aircraft.xmm', 'aircraft.mls'):
+        (tmp_path / name).write_text('x')
+    jobs = read_manifest(tmp_path, tmp_path / 'out')
+    assert [j.model.name for j in jobs] == ['aircraft.xmm', 'atc.xsm']  # door has no layout
+    assert jobs[1].diagram == tmp_path / 'out' / 'atc.pdf'
+
+
+def test_report_lists_failures():
+    ok = BatchResult(job=BatchJob(Path('a.xmm'), Path('a.mls'), Path('a.pdf')), seconds=0.5, error=None, skipped=False)
+    bad = BatchResult(job=BatchJob(Path('b.xsm'), Path('b.mls'), Path('b.pdf')), seconds=0.25, error='Parse error',
+                      skipped=False)
+    text = report([ok, bad])
+    assert '1 of 2 diagrams generated in 0.750s' in text
+    assert text.splitlines()[-1].strip() == 'b.xsm + b.mls'
@@ -0,0 +1,52 @@
+""" build_cache_test.py - test diagram fingerprints """
+
+import pytest
+
+pytest.importorskip('cairo')
+from flatland.xuml.build_cache import BuildCache
+
+options = {'show_grid': False, 'nodes_only': False, 'no_color': False}
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(BuildCache, 'Directory', tmp_path / 'builds')
+    model, layout, diagram = tmp_path / 'a.xmm', tmp_path / 'a.mls', tmp_path / 'a.pdf'
+    model.write_text('subsystem A\n')
+    layout.write_text('diagram class\n')
+    return model, layout, diagram
+
+
+def test_unchanged_diagram_up_to_date(files):
+    model, layout, diagram = files
+    fp = BuildCache.fingerprint(model, layout, options)
+    assert not BuildCache.up_to_date(diagram, fp)  # Never generated
+    diagram.write_bytes(b'%PDF')
+    BuildCache.record(diagram, fp)
+    assert BuildCache.up_to_date(diagram, BuildCache.fingerprint(model, layout, options))
+
+
+def test_changes_detected(files):
+    model, layout, diagram = files
+    fp = BuildCache.fingerprint(model, layout, options)
+    diagram.write_bytes(b'%PDF')
+    BuildCache.record(diagram, fp)
+    assert BuildCache.fingerprint(model, layout, options | {'show_grid': True}) != fp
+    layout.write_text('diagram class\nnotation Starr\n')
+    assert not BuildCache.up_to_date(diagram, BuildCache.fingerprint(model, layout, options))
+    diagram.unlink()
+    assert not BuildCache.up_to_date(diagram, fp)
+
+
+def test_rendering_settings_detected(files, monkeypatch):
+    from flatland.xuml.render import rendering_options
+    from flatland.drawing_domain.tablet import Tablet
+    from flatland.drawing_domain.layer import Layer
+    model, layout, diagram = files
+    fp = BuildCache.fingerprint(model, layout, rendering_options(show_grid=False, nodes_only=False, no_color=False))
+    for cls, name, value in ((Tablet, 'Dpi', 300), (Tablet, 'Also_formats', ['svg']), (Layer, 'Fit_images', True),
+                             (Layer, 'Sort_styles', True), (Layer, 'Batch_strokes', True)):
+        with monkeypatch.context() as m:
+            m.setattr(cls, name, value)
+            options = rendering_options(show_grid=False, nodes_only=False, no_color=False)
+            assert BuildCache.fingerprint(model, layout, options) != fp
@@ -0,0 +1,87 @@
+""" config_test.py - test applying configuration changes without a rebuild """
+
+import pytest
+
+pytest.importorskip('cairo')
+from sqlalchemy import select
+from flatland.configuration.config import Config, update_config_tables
+from flatland.database.flatlanddb import FlatlandDB
+from flatland.database.snapshot import Snapshot
+
+
+@pytest.fixture
+def user_colors(temp_db, tmp_path, monkeypatch):
+    # A freshly built database with its own, initially empty, user configuration
+    monkeypatch.setattr(Config, 'user_config_home', tmp_path / 'config')
+    (tmp_path / 'config').mkdir()
+    FlatlandDB(rebuild=True, in_memory=False)
+    return tmp_path / 'config' / 'color.yaml'
+
+
+@pytest.fixture
+def styles(monkeypatch):
+    # Styles are loaded once per process, so load them afresh and put the shared ones back afterwards
+    from flatland.drawing_domain.styledb import StyleDB
+    monkeypatch.setattr(StyleDB, 'loaded', False)
+    for name in ('rgbF', 'dash_pattern', 'line_style', 'typeface', 'text_style', 'color_usage',
+                 'line_records', 'line_record_index', 'text_records', 'text_record_index'):
+        monkeypatch.setattr(StyleDB, name, type(getattr(StyleDB, name))())
+    return StyleDB
+
+
+def colors():
+    color_t = FlatlandDB.MetaData.tables['Color']
+    return {r.Name: (r.R, r.G, r.B, r.Canvas) for r in FlatlandDB.Connection.execute(select([color_t])).fetchall()}
+
+
+def test_user_colors(user_colors):
+    update_config_tables()  # Rebuilt from the population modules, so always applied
+    assert not update_config_tables()  # Nothing changed
+    assert [p.suffix for p in Snapshot.Directory.iterdir()] == ['.config']  # Not beside the database
+    before = colors()
+    user_colors.write_text("leaf: {R: 1, G: 2, B: 3, Canvas: True}\nsky: {R: 0, G: 0, B: 0, Canvas: False}\n")
+    assert update_config_tables()
+    after = colors()
+    assert after['leaf'] == (1, 2, 3, True)
+    assert after['sky'] == (0, 0, 0, False)
+    assert {k: v for k, v in after.items() if k not in ('leaf', 'sky')} == \
+           {k: v for k, v in before.items() if k != 'sky'}
+    assert not update_config_tables()
+
+
+def test_in_memory_config_not_saved(user_colors, styles):
+    from flatland.configuration.config import build_snapshot
+    update_config_tables()
+    FlatlandDB.Connection.close()
+    FlatlandDB(rebuild=False, in_memory=True)
+    user_colors.write_text("leaf: {R: 1, G: 2, B: 3, Canvas: True}\n")
+    assert update_config_tables() and 'leaf' in colors()
+    build_snapshot()
+    assert not Snapshot.cache_file(FlatlandDB.File, '.snapshot').exists()  # Stamped with a file with no leaf color
+
+
+def test_worker_applies_config(user_colors, styles, monkeypatch):
+    import flatland.xuml.batch as batch
+    from flatland.drawing_domain.layer import Layer
+    from flatland.drawing_domain.tablet import Tablet
+    for cls, names in ((Layer, ('Sort_styles', 'Batch_strokes', 'Fit_images')), (Tablet, ('Also_formats', 'Dpi'))):
+        for name in names:
+            monkeypatch.setattr(cls, name, getattr(cls, name))
+    monkeypatch.setattr(batch.signal, 'signal', lambda *args: None)  # Leave ctrl-C alone in the test process
+    monkeypatch.setattr(batch, 'compile_parsers', lambda: None)
+    update_config_tables()
+    FlatlandDB.Connection.close()
+    user_colors.write_text("leaf: {R: 1, G: 2, B: 3, Canvas: True}\n")
+    batch.init_worker(False, False, False, False, [], 96, False, in_memory=True)
+    assert 'leaf' in colors() and 'leaf' in styles.rgbF
+
+
+def test_in_memory_startup_compiles_nothing(user_colors, styles, monkeypatch):
+    import flatland.drawing_domain.presentation as presentation
+    import flatland.node_subsystem.diagram_type as diagram_type
+    loaded = []
+    monkeypatch.setattr(presentation, 'Presentation', lambda **kwargs: loaded.append(kwargs))
+    monkeypatch.setattr(diagram_type, 'DiagramType', lambda **kwargs: loaded.append(kwargs))
+    monkeypatch.setattr(FlatlandDB, 'In_memory', True)
+    Config(rebuild_db=False)
+    assert not Snapshot.Loaded and not loaded and not Snapshot.cache_file(FlatlandDB.File, '.snapshot').exists()
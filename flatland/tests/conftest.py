@@ -0,0 +1,23 @@
+""" conftest.py - fixtures shared by the flatland tests """
+
+import pytest
+from flatland.database.flatlanddb import FlatlandDB
+from flatland.database.snapshot import Snapshot
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    # Build and load databases in a temporary directory, leaving the installed database, its snapshot
+    # and the class level connection used by other tests alone. Yields the database file, not yet built.
+    connection = FlatlandDB.Connection
+    for name in ('Engine', 'Connection', 'MetaData', 'Relvars', 'Rebuilt'):
+        monkeypatch.setattr(FlatlandDB, name, getattr(FlatlandDB, name))
+    monkeypatch.setattr(FlatlandDB, 'File', tmp_path / 'flatland.db')
+    monkeypatch.setattr(FlatlandDB, 'LogFile', tmp_path / 'db.log')
+    monkeypatch.setattr(FlatlandDB, 'In_memory', False)
+    monkeypatch.setattr(Snapshot, 'Directory', tmp_path / 'cache')
+    monkeypatch.setattr(Snapshot, 'Loaded', False)
+    monkeypatch.setattr(Snapshot, 'Content', {})
+    yield FlatlandDB.File
+    if FlatlandDB.Connection is not None and FlatlandDB.Connection is not connection:
+        FlatlandDB.Connection.close()
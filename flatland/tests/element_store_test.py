@@ -0,0 +1,35 @@
+""" element_store_test.py - test columnar storage of drawing elements """
+
+from flatland.drawing_domain.element import Line_Segment, Polygon, Rectangle
+from flatland.drawing_domain.element_store import ElementStore
+from flatland.datatypes.geometry_types import Points, Position, Rect_Size
+
+
+def test_round_trip():
+    rects = ElementStore(Rectangle, upper_left='position', size='size', border_style='index',
+                         fill='object', radius='float', top='object', bottom='object')
+    r = Rectangle(upper_left=Position(10, 20.5), size=Rect_Size(height=30, width=40), border_style=2,
+                  fill=(1.0, 1.0, 1.0), radius=4, top=True, bottom=False)
+    rects.append(*r)
+    assert len(rects) == 1
+    assert list(rects) == [r]
+    assert rects.Columns['size_width'][0] == 40
+
+
+def test_sort_polygons():
+    polygons = ElementStore(Polygon, vertices='positions', border_style='index', fill='object')
+    triangle = [Position(0, 0), Position(5, 10), Position(10, 0)]
+    square = [Position(0, 0), Position(0, 5), Position(5, 5), Position(5, 0)]
+    polygons.append(triangle, 1, None)
+    polygons.append(square, 0, None)
+    polygons.append(square, 1, (0.0, 0.0, 0.0))
+    polygons.sort_by('border_style')
+    assert [(p.vertices, p.border_style, p.fill) for p in polygons] == [
+        (square, 0, None), (triangle, 1, None), (square, 1, (0.0, 0.0, 0.0))]
+
+
+def test_extend():
+    segments = ElementStore(Line_Segment, from_here='position', to_there='position', style='index')
+    segments.extend(2, from_here=Points(x=[0, 5], y=[0, 5]), to_there=Points(x=[1, 6], y=[1, 6]), style=[3, 3])
+    assert list(segments) == [Line_Segment(Position(0, 0), Position(1, 1), 3),
+                              Line_Segment(Position(5, 5), Position(6, 6), 3)]
@@ -0,0 +1,28 @@
+""" grid_test.py - test grid boundary versioning """
+
+from types import SimpleNamespace
+from flatland.node_subsystem.grid import Grid
+from flatland.datatypes.geometry_types import Rect_Size, Position
+
+
+def make_grid():
+    diagram = SimpleNamespace(Size=Rect_Size(height=1000, width=1000), Origin=Position(0, 0))
+    return Grid(diagram=diagram)
+
+
+def test_version_bumped_by_boundary_changes():
+    grid = make_grid()
+    v = grid.Version
+    grid.add_row(100)
+    grid.add_column(200)
+    assert grid.Version == v + 2
+    grid.Row_boundaries = [0, 150]
+    assert grid.Version == v + 3
+
+
+def test_version_unchanged_by_lookup():
+    grid = make_grid()
+    grid.add_row(100)
+    v = grid.Version
+    assert grid.outermost_row == 1
+    assert grid.Version == v
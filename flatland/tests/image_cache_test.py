@@ -0,0 +1,38 @@
+""" image_cache_test.py - test reuse of decoded images """
+
+import os
+import pytest
+
+cairo = pytest.importorskip('cairo')
+from flatland.drawing_domain.image_cache import ImageCache
+from flatland.datatypes.geometry_types import Rect_Size
+
+
+@pytest.fixture
+def logo(tmp_path):
+    ImageCache.clear()
+    path = tmp_path / 'logo.png'
+    cairo.ImageSurface(cairo.FORMAT_ARGB32, 100, 50).write_to_png(str(path))
+    yield path
+    ImageCache.clear()
+
+
+def test_decoded_once(logo):
+    image = ImageCache.image(logo)
+    assert ImageCache.image(logo) is image
+    os.utime(logo, ns=(0, ImageCache.version(logo) + 10**9))  # The file changes
+    assert ImageCache.image(logo) is not image
+
+
+def test_fit(logo):
+    assert ImageCache.image(logo, fit=Rect_Size(height=100, width=200)) is ImageCache.image(logo)
+    small = ImageCache.image(logo, fit=Rect_Size(height=40, width=50))
+    assert (small.get_width(), small.get_height()) == (50, 25)
+    assert ImageCache.image(logo, fit=Rect_Size(height=40, width=50)) is small
+
+
+def test_missing(tmp_path):
+    ImageCache.clear()
+    assert ImageCache.image(tmp_path / 'none.png') is None
+    assert ImageCache.image(tmp_path / 'none.png') is None
+    assert ImageCache.Missing == {(str(tmp_path / 'none.png'), None)}  # Warned only once
@@ -0,0 +1,56 @@
+""" import_time_test.py - keep heavy dependencies off the quick command line paths
+
+Run directly to see the import time of each entry point:  python -m flatland.tests.import_time_test
+"""
+
+import os
+import re
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+
+package_root = Path(__file__).parent.parent.parent
+
+heavy = {'sqlalchemy', 'cairo', 'numpy', 'arpeggio', 'yaml'}
+
+# Module imported by each command line path and the heavy dependencies it genuinely needs
+entry_points = {
+    'flatland.__main__': set(),  # -V and argument parsing
+    'flatland.configuration.config': {'sqlalchemy'},  # -COLORS
+    'flatland.masl.maslout': {'arpeggio'},  # -MASL
+}
+
+
+def import_time(module: str):
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    :param module: Module to import
+    :return: Cumulative import time in microseconds of the module and the set of top level packages imported
+    """
+    env = dict(os.environ, PYTHONPATH=str(package_root))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, env=env, check=True)
+    imported = set()
+    total = None
+    for line in result.stderr.splitlines():
+        m = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if m:
+            imported.add(m.group(3).split('.')[0])
+            if m.group(3) == module:
+                total = int(m.group(1))
+    return total, imported
+
+
+@pytest.mark.parametrize('module', entry_points)
+def test_no_heavy_imports(module):
+    total, imported = import_time(module)
+    assert total
+    assert heavy & imported <= entry_points[module]
+
+
+if __name__ == '__main__':
+    for m in entry_points:
+        t, i = import_time(m)
+        print(f'{m:35} {t / 1000:8.1f} ms  {", ".join(sorted(heavy & i)) or "-"}')
@@ -0,0 +1,122 @@
+""" layer_test.py - test adding and rendering Layer elements """
+
+import logging
+import pytest
+from collections import OrderedDict
+from types import SimpleNamespace
+
+pytest.importorskip('cairo')
+from flatland.drawing_domain.layer import Layer
+from flatland.drawing_domain.render_state import RenderState
+from flatland.drawing_domain.styledb import StyleDB, Line_Style, Float_RGB
+from flatland.drawing_domain.element import Line_Segment
+from flatland.drawing_domain.element_store import ElementStore
+from flatland.drawing_domain.tablet import Tablet
+from flatland.datatypes.geometry_types import Position, Rect_Size
+from flatland.flatland_exceptions import OutsideTabletDrawArea
+
+
+class RecordingContext:
+    """Stands in for a cairo context, recording each call"""
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+
+@pytest.fixture
+def layer(monkeypatch):
+    monkeypatch.setattr(StyleDB, 'line_style', {'normal': Line_Style(pattern='no dash', width=1, color='black'),
+                                                'grid': Line_Style(pattern='no dash', width=1, color='blue')})
+    monkeypatch.setattr(StyleDB, 'dash_pattern', {'no dash': []})
+    monkeypatch.setattr(StyleDB, 'rgbF', {'black': Float_RGB(0, 0, 0), 'blue': Float_RGB(0, 0, 1)})
+    monkeypatch.setattr(StyleDB, 'line_records', [])
+    monkeypatch.setattr(StyleDB, 'line_record_index', {})
+    monkeypatch.setattr(Layer, 'Batch_strokes', True)
+    ctx = RecordingContext()
+    layer = Layer.__new__(Layer)
+    layer.logger = logging.getLogger(__name__)
+    layer.Tablet = SimpleNamespace(Context=ctx, State=RenderState(ctx))
+    return layer
+
+
+def test_line_records(layer):
+    normal = StyleDB.line_record('normal')
+    assert StyleDB.line_record('normal') == normal  # Resolved only once
+    assert StyleDB.line_records[normal] == ([], (0, 0, 0), 1)
+    assert StyleDB.line_records[StyleDB.line_record('grid')].rgb == (0, 0, 1)
+
+
+def test_batched_strokes(layer):
+    a, b, c = Position(0, 0), Position(0, 10), Position(10, 10)
+    normal, grid = StyleDB.line_record('normal'), StyleDB.line_record('grid')
+    layer.Line_segments = ElementStore(Line_Segment, from_here='position', to_there='position', style='index')
+    layer.Line_segments.append(a, b, normal)
+    layer.Line_segments.append(Position(5, 5), Position(5, 0), grid)
+    layer.Line_segments.append(b, c, normal)  # Continues the first segment
+    layer.Line_segments.append(a, c, normal)
+    layer.render_line_segments()
+    path_calls = [(name, args) for name, args in layer.Tablet.Context.calls
+                  if name in ('move_to', 'line_to', 'stroke')]
+    assert path_calls == [
+        ('move_to', a), ('line_to', b), ('line_to', c), ('move_to', a), ('line_to', c), ('stroke', ()),
+        ('move_to', (5, 5)), ('line_to', (5, 0)), ('stroke', ()),
+    ]
+
+
+def test_open_polygon(layer):
+    layer.Tablet.Size = Rect_Size(height=100, width=200)
+    layer.Tablet.to_dc_all = lambda points: Tablet.to_dc_all(layer.Tablet, points)
+    layer.Presentation = SimpleNamespace(Line_record={'connector': StyleDB.line_record('normal')})
+    layer.Line_segments = ElementStore(Line_Segment, from_here='position', to_there='position', style='index')
+    layer.add_open_polygon('connector', [Position(0, 0), Position(0, 10), Position(10, 10)])
+    assert [(l.from_here, l.to_there) for l in layer.Line_segments] == [
+        ((0, 100), (0, 90)), ((0, 90), (10, 90))]
+    with pytest.raises(OutsideTabletDrawArea):
+        layer.add_open_polygon('connector', [Position(0, 0), Position(0, 150)])
+
+
+def test_recorded_layer(layer, monkeypatch):
+    monkeypatch.setattr(Layer, 'Recordings', OrderedDict())
+    tablet = layer.Tablet
+    tablet.Size = Rect_Size(height=100, width=200)
+    tablet.drawing_on = lambda context: Tablet.drawing_on(tablet, context)
+    rendered = []
+    monkeypatch.setattr(Layer, 'render_elements', lambda self: rendered.append(self.Tablet.Context))
+    layer.Name, layer.Cache_key, layer.Recording = 'sheet', ('sheet', tablet.Size, 'white'), None
+    assert not layer.recorded
+    layer.render()
+    layer.render()  # Replayed without drawing the elements again
+    assert len(rendered) == 1 and rendered[0] is not tablet.Context
+    assert layer.recorded
+    assert [name for name, _ in tablet.Context.calls] == ['set_source_surface', 'paint'] * 2
+
+
+def test_recording_kept(layer, monkeypatch):
+    monkeypatch.setattr(Layer, 'Recordings', OrderedDict())
+    monkeypatch.setattr(Layer, 'Recording_limit', 2)
+    tablet = layer.Tablet
+    tablet.Size = Rect_Size(height=100, width=200)
+    tablet.drawing_on = lambda context: Tablet.drawing_on(tablet, context)
+    monkeypatch.setattr(Layer, 'render_elements', lambda self: None)
+    layer.Name, layer.Cache_key, layer.Recording = 'frame', ('frame', 1), None
+    layer.render()
+    frame = layer.Recording
+
+    def other(key):
+        o = Layer.__new__(Layer)
+        o.logger, o.Tablet, o.Name, o.Cache_key, o.Recording = layer.logger, tablet, 'sheet', key, None
+        return o
+    other(('sheet', 1)).render()
+    assert other(('frame', 1)).recorded  # Now the most recently used
+    other(('sheet', 2)).render()  # Drops ('sheet', 1), not the frame
+    assert list(Layer.Recordings) == [('frame', 1), ('sheet', 2)]
+    # A frame checked before its recording is dropped still replays it
+    replay = other(('frame', 1))
+    assert replay.recorded
+    other(('sheet', 3)).render()
+    other(('sheet', 4)).render()
+    assert ('frame', 1) not in Layer.Recordings
+    replay.render()
+    assert replay.Recording is frame
@@ -0,0 +1,26 @@
+""" memory_db_test.py - test loading the flatland database into memory """
+
+import os
+import sqlite3
+from flatland.database.flatlanddb import Memory_engine
+
+
+def test_memory_copy(tmp_path):
+    db_file = tmp_path / 'test.db'
+    with sqlite3.connect(db_file) as db:
+        db.execute('CREATE TABLE Color (Name TEXT, R INTEGER)')
+        db.execute("INSERT INTO Color VALUES ('red', 255)")
+    db.close()
+    os.chmod(db_file, 0o444)  # As on a read only install
+    engine = Memory_engine(db_file)
+    engine.execute("INSERT INTO Color VALUES ('blue', 0)")
+    # Every connection sees the same in memory database, but the file is untouched
+    assert engine.connect().execute('SELECT count(*) FROM Color').scalar() == 2
+    with sqlite3.connect(db_file) as db:
+        assert db.execute('SELECT count(*) FROM Color').fetchone()[0] == 1
+    db.close()
+
+
+def test_empty(tmp_path):
+    engine = Memory_engine(None)
+    assert engine.execute('SELECT count(*) FROM sqlite_master').scalar() == 0
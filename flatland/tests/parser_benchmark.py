@@ -0,0 +1,52 @@
+"""
+parser_benchmark.py – Compare cold and warm parse times for the example models and layouts
+
+Cold: the grammar is compiled for every file, as it would be by a fresh flatland process
+Disk: the compiled grammar is loaded from the on disk parser cache instead
+Warm: the grammar compiled for the first file is reused for all the others
+
+Run with: python -m flatland.tests.parser_benchmark
+"""
+import time
+import tempfile
+from pathlib import Path
+from flatland.flatland_exceptions import FlatlandException
+from flatland.input.parser_cache import ParserCache
+from flatland.input.model_parser import ModelParser
+from flatland.input.layout_parser import LayoutParser
+
+exdir = Path(__file__).parent.parent / "examples"
+inputs = [(ModelParser, f) for f in sorted((exdir / "xuml_models").glob("*.xmm"))] + \
+         [(LayoutParser, f) for f in sorted((exdir / "layouts").glob("*.mls"))]
+
+
+def parse_all(mode: str) -> float:
+    """Parse every input file, returning total elapsed seconds"""
+    total = 0
+    for parser_class, f in inputs:
+        if mode != 'warm':
+            ParserCache.Parsers.clear()  # Forget the compiled grammar so that each file starts cold
+        start = time.perf_counter()
+        try:
+            parser_class(f, debug=False).parse()
+        except FlatlandException:
+            pass  # A few examples are intentionally incomplete, we still count the time spent
+        total += time.perf_counter() - start
+    return total
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ParserCache.Directory = Path(cache_dir)
+        cold = parse_all('cold')
+        ParserCache.Persist = True
+        parse_all('warm')  # Save each compiled grammar to the disk cache
+        disk = parse_all('disk')
+        ParserCache.Persist = False
+    ParserCache.clear()
+    warm = parse_all('warm')
+    n = len(inputs)
+    print(f'Parsed {n} example models and layouts')
+    for mode, t in (('cold', cold), ('disk', disk), ('warm', warm)):
+        print(f'{mode:5} {t:8.3f}s total {1000 * t / n:8.2f}ms per file')
+    print(f'Warm speedup: {cold / warm:.1f}x')
@@ -0,0 +1,32 @@
+""" parser_cache_test.py - test compiled grammar reuse """
+
+from flatland.input.parser_cache import ParserCache, compiled_parser
+from flatland.input.model_parser import ModelParser
+from flatland.input.nocomment import nocomment
+
+grammar = nocomment(open(ModelParser.grammar_file, 'r').read())
+
+
+def setup_function():
+    ParserCache.clear()
+
+
+def test_grammar_compiled_once():
+    p = compiled_parser(grammar, ModelParser.root_rule_name)
+    assert compiled_parser(grammar, ModelParser.root_rule_name) is p
+    assert (ParserCache.Compiled, ParserCache.Reused) == (1, 1)
+    # A different root rule or any grammar change is another parser
+    assert compiled_parser(grammar, 'class_set') is not p
+    assert compiled_parser(grammar + 'extra_rule = "x"\n', ModelParser.root_rule_name) is not p
+    assert ParserCache.Compiled == 3
+
+
+def test_persisted_parser(tmp_path, monkeypatch):
+    monkeypatch.setattr(ParserCache, 'Directory', tmp_path)
+    monkeypatch.setattr(ParserCache, 'Persist', True)
+    compiled_parser(grammar, ModelParser.root_rule_name)
+    ParserCache.clear()
+    p = compiled_parser(grammar, ModelParser.root_rule_name)
+    assert (ParserCache.Compiled, ParserCache.Loaded) == (0, 1)
+    model = ModelParser(model_file_path=ModelParser.xuml_model_dir / 'aircraft2.xmm', debug=False)
+    assert p.parse(model.model_text)
@@ -0,0 +1,59 @@
+"""
+rebuild_benchmark.py – Measure how long it takes to rebuild the flatland database
+
+Each rebuild runs in a fresh process, as it would on the command line, and writes to a temporary
+directory so the installed database and snapshot are left alone.
+
+Run with: python -m flatland.tests.rebuild_benchmark [-n REBUILDS] [-m]
+"""
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+
+def rebuild_once(directory: Path, in_memory: bool) -> dict:
+    """Rebuild the database into a directory, returning the seconds taken by each step"""
+    import time
+    start = time.perf_counter()
+    from flatland.database.flatlanddb import FlatlandDB
+    from flatland.database.snapshot import Snapshot
+    from flatland.configuration.config import build_snapshot
+    imported = time.perf_counter()
+    FlatlandDB.File = directory / 'flatland.db'
+    FlatlandDB.LogFile = directory / 'db.log'
+    Snapshot.Directory = directory
+    FlatlandDB(rebuild=not in_memory, in_memory=in_memory)  # In memory, a missing file is built in memory
+    built = time.perf_counter()
+    build_snapshot()
+    compiled = time.perf_counter()
+    return {'import': imported - start, 'database': built - imported, 'snapshot': compiled - built,
+            'total': compiled - start}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Flatland database rebuild benchmark')
+    parser.add_argument('-n', '--rebuilds', type=int, default=5)
+    parser.add_argument('-m', '--in_memory', action='store_true', help='Build the database in memory')
+    parser.add_argument('--once', help=argparse.SUPPRESS)  # Directory for a single rebuild in this process
+    args = parser.parse_args()
+
+    if args.once:
+        print(json.dumps(rebuild_once(Path(args.once), args.in_memory)))
+        sys.exit(0)
+
+    runs = []
+    for _ in range(args.rebuilds):
+        with tempfile.TemporaryDirectory() as d:
+            command = [sys.executable, '-m', 'flatland.tests.rebuild_benchmark', '--once', d]
+            if args.in_memory:
+                command.append('-m')
+            out = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            runs.append(json.loads(out.splitlines()[-1]))
+    print(f"{args.rebuilds} rebuilds {'in memory' if args.in_memory else 'on disk'}")
+    for step in ('import', 'database', 'snapshot', 'total'):
+        times = [r[step] for r in runs]
+        print(f'{step:<9} median {1000 * statistics.median(times):8.1f}ms  best {1000 * min(times):8.1f}ms')
@@ -0,0 +1,39 @@
+""" rebuild_test.py - test rebuilding the flatland database in a single transaction """
+
+import pytest
+
+pytest.importorskip('cairo')
+from sqlalchemy import select, func
+import flatland.database.flatlanddb as flatlanddb
+from flatland.database.flatlanddb import FlatlandDB
+
+
+def test_rebuild(temp_db):
+    FlatlandDB(rebuild=True, in_memory=False)
+    assert FlatlandDB.Rebuilt and temp_db.exists()
+    assert not FlatlandDB.Connection.connection.in_transaction  # Committed
+    # Later writes get the usual journal and wait for the disk
+    assert FlatlandDB.Connection.execute("PRAGMA journal_mode").scalar() == 'delete'
+    assert FlatlandDB.Connection.execute("PRAGMA synchronous").scalar() == 2  # FULL
+    bplace_t = FlatlandDB.MetaData.tables['Box Placement']
+    assert FlatlandDB.Connection.execute(select([func.count()]).select_from(bplace_t)).scalar() > 0
+
+
+def test_failed_rebuild(temp_db, monkeypatch):
+    def fail():
+        raise RuntimeError('bad population')
+    monkeypatch.setattr(flatlanddb, 'Populate', fail)
+    with pytest.raises(RuntimeError):
+        FlatlandDB(rebuild=True, in_memory=False)
+    assert not temp_db.exists()  # Not left to be loaded next time
+
+
+def test_symbol_lengths(temp_db):
+    FlatlandDB(rebuild=True, in_memory=False)
+    symbol_t = FlatlandDB.MetaData.tables['Symbol']
+    lengths = dict(FlatlandDB.Connection.execute(select([symbol_t.c.Name, symbol_t.c.Length])).fetchall())
+    assert lengths['gen arrow'] == 12  # Arrow height
+    assert lengths['solid small dot'] == 14  # Circle diameter
+    assert lengths['superclass cross'] == 16  # Root and vine offsets
+    assert lengths['double solid arrow'] == 18  # Adjacent arrows
+    assert lengths['circled dot'] == 22  # Layered circles
@@ -0,0 +1,44 @@
+""" render_state_test.py - test that redundant graphics state changes are skipped """
+
+from flatland.drawing_domain.render_state import RenderState
+
+
+class RecordingContext:
+    """Stands in for a cairo context, recording each call"""
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+
+def test_redundant_changes_skipped():
+    ctx = RecordingContext()
+    state = RenderState(ctx)
+    for _ in range(3):
+        state.set_dash([])
+        state.set_line_width(1)
+        state.set_source_rgb((0.0, 0.0, 0.0))
+    state.set_line_width(2)
+    assert ctx.calls == [('set_dash', ([],)), ('set_line_width', (1,)), ('set_source_rgb', (0.0, 0.0, 0.0)),
+                         ('set_line_width', (2,))]
+    assert (state.Changed, state.Elided) == (4, 6)
+
+
+def test_fonts():
+    ctx = RecordingContext()
+    state = RenderState(ctx)
+    state.select_font_face('Palatino', 0, 1)
+    state.set_font_size(9)
+    state.select_font_face('Palatino', 0, 1)
+    state.select_font_face('Palatino', 1, 1)
+    assert [c[0] for c in ctx.calls] == ['select_font_face', 'set_font_size', 'select_font_face']
+
+
+def test_forget():
+    ctx = RecordingContext()
+    state = RenderState(ctx)
+    state.set_source_rgb((1.0, 1.0, 1.0))
+    state.forget('set_source_rgb')  # Such as after painting an image
+    state.set_source_rgb((1.0, 1.0, 1.0))
+    assert len(ctx.calls) == 2
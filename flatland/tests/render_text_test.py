@@ -0,0 +1,35 @@
+""" render_text_test.py - test rendering a diagram from model and layout text """
+
+import pytest
+from pathlib import Path
+
+pytest.importorskip('cairo')
+from flatland.database.flatlanddb import FlatlandDB
+from flatland.xuml.render import render_text
+from flatland.flatland_exceptions import LayoutModelMismatch, LayoutParseError, UnknownSheetSize
+
+examples = Path(__file__).parent.parent / 'examples'
+model = (examples / 'xuml_models' / 'aircraft2.xmm').read_text()
+layout = (examples / 'layouts' / 't001_straight_binary_horiz.mls').read_text()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    FlatlandDB(rebuild=False)
+
+
+def test_pdf_bytes():
+    assert render_text(model, layout).startswith(b'%PDF')
+
+
+def test_svg_bytes():
+    assert b'<svg' in render_text(model, layout, output_format='svg')
+
+
+def test_errors_raised():
+    with pytest.raises(LayoutParseError):
+        render_text(model, 'not a layout')
+    with pytest.raises(LayoutModelMismatch):
+        render_text(model, layout.replace('l*|Pilot', 'l*|Navigator'))
+    with pytest.raises(UnknownSheetSize, match='napkin'):
+        render_text(model, layout.replace('sheet letter', 'sheet napkin'))
@@ -0,0 +1,33 @@
+""" rotation_test.py - test symbol rotations """
+
+import pytest
+from flatland.datatypes.geometry_types import Position
+from flatland.datatypes.connection_types import NodeFace
+from flatland.decoration_subsystem import rotation
+from flatland.decoration_subsystem.rotation import rotate, rotate_all, rotation_matrix, face_rotations
+
+arrow = [Position(0, 0), Position(4, -10), Position(-4, -10)]
+
+
+def test_face_rotations():
+    r = face_rotations([arrow])[0]
+    assert r[NodeFace.BOTTOM] == arrow
+    assert r[NodeFace.TOP] == [Position(0, 0), Position(-4, 10), Position(4, 10)]
+    assert r[NodeFace.LEFT] == [Position(0, 0), Position(-10, -4), Position(-10, 4)]
+    assert r[NodeFace.RIGHT] == [Position(0, 0), Position(10, 4), Position(10, -4)]
+    assert all(type(c) is int for p in r[NodeFace.LEFT] for c in p)
+
+
+def test_any_angle():
+    assert rotation_matrix(-90) == rotation_matrix(270) == rotation.face_rotation[NodeFace.LEFT]
+    p = rotate([Position(10, 0)], rotation_matrix(30))[0]
+    assert p.x == pytest.approx(8.660254) and p.y == pytest.approx(5)
+
+
+def test_numpy_batch(monkeypatch):
+    pytest.importorskip('numpy')
+    shapes = [arrow] * 400
+    expected = [rotate(s, rotation_matrix(45)) for s in shapes]
+    monkeypatch.setattr(rotation, 'numpy_threshold', 1)
+    batch = rotate_all(shapes, rotation_matrix(45))
+    assert [[tuple(pytest.approx(c) for c in p) for p in s] for s in batch] == expected
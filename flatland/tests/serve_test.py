@@ -0,0 +1,46 @@
+""" serve_test.py - test render server request handling """
+
+import pytest
+import asyncio
+import logging
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from flatland.xuml.serve import RenderServer, render_request
+
+
+def respond(method, path, body=b'', pending=0):
+    server = RenderServer.__new__(RenderServer)  # No worker pool is needed to turn requests away
+    server.Served, server.Pending, server.Max_pending = 0, pending, 2
+    return asyncio.run(server.respond(method, path, body))
+
+
+def test_routing():
+    assert respond('GET', '/health').status == 200
+    assert respond('GET', '/diagram').status == 404
+    assert respond('GET', '/render').status == 405
+    assert respond('POST', '/render', b'{not json').status == 400
+    assert respond('POST', '/render', b'{"model": "", "layout": ""}', pending=2).status == 503
+
+
+class BrokenPool(Executor):
+    """Fails every task as a pool does once one of its workers has died"""
+    def submit(self, fn, *args, **kwargs):
+        f = Future()
+        f.set_exception(BrokenProcessPool('A worker died'))
+        return f
+
+
+def test_broken_pool_replaced(monkeypatch):
+    server = RenderServer.__new__(RenderServer)
+    server.Served, server.Pending, server.Max_pending = 0, 0, 2
+    server.logger = logging.getLogger(__name__)
+    server.Pool = BrokenPool()
+    monkeypatch.setattr(RenderServer, 'start_pool', lambda self: 'new pool')
+    assert asyncio.run(server.respond('POST', '/render', b'{"model": "", "layout": ""}')).status == 500
+    assert server.Pool == 'new pool' and server.Pending == 0
+
+
+def test_bad_payload():
+    pytest.importorskip('cairo')
+    assert render_request({'model': 'x', 'layout': 'y', 'format': 'gif'}).status == 400
+    assert render_request({'model': 'x'}).status == 400
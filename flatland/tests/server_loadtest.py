@@ -0,0 +1,79 @@
+"""
+server_loadtest.py – Measure render server latency by posting the bundled examples to it
+
+Start a server first, for example: flatland -SV -J 4
+Then run with: python -m flatland.tests.server_loadtest [-u URL] [-n REQUESTS] [-c CONCURRENCY] [-f FORMAT]
+"""
+import json
+import time
+import argparse
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+exdir = Path(__file__).parent.parent / "examples"
+examples = [
+    ('xuml_models/aircraft2.xmm', 'layouts/t001_straight_binary_horiz.mls'),
+    ('xuml_models/aircraft3.xmm', 'layouts/t034_2bend_tertiary_above.mls'),
+    ('xuml_models/aircraft_tree4.xmm', 'layouts/t055_p2_three_branch_one_graft.mls'),
+    ('xuml_models/thin_node.xmm', 'layouts/t009_expand.mls'),
+    ('road/road_subsystem_class_model.xmm', 'road/road_subsystem_class_diagram.mls'),
+    ('road/ego_subsystem_class_model.xmm', 'road/ego_subsystem_class_diagram.mls'),
+    ('road/mlm.xsm', 'road/mlm.mls'),
+    ('atc/atc.xsm', 'atc/atc.mls'),
+    ('elevator/door.xsm', 'elevator/door.mls'),
+]
+
+
+def payloads(fmt: str) -> List[bytes]:
+    """A request body for each example"""
+    return [json.dumps({
+        'model': (exdir / m).read_text(), 'layout': (exdir / l).read_text(),
+        'model_type': Path(m).suffix, 'format': fmt,
+    }).encode('utf-8') for m, l in examples]
+
+
+def post(url: str, body: bytes) -> Tuple[float, int]:
+    """Post one request, returning its latency in seconds and the HTTP status"""
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest rank percentile of an ascending list"""
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Flatland render server load test')
+    parser.add_argument('-u', '--url', default='http://127.0.0.1:8765/render')
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-f', '--format', default='pdf')
+    args = parser.parse_args()
+
+    bodies = payloads(args.format)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda i: post(args.url, bodies[i % len(bodies)]), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(t for t, _ in results)
+    statuses = {}
+    for _, s in results:
+        statuses[s] = statuses.get(s, 0) + 1
+    print(f'{args.requests} requests, {args.concurrency} at a time, {len(examples)} examples in {elapsed:.3f}s '
+          f'({args.requests / elapsed:.1f}/s)')
+    print(f'Status: {", ".join(f"{s}: {n}" for s, n in sorted(statuses.items()))}')
+    for p in (50, 90, 99):
+        print(f'p{p:<3} {1000 * percentile(latencies, p):8.1f}ms')
+    print(f'max  {1000 * latencies[-1]:8.1f}ms')
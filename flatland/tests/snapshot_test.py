@@ -0,0 +1,45 @@
+""" snapshot_test.py - test loading the compiled database snapshot """
+
+import os
+from flatland.database.snapshot import Snapshot
+
+
+def load_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(Snapshot, 'Directory', tmp_path / 'cache')
+    monkeypatch.setattr(Snapshot, 'Loaded', False)
+    monkeypatch.setattr(Snapshot, 'Content', {})
+    db_file = tmp_path / 'test.db'
+    db_file.write_bytes(b'tables')
+    Snapshot.save(db_file, {'StyleDB': {'typeface': {'C': 'courier'}}})
+    return db_file
+
+
+def test_current_snapshot(tmp_path, monkeypatch):
+    db_file = load_snapshot(tmp_path, monkeypatch)
+    assert Snapshot.lookup('StyleDB') is None  # Nothing until loaded
+    assert Snapshot.load(db_file)
+    assert Snapshot.lookup('StyleDB', 'typeface') == {'C': 'courier'}
+    assert Snapshot.lookup('StyleDB', 'line_style') is None
+    assert Snapshot.lookup('Symbol', ('class', 'Starr')) is None
+
+
+def test_stale_snapshot(tmp_path, monkeypatch):
+    db_file = load_snapshot(tmp_path, monkeypatch)
+    s = db_file.stat()
+    os.utime(db_file, ns=(s.st_atime_ns, s.st_mtime_ns + 1_000_000))
+    assert not Snapshot.load(db_file)
+    assert Snapshot.lookup('StyleDB') is None
+
+
+def test_unreadable_snapshot(tmp_path, monkeypatch):
+    db_file = load_snapshot(tmp_path, monkeypatch)
+    Snapshot.cache_file(db_file, '.snapshot').write_bytes(b'not a pickle')
+    assert not Snapshot.load(db_file)
+
+
+def test_saved_in_cache(tmp_path, monkeypatch):
+    db_file = load_snapshot(tmp_path, monkeypatch)
+    assert sorted(tmp_path.iterdir()) == [tmp_path / 'cache', db_file]  # Nothing written beside the database
+    assert list(Snapshot.Directory.iterdir()) == [Snapshot.cache_file(db_file, '.snapshot')]  # No temporary file
+    other = tmp_path / 'other' / 'test.db'
+    assert Snapshot.cache_file(other, '.snapshot') != Snapshot.cache_file(db_file, '.snapshot')  # One per install
@@ -0,0 +1,27 @@
+""" surface_test.py - test output surface selection """
+
+import io
+import pytest
+from pathlib import Path
+
+pytest.importorskip('cairo')
+from flatland.drawing_domain.surface import OutputSurface, format_of
+from flatland.datatypes.geometry_types import Rect_Size
+
+
+def test_format_of():
+    assert format_of('diagram.svg') == 'svg'
+    assert format_of(Path('out/diagram.PNG')) == 'png'
+    assert format_of('diagram') == 'pdf'
+    assert format_of(io.BytesIO()) == 'pdf'
+
+
+def test_png_bytes():
+    output = io.BytesIO()
+    sheet = OutputSurface(output, 'png', Rect_Size(height=72, width=144), dpi=144)
+    context = sheet.context()
+    context.rectangle(0, 0, 10, 10)
+    context.fill()
+    sheet.finish()
+    assert output.getvalue().startswith(b'\x89PNG')
+    assert (sheet.Surface.get_width(), sheet.Surface.get_height()) == (288, 144)
@@ -0,0 +1,29 @@
+""" symbol_test.py - test loading the symbols of a diagram type and notation """
+
+import pytest
+from flatland.database.flatlanddb import FlatlandDB
+from flatland.decoration_subsystem.symbol import Symbol
+
+
+@pytest.fixture(scope='module', autouse=True)
+def database():
+    FlatlandDB(rebuild=False, in_memory=True)
+
+
+def test_load():
+    symbols = Symbol.load(diagram_type='state machine', notation='xUML')
+    assert set(symbols) == {'circled dot', 'solid arrow', 'solid small dot', 'hollow large circle'}
+    circled = symbols['circled dot']
+    assert circled.type == 'compound' and circled.length == 22
+    assert [(p.symbol, p.type, p.arrange) for p in circled.spec] == [
+        ('hollow large circle', 'circle', 'layer'), ('solid small dot', 'circle', None)]
+    assert symbols['solid arrow'].spec.shape.rotations  # Computed for each node face
+
+
+def test_loaded_once(monkeypatch):
+    monkeypatch.setattr(Symbol, 'loaded', {})
+    monkeypatch.setattr(Symbol, 'instances', {})
+    Symbol(diagram_type='class', notation='Starr')
+    monkeypatch.setattr(Symbol, 'load', None)  # Any further load would fail
+    Symbol(diagram_type='class', notation='Starr')
+    assert Symbol.instances['double solid arrow'].length == 18
@@ -0,0 +1,51 @@
+""" text_metrics_test.py - test the text metrics cache """
+
+from flatland.drawing_domain.text_metrics import TextMetrics
+from flatland.drawing_domain.styledb import Text_Style
+from flatland.datatypes.geometry_types import Rect_Size
+
+body = Text_Style(typeface='p', size=11, slant='normal', weight='normal', color='black', spacing=1.2)
+red_body = Text_Style(typeface='p', size=11, slant='normal', weight='normal', color='red', spacing=1.2)
+bold_body = Text_Style(typeface='p', size=11, slant='normal', weight='bold', color='black', spacing=1.2)
+
+
+def setup_function():
+    TextMetrics.clear()
+
+
+def test_hits_and_misses():
+    assert TextMetrics.lookup(body, 'Aircraft') is None
+    TextMetrics.store(body, 'Aircraft', Rect_Size(height=8, width=40))
+    assert TextMetrics.lookup(body, 'Aircraft') == Rect_Size(height=8, width=40)
+    # Color does not affect the measurement, but weight does
+    assert TextMetrics.lookup(red_body, 'Aircraft') == Rect_Size(height=8, width=40)
+    assert TextMetrics.lookup(bold_body, 'Aircraft') is None
+    stats = TextMetrics.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 2, 1)
+
+
+def test_least_recently_used_evicted(monkeypatch):
+    monkeypatch.setattr(TextMetrics, 'Max_entries', 2)
+    TextMetrics.store(body, 'a', Rect_Size(height=8, width=1))
+    TextMetrics.store(body, 'b', Rect_Size(height=8, width=2))
+    TextMetrics.lookup(body, 'a')  # b is now the least recently used
+    TextMetrics.store(body, 'c', Rect_Size(height=8, width=3))
+    assert TextMetrics.lookup(body, 'b') is None
+    assert TextMetrics.lookup(body, 'a') and TextMetrics.lookup(body, 'c')
+    assert TextMetrics.stats().evictions == 1
+
+
+def test_save_and_load(tmp_path):
+    cache_file = tmp_path / 'cache' / 'text_metrics.json'
+    TextMetrics.store(body, 'Pilot', Rect_Size(height=8, width=25.5))
+    TextMetrics.save(cache_file)
+    TextMetrics.clear()
+    assert TextMetrics.load(cache_file) == 1
+    assert TextMetrics.lookup(body, 'Pilot') == Rect_Size(height=8, width=25.5)
+
+
+def test_load_ignores_bad_file(tmp_path):
+    cache_file = tmp_path / 'text_metrics.json'
+    cache_file.write_text('not json')
+    assert TextMetrics.load(cache_file) == 0
+    assert TextMetrics.load(tmp_path / 'missing.json') == 0
@@ -0,0 +1,243 @@
+"""
+batch.py – Generates many xuml diagrams in a single run, optionally across worker processes
+"""
+
+import logging
+import signal
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from collections import namedtuple
+from typing import List, Optional, Sequence
+from flatland.flatland_exceptions import FlatlandException, BatchManifestOpen, BatchManifestEntry
+from flatland.input.nocomment import nocomment
+from flatland.xuml.render import render_diagram, diagram_classes
+
+BatchJob = namedtuple('BatchJob', 'model layout diagram')
+"""
+A diagram to generate
+
+- model -- Path to an xuml class or state model file
+- layout -- Path to the flatland layout file for the model
+- diagram -- Path of the diagram file to generate
+"""
+
+BatchResult = namedtuple('BatchResult', 'job seconds error skipped')
+"""
+The outcome of generating one diagram
+
+- job -- The BatchJob
+- seconds -- Elapsed wall clock time
+- error -- Error description if the diagram could not be generated, otherwise None
+- skipped -- True if the diagram was already up to date
+"""
+
+diagram_suffix = '.pdf'
+
+
+def read_manifest(manifest: Path, output_dir: Path) -> List[BatchJob]:
+    """
+    Get the list of diagrams to generate from either a manifest file or a directory.
+
+    Each line of a manifest file specifies a model file, a layout file and, optionally, the diagram file name
+    separated by whitespace. Model and layout paths are relative to the manifest's directory. // comments
+    and blank lines are ignored. If the diagram is not specified, it is named after the layout file.
+
+    In a directory, each model file (.xmm, .xcm or .xsm) is paired with the layout file (.mls) of the same name.
+
+    :param manifest: A manifest file or a directory of model and layout files
+    :param output_dir: Diagrams are written here
+    :return: Diagrams to generate, in manifest or file name order
+    """
+    logger = logging.getLogger(__name__)
+    if manifest.is_dir():
+        jobs = []
+        for model in sorted(manifest.iterdir()):
+            if model.suffix not in diagram_classes:
+                continue
+            layout = model.with_suffix('.mls')
+            if not layout.exists():
+                logger.warning(f"Skipping model [{model.name}] -- No layout file named [{layout.name}]")
+                continue
+            jobs.append(BatchJob(model=model, layout=layout, diagram=output_dir / (layout.stem + diagram_suffix)))
+        return jobs
+
+    try:
+        text = nocomment(open(manifest, 'r').read())
+    except OSError:
+        raise BatchManifestOpen(manifest)
+    jobs = []
+    for line in text.splitlines() if text else []:
+        fields = line.split()
+        if len(fields) not in (2, 3):
+            raise BatchManifestEntry(manifest, line)
+        model, layout = manifest.parent / fields[0], manifest.parent / fields[1]
+        diagram = fields[2] if len(fields) == 3 else layout.stem + diagram_suffix
+        jobs.append(BatchJob(model=model, layout=layout, diagram=output_dir / diagram))
+    return jobs
+
+
+def render_job(job: BatchJob, show_grid: bool, nodes_only: bool, no_color: bool, incremental: bool) -> BatchResult:
+    """
+    Generate one diagram, trapping any error so that the rest of the batch can proceed
+
+    :param job: The diagram to generate
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    :param incremental: Skip the diagram if it was already generated from the same inputs
+    :return: The outcome
+    """
+    logger = logging.getLogger(__name__)
+    error = None
+    skipped = False
+    start = time.perf_counter()
+    try:
+        diagram = render_diagram(model_path=job.model, layout_path=job.layout, diagram_path=job.diagram,
+                                 show_grid=show_grid, nodes_only=nodes_only, no_color=no_color,
+                                 incremental=incremental)
+        skipped = diagram.skipped
+    except FlatlandException as e:
+        error = str(e).strip()
+    except Exception as e:
+        # Don't let one broken diagram take down the rest of the batch
+        logger.exception(f"Unexpected error generating [{job.diagram}]")
+        error = f'{type(e).__name__}: {e}'
+    seconds = time.perf_counter() - start
+    if error:
+        logger.error(f"Failed [{job.model.name}] + [{job.layout.name}] in {seconds:.3f}s: {error}")
+    elif not skipped:
+        logger.info(f"Generated [{job.diagram}] in {seconds:.3f}s")
+    return BatchResult(job=job, seconds=seconds, error=error, skipped=skipped)
+
+
+def init_worker(text_cache: bool, parser_cache: bool, sort_styles: bool = False, batch_strokes: bool = False,
+                also_formats: Sequence[str] = (), dpi: float = 96, fit_images: bool = False,
+                in_memory: bool = False):
+    """
+    Warm load everything shared by the diagrams generated in a worker process. StyleDB, Symbol and
+    FlatlandDB hold their data in class attributes, so each worker needs its own copy.
+
+    :param text_cache: Start with any saved text measurements
+    :param parser_cache: Load compiled parsers saved in the user's flatland home
+    :param sort_styles: Group elements by style when rendering each layer
+    :param batch_strokes: Stroke all line segments of the same style at once
+    :param also_formats: Also write each diagram in these formats
+    :param dpi: Resolution of png output
+    :param fit_images: Scale images down to fit their fields
+    :param in_memory: Each worker loads its own copy of the database into memory
+    """
+    from flatland.database.flatlanddb import FlatlandDB
+    from flatland.database.snapshot import Snapshot
+    from flatland.configuration.config import update_config_tables
+    from flatland.drawing_domain.styledb import StyleDB
+    from flatland.drawing_domain.layer import Layer
+    from flatland.drawing_domain.tablet import Tablet
+    from flatland.drawing_domain.text_metrics import TextMetrics
+    from flatland.input.parser_cache import ParserCache
+    # Ctrl-C is handled by the parent process, which shuts us down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    FlatlandDB(rebuild=False, in_memory=in_memory)
+    # The parent applied any configuration changes to the database file, but not to our in-memory copy of it
+    if update_config_tables():
+        Snapshot.discard()
+    StyleDB()
+    ParserCache.Persist = parser_cache
+    Layer.Sort_styles = sort_styles
+    Layer.Batch_strokes = batch_strokes
+    Layer.Fit_images = fit_images
+    Tablet.Also_formats = list(also_formats)
+    Tablet.Dpi = dpi
+    compile_parsers()
+    if text_cache:
+        TextMetrics.load()
+
+
+def compile_parsers():
+    """Compile each grammar so that the first diagram doesn't pay for it"""
+    from flatland.input.parser_cache import compiled_parser
+    from flatland.input.model_parser import ModelParser
+    from flatland.input.layout_parser import LayoutParser
+    from flatland.input.statemodel_parser import StateModelParser
+    for p in (ModelParser, LayoutParser, StateModelParser):
+        compiled_parser(nocomment(open(p.grammar_file, 'r').read()), p.root_rule_name)
+
+
+def render_batch(jobs: List[BatchJob], show_grid: bool = False, nodes_only: bool = False,
+                 no_color: bool = False, incremental: bool = False, workers: int = 1,
+                 text_cache: bool = False) -> List[BatchResult]:
+    """
+    Generate each diagram in turn. The database connection, styles, symbols, compiled parsers and
+    text measurements loaded for the first diagram are reused by all the others.
+
+    With more than one worker, the diagrams are spread across that many processes, each warm loaded once.
+    Results are returned in job order regardless of which diagram finishes first.
+
+    :param jobs: Diagrams to generate
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    :param incremental: Skip any diagram already generated from the same inputs
+    :param workers: Number of processes to use
+    :param text_cache: Workers start with any saved text measurements
+    :return: The outcome of each job in the same order
+    """
+    for job in jobs:
+        job.diagram.parent.mkdir(parents=True, exist_ok=True)
+    render = partial(render_job, show_grid=show_grid, nodes_only=nodes_only, no_color=no_color,
+                     incremental=incremental)
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        return [render(job) for job in jobs]
+
+    with worker_pool(workers=workers, text_cache=text_cache) as pool:
+        return list(pool.map(render, jobs))
+
+
+def worker_pool(workers: int, text_cache: bool = False, also_formats: Optional[Sequence[str]] = None) \
+        -> ProcessPoolExecutor:
+    """
+    Create a pool of worker processes, each warm loaded with the same settings as this process
+
+    :param workers: Number of processes
+    :param text_cache: Workers start with any saved text measurements
+    :param also_formats: Extra output formats, if not the ones we are using
+    :return: The process pool
+    """
+    from flatland.input.parser_cache import ParserCache
+    from flatland.database.flatlanddb import FlatlandDB
+    from flatland.drawing_domain.layer import Layer
+    from flatland.drawing_domain.tablet import Tablet
+    # Spawn rather than fork so that no worker inherits our database connection or graphics state
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_worker,
+                               initargs=(text_cache, ParserCache.Persist, Layer.Sort_styles, Layer.Batch_strokes,
+                                         Tablet.Also_formats if also_formats is None else also_formats, Tablet.Dpi,
+                                         Layer.Fit_images, FlatlandDB.In_memory))
+
+
+def report(results: List[BatchResult], total_seconds: Optional[float] = None) -> str:
+    """
+    Summarize a batch run with the time taken for each diagram
+
+    :param results: Outcome of each job
+    :param total_seconds: Elapsed time for the whole batch, if known
+    :return: Printable report
+    """
+    lines = []
+    for r in results:
+        status = 'FAILED' if r.error else 'same' if r.skipped else 'ok'
+        lines.append(f'{r.seconds:8.3f}s  {status:6}  {r.job.diagram.name}  ({r.job.model.name}, {r.job.layout.name})')
+        if r.error:
+            lines.append(f'           {r.error}')
+    failures = [r for r in results if r.error]
+    total = total_seconds if total_seconds is not None else sum(r.seconds for r in results)
+    skipped = len([r for r in results if r.skipped])
+    lines.append(f'{len(results) - len(failures)} of {len(results)} diagrams generated in {total:.3f}s' +
+                 (f' ({skipped} already up to date)' if skipped else ''))
+    if failures:
+        lines.append('Failed:')
+        lines += [f'    {r.job.model} + {r.job.layout}' for r in failures]
+    return '\n'.join(lines)
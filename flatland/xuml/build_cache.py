@@ -0,0 +1,124 @@
+"""
+build_cache.py – Remembers what each diagram was generated from so that unchanged diagrams can be skipped
+"""
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+from flatland import version
+from flatland.configuration.config import Config
+from flatland.sheet_subsystem.resource import image_path
+
+
+class BuildCache:
+    """
+    Singleton class that fingerprints everything a diagram depends on: the model and layout files, the
+    database population and style configuration, any title block images, the flatland version and the
+    drawing options. After a diagram is successfully generated, its fingerprint is saved in a small stamp
+    file in the user's flatland home. If the next request for the same diagram has the same fingerprint
+    and the diagram file is still as we left it, there is no need to generate it again.
+
+    We fingerprint the population and configuration files rather than the database file itself,
+    since the database is rebuilt from those files and its bytes can change without any change in content.
+
+        Attributes
+
+        - Directory -- Where stamp files are saved, one per diagram
+        - Config_digest -- Hash of the database population and style configuration, computed once
+    """
+    Directory = Path.home() / '.flatland' / 'cache' / 'builds'
+    Config_digest = None
+
+    @staticmethod
+    def config_digest() -> str:
+        """Hash of every file that determines the database content and title block images"""
+        if not BuildCache.Config_digest:
+            h = hashlib.sha256()
+            db_home = Config.pop_home.parent
+            sources = [db_home / 'relvars.py'] + sorted(Config.pop_home.rglob('*_instances.py'))
+            sources += [Config.system_config_home / f'{t.name}.yaml' for t in Config.tables]
+            sources += [Config.user_config_home / f'{t.name}.yaml' for t in Config.tables]
+            for f in sources:
+                h.update(str(f.relative_to(db_home) if f.is_relative_to(db_home) else f).encode('utf-8'))
+                h.update(f.read_bytes() if f.exists() else b'\0')
+            # Images are large and rarely change, so we only check that they are the same files
+            for f in sorted(image_path.glob('*')) if image_path.exists() else []:
+                s = f.stat()
+                h.update(f'{f.name} {s.st_size} {s.st_mtime_ns}'.encode('utf-8'))
+            BuildCache.Config_digest = h.hexdigest()
+        return BuildCache.Config_digest
+
+    @staticmethod
+    def fingerprint(model_path: Path, layout_path: Path, options: Dict) -> str:
+        """
+        Hash of everything the diagram depends on
+
+        :param model_path: The xuml model file
+        :param layout_path: The flatland layout file
+        :param options: Every rendering setting that changes the output, see render.rendering_options
+        :return: Fingerprint
+        """
+        h = hashlib.sha256()
+        h.update(version.encode('utf-8'))
+        h.update(BuildCache.config_digest().encode('utf-8'))
+        for f in (model_path, layout_path):
+            h.update(b'\0')
+            h.update(f.read_bytes())
+        h.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return h.hexdigest()
+
+    @staticmethod
+    def stamp_path(diagram_path: Path) -> Path:
+        """Each diagram gets its own stamp file so that parallel workers never write the same file"""
+        name = hashlib.sha256(str(diagram_path.resolve()).encode('utf-8')).hexdigest()
+        return BuildCache.Directory / f'{name}.json'
+
+    @staticmethod
+    def diagram_state(diagram_path: Path) -> Optional[str]:
+        """Size and modification time of the diagram file, or None if it doesn't exist"""
+        try:
+            s = diagram_path.stat()
+        except OSError:
+            return None
+        return f'{s.st_size} {s.st_mtime_ns}'
+
+    @staticmethod
+    def up_to_date(diagram_path: Path, fingerprint: str) -> bool:
+        """
+        Was this diagram last generated from exactly the same inputs?
+
+        :param diagram_path: The diagram file
+        :param fingerprint: Fingerprint of the current inputs
+        :return: True if the diagram can be left as is
+        """
+        state = BuildCache.diagram_state(diagram_path)
+        if not state:
+            return False
+        try:
+            with open(BuildCache.stamp_path(diagram_path), 'r') as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return stamp.get('fingerprint') == fingerprint and stamp.get('diagram_state') == state
+
+    @staticmethod
+    def record(diagram_path: Path, fingerprint: str):
+        """
+        Remember the fingerprint of a successfully generated diagram
+
+        :param diagram_path: The diagram file
+        :param fingerprint: Fingerprint of the inputs it was generated from
+        """
+        logger = logging.getLogger(__name__)
+        path = BuildCache.stamp_path(diagram_path)
+        stamp = {'diagram': str(diagram_path.resolve()), 'fingerprint': fingerprint,
+                 'diagram_state': BuildCache.diagram_state(diagram_path)}
+        try:
+            BuildCache.Directory.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump(stamp, f)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not save build stamp for: [{diagram_path}] ({e})")
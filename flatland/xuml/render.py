@@ -0,0 +1,97 @@
+"""
+render.py – Generates the appropriate kind of xuml diagram for a model file
+"""
+import io
+from pathlib import Path
+from typing import Dict
+from flatland.flatland_exceptions import UnsupportedModelType
+from flatland.xuml.xuml_classdiagram import XumlClassDiagram
+from flatland.xuml.xuml_statemachine_diagram import XumlStateMachineDiagram
+from flatland.drawing_domain.tablet import Tablet
+from flatland.drawing_domain.layer import Layer
+
+# The model file suffix determines what kind of diagram we draw
+diagram_classes = {
+    '.xmm': XumlClassDiagram,  # Executable UML model markup
+    '.xcm': XumlClassDiagram,  # Executable UML class model
+    '.xsm': XumlStateMachineDiagram,  # Executable UML state model
+}
+
+
+def rendering_options(show_grid: bool, nodes_only: bool, no_color: bool) -> Dict:
+    """
+    Every setting that can change the generated diagram, whether it comes from the diagram request or
+    from a command line option that applies to all diagrams
+
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    :return: Setting values by name
+    """
+    return {
+        'show_grid': show_grid, 'nodes_only': nodes_only, 'no_color': no_color,
+        'dpi': Tablet.Dpi, 'also_formats': sorted(Tablet.Also_formats),
+        'fit_images': Layer.Fit_images, 'sort_styles': Layer.Sort_styles, 'batch_strokes': Layer.Batch_strokes,
+    }
+
+
+def render_diagram(model_path: Path, layout_path: Path, diagram_path: Path,
+                   show_grid: bool = False, nodes_only: bool = False, no_color: bool = False,
+                   incremental: bool = False):
+    """
+    Draw a model using its layout and write the diagram to a file
+
+    :param model_path: An xuml class or state model file
+    :param layout_path: Flatland layout file for the model
+    :param diagram_path: Diagram output file
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    :param incremental: Skip the diagram if it was already generated from the same inputs
+    :return: The generated XumlClassDiagram or XumlStateMachineDiagram
+    """
+    diagram_class = diagram_classes.get(model_path.suffix)
+    if not diagram_class:
+        raise UnsupportedModelType(model_path)
+    return diagram_class(
+        xuml_model_path=model_path,
+        flatland_layout_path=layout_path,
+        diagram_file_path=diagram_path,
+        show_grid=show_grid,
+        nodes_only=nodes_only,
+        no_color=no_color,
+        incremental=incremental,
+    )
+
+
+def render_text(model_text: str, layout_text: str, model_type: str = '.xcm', output_format: str = 'pdf',
+                show_grid: bool = False, nodes_only: bool = False, no_color: bool = False) -> bytes:
+    """
+    Draw a model using its layout entirely in memory, without reading or writing any files.
+    Any problem with the model or layout is raised as a FlatlandException rather than exiting.
+
+    :param model_text: Content of an xuml class or state model file
+    :param layout_text: Content of a Flatland layout file for the model
+    :param model_type: The model file suffix that would determine what kind of diagram to draw
+    :param output_format: pdf, svg or png
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    :return: Content of the diagram file
+    """
+    diagram_class = diagram_classes.get(model_type)
+    if not diagram_class:
+        raise UnsupportedModelType(model_type)
+    output = io.BytesIO()
+    diagram_class(
+        xuml_model_path=Path('model' + model_type),  # Only names the inputs in error messages
+        flatland_layout_path=Path('layout.mls'),
+        diagram_file_path=output,
+        show_grid=show_grid,
+        nodes_only=nodes_only,
+        no_color=no_color,
+        model_text=model_text,
+        layout_text=layout_text,
+        output_format=output_format,
+    )
+    return output.getvalue()
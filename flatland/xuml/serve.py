@@ -0,0 +1,217 @@
+"""
+serve.py – A local HTTP server that renders diagrams from posted model and layout text
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import namedtuple
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+content_types = {'pdf': 'application/pdf', 'svg': 'image/svg+xml', 'png': 'image/png'}
+"""Content type of each diagram output format"""
+reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+max_request_size = 16 * 1024 * 1024  # Far larger than any model and layout we have seen
+
+Response = namedtuple('Response', 'status content_type body')
+"""
+An HTTP response
+
+- status -- HTTP status code
+- content_type -- Content type of the body
+- body -- Response content as bytes
+"""
+
+
+def text_response(status: int, text: str) -> Response:
+    """A plain text response, usually an error description"""
+    return Response(status=status, content_type='text/plain; charset=utf-8', body=(text + '\n').encode('utf-8'))
+
+
+def render_request(payload: dict) -> Response:
+    """
+    Render the diagram requested in a payload. This runs in a worker process, so it relies on everything the
+    worker warm loaded: the database, styles, symbols, compiled parsers and measured text.
+
+    :param payload: The posted JSON object with 'model' and 'layout' text and, optionally, 'model_type' (.xcm,
+                    .xmm or .xsm), 'format' (pdf, svg or png) and the 'grid', 'nodes_only' and 'no_color' flags
+    :return: The diagram or an error description
+    """
+    from flatland.flatland_exceptions import FlatlandException
+    from flatland.xuml.render import render_text
+    fmt = payload.get('format', 'pdf')
+    if fmt not in content_types:
+        return text_response(400, f"Unsupported format: {fmt}")
+    if not isinstance(payload.get('model'), str) or not isinstance(payload.get('layout'), str):
+        return text_response(400, "Both model and layout text are required")
+    try:
+        body = render_text(
+            model_text=payload['model'], layout_text=payload['layout'],
+            model_type=payload.get('model_type', '.xcm'), output_format=fmt,
+            show_grid=bool(payload.get('grid')), nodes_only=bool(payload.get('nodes_only')),
+            no_color=bool(payload.get('no_color')),
+        )
+    except FlatlandException as e:
+        return text_response(400, str(e).strip())
+    except Exception as e:
+        logging.getLogger(__name__).exception("Unexpected error rendering a diagram")
+        return text_response(500, f'{type(e).__name__}: {e}')
+    return Response(status=200, content_type=content_types[fmt], body=body)
+
+
+def warm():
+    """Nothing to do, but the worker we run in must load everything first"""
+    return os.getpid()
+
+
+class RenderServer:
+    """
+    Accepts a diagram request as a JSON object posted to /render and responds with the rendered diagram.
+    GET /health reports how many requests have been served.
+
+    Rendering happens in a fixed size pool of warm loaded worker processes, so a slow diagram only ties up
+    one worker while the others keep serving. At most Max_pending requests wait for or occupy a worker.
+    Any more are turned away with 503 so that a burst can't queue unbounded work.
+
+        Attributes
+
+        - Host -- Address to listen on
+        - Port -- Port to listen on
+        - Workers -- Number of worker processes
+        - Max_pending -- Number of requests we accept at once
+        - Pending -- Number of requests waiting for or being rendered
+        - Served -- Number of diagrams rendered
+        - Text_cache -- Workers start with any saved text measurements
+        - Pool -- Worker process pool, replaced if a worker dies
+    """
+
+    def __init__(self, host: str, port: int, workers: int, max_pending: Optional[int] = None,
+                 text_cache: bool = False):
+        """
+        Constructor
+
+        :param host: Address to listen on
+        :param port: Port to listen on
+        :param workers: Number of worker processes
+        :param max_pending: Number of requests accepted at once, by default four for each worker
+        :param text_cache: Workers start with any saved text measurements
+        """
+        self.logger = logging.getLogger(__name__)
+        self.Host = host
+        self.Port = port
+        self.Workers = max(workers, 1)
+        self.Max_pending = max_pending or 4 * self.Workers
+        self.Pending = 0
+        self.Served = 0
+        self.Text_cache = text_cache
+        self.Pool = self.start_pool()
+
+    def start_pool(self):
+        """A fresh pool of worker processes, each warm loaded when it receives its first task"""
+        from flatland.xuml.batch import worker_pool
+        # Each response carries its own diagram, so there are no extra output formats to write
+        return worker_pool(workers=self.Workers, text_cache=self.Text_cache, also_formats=[])
+
+    async def respond(self, method: str, path: str, body: bytes) -> Response:
+        """
+        Produce the response to a request
+
+        :param method: HTTP method
+        :param path: Request path
+        :param body: Request content
+        :return: The response
+        """
+        if path == '/health':
+            return text_response(200, f"ok, {self.Served} served, {self.Pending} pending")
+        if path != '/render':
+            return text_response(404, f"Not found: {path}")
+        if method != 'POST':
+            return text_response(405, "Post a diagram request to /render")
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return text_response(400, f"Request is not valid JSON: {e}")
+        if not isinstance(payload, dict):
+            return text_response(400, "Request must be a JSON object")
+        if self.Pending >= self.Max_pending:
+            return text_response(503, "Too many diagrams pending, try again shortly")
+        self.Pending += 1
+        pool = self.Pool
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(pool, render_request, payload)
+        except BrokenProcessPool:
+            # A worker died, taking down the whole pool and every request it held
+            if pool is self.Pool:  # Only the first of those requests replaces the pool
+                self.logger.error("Worker process died, starting a new worker pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.Pool = self.start_pool()
+            return text_response(500, "Worker process died while rendering, try again")
+        finally:
+            self.Pending -= 1
+        if response.status == 200:
+            self.Served += 1
+        return response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Read one HTTP request from a connection and write the response"""
+        method, path = '', ''
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            lines = head.decode('latin-1').split('\r\n')
+            method, path = lines[0].split()[:2]
+            headers = dict(line.split(':', 1) for line in lines[1:] if ':' in line)
+            headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+            length = int(headers.get('content-length', 0))
+            if length > max_request_size:
+                response = text_response(413, "Request too large")
+            else:
+                response = await self.respond(method, path.split('?')[0], await reader.readexactly(length))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        except ValueError:
+            response = text_response(400, "Malformed HTTP request")
+        self.logger.info(f"{method} {path} {response.status} {len(response.body)} bytes")
+        writer.write(
+            f"HTTP/1.1 {response.status} {reasons[response.status]}\r\n"
+            f"Content-Type: {response.content_type}\r\n"
+            f"Content-Length: {len(response.body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('latin-1') + response.body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def run(self):
+        """Warm load every worker and then serve until cancelled"""
+        loop = asyncio.get_running_loop()
+        # Each worker process is started and warm loaded when it receives its first task
+        # so give every worker something to do before any request has to wait for it
+        await asyncio.gather(*(loop.run_in_executor(self.Pool, warm) for _ in range(self.Workers)))
+        server = await asyncio.start_server(self.handle, self.Host, self.Port)
+        print(f"Serving diagrams at http://{self.Host}:{self.Port}/render with {self.Workers} workers, ctrl-C to stop")
+        async with server:
+            await server.serve_forever()
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765, workers: int = 1, text_cache: bool = False):
+    """
+    Run a render server until interrupted
+
+    :param host: Address to listen on
+    :param port: Port to listen on
+    :param workers: Number of worker processes
+    :param text_cache: Workers start with any saved text measurements
+    """
+    server = RenderServer(host=host, port=port, workers=workers, text_cache=text_cache)
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        print("Stopped serving")
+    finally:
+        server.Pool.shutdown(cancel_futures=True)
@@ -0,0 +1,90 @@
+"""
+watch.py – Regenerates a diagram whenever its model or layout file changes
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Dict
+from flatland.flatland_exceptions import FlatlandException
+from flatland.xuml.render import render_diagram
+
+poll_interval = 0.2  # Seconds between checks for a file change
+
+
+def file_state(path: Path) -> Optional[tuple]:
+    """Modification time and size of a file, or None if it can't be read right now"""
+    try:
+        s = path.stat()
+    except OSError:
+        return None
+    return s.st_mtime_ns, s.st_size
+
+
+def wait_for_change(files: Dict[str, Path], last: Dict[str, Optional[tuple]]) -> Dict[str, bool]:
+    """
+    Wait until at least one file changes and then settles. Editors often save a file in more than one write,
+    so we don't report a change until the file has stopped changing for one poll interval.
+
+    :param files: Files to watch by role
+    :param last: State of each file when we last checked, updated with the new state
+    :return: Which files changed
+    """
+    while True:
+        time.sleep(poll_interval)
+        current = {k: file_state(f) for k, f in files.items()}
+        if current == last:
+            continue
+        time.sleep(poll_interval)
+        settled = {k: file_state(f) for k, f in files.items()}
+        if settled != current:
+            continue  # Still being written
+        changed = {k: settled[k] != last[k] for k in files}
+        last.update(settled)
+        return changed
+
+
+def watch(model_path: Path, layout_path: Path, diagram_path: Path,
+          show_grid: bool = False, nodes_only: bool = False, no_color: bool = False):
+    """
+    Generate the diagram and then keep generating it each time the model or layout file is saved until interrupted.
+    The database connection, styles, symbols, compiled grammars and text measurements stay loaded, and only
+    the file that changed is parsed again, so each update is quick.
+
+    An input error is reported and we just wait for the next change to the files.
+
+    :param model_path: An xuml class or state model file
+    :param layout_path: Flatland layout file for the model
+    :param diagram_path: Diagram output file
+    :param show_grid: Draw the diagnostic grid
+    :param nodes_only: Skip all connectors
+    :param no_color: Use white instead of the specified sheet color
+    """
+    logger = logging.getLogger(__name__)
+    files = {'model': model_path, 'layout': layout_path}
+    last = {k: file_state(f) for k, f in files.items()}
+    diagram = None
+    pending = {k: False for k in files}  # Files changed since the last successful update
+    print(f"Watching [{model_path}] and [{layout_path}], ctrl-C to stop")
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                if not diagram:
+                    # Nothing parsed successfully yet, so start from scratch
+                    diagram = render_diagram(model_path=model_path, layout_path=layout_path, diagram_path=diagram_path,
+                                             show_grid=show_grid, nodes_only=nodes_only, no_color=no_color)
+                else:
+                    diagram.update(model_changed=pending['model'], layout_changed=pending['layout'])
+                pending = {k: False for k in files}
+                print(f"Generated [{diagram_path}] in {time.perf_counter() - start:.3f}s")
+            except FlatlandException as e:
+                print(str(e).strip(), file=sys.stderr)
+                print(f"Diagram [{diagram_path}] not updated, waiting for a fix", file=sys.stderr)
+            changed = wait_for_change(files, last)
+            logger.info(f"Changed: {[k for k, v in changed.items() if v]}")
+            # A file that failed to parse is parsed again along with anything else that changed
+            pending = {k: pending[k] or changed[k] for k in files}
+    except KeyboardInterrupt:
+        print("Stopped watching")
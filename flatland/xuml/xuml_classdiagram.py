@@ -2,14 +2,13 @@
 xUML_class_diagram.py – Generates an xuml diagram for an xuml model using the Flatland draw engine
 """
 
-import sys
 import logging
 from pathlib import Path
-from flatland.flatland_exceptions import FlatlandIOException, MultipleFloatsInSameBranch
-from flatland.flatland_exceptions import LayoutParseError, ModelParseError
-from flatland.input.model_parser import ModelParser
-from flatland.input.layout_parser import LayoutParser
+from flatland.flatland_exceptions import MultipleFloatsInSameBranch, LayoutModelMismatch
+from flatland.input.model_parser import ModelParser, Subsystem
+from flatland.input.layout_parser import LayoutParser, DiagramLayout
 from flatland.node_subsystem.canvas import Canvas
+from flatland.xuml.build_cache import BuildCache
 from flatland.sheet_subsystem.frame import Frame
 from flatland.node_subsystem.single_cell_node import SingleCellNode
 from flatland.node_subsystem.spanning_node import SpanningNode
@@ -29,37 +28,79 @@ BranchLeaves = namedtuple('BranchLeaves', 'leaf_stems local_graft next_graft flo
 class XumlClassDiagram:
 
     def __init__(self, xuml_model_path: Path, flatland_layout_path: Path, diagram_file_path: Path,
-                 show_grid: bool, nodes_only: bool, no_color: bool):
-        """Constructor"""
+                 show_grid: bool, nodes_only: bool, no_color: bool, incremental: bool = False,
+                 model_text: Optional[str] = None, layout_text: Optional[str] = None,
+                 output_format: Optional[str] = None):
+        """
+        Constructor
+
+        The model and layout are normally read from their files. If their text is supplied instead,
+        the paths only name them in any error messages. Similarly, the diagram may be written to a binary
+        stream instead of a file, in which case the output format should be specified.
+        """
         self.logger = logging.getLogger(__name__)
         self.xuml_model_path = xuml_model_path
         self.flatland_layout_path = flatland_layout_path
         self.diagram_file_path = diagram_file_path
+        self.model_text = model_text
+        self.layout_text = layout_text
+        self.output_format = output_format
         self.show_grid = show_grid
         self.no_color = no_color
+        self.nodes_only = nodes_only
+        self.skipped = False
+
+        if incremental:
+            # Skip the whole thing if the diagram was already generated from the same inputs
+            from flatland.xuml.render import rendering_options  # The render module imports this one
+            try:
+                self.fingerprint = BuildCache.fingerprint(
+                    model_path=xuml_model_path, layout_path=flatland_layout_path,
+                    options=rendering_options(show_grid=show_grid, nodes_only=nodes_only, no_color=no_color)
+                )
+            except OSError:
+                incremental = False  # Let the parsers report the missing input file
+            if incremental and BuildCache.up_to_date(diagram_path=diagram_file_path, fingerprint=self.fingerprint):
+                self.logger.info(f"Diagram [{diagram_file_path}] is up to date")
+                self.skipped = True
+                return
+
+        self.subsys = self.parse_model()
+        self.layout = self.parse_layout()
+        self.draw(nodes_only)
+        if incremental:
+            BuildCache.record(diagram_path=self.diagram_file_path, fingerprint=self.fingerprint)
+
+    def update(self, model_changed: bool, layout_changed: bool):
+        """
+        Reparse only the input files that changed and draw the diagram again
 
+        :param model_changed: The model file changed
+        :param layout_changed: The layout file changed
+        """
+        if model_changed:
+            self.subsys = self.parse_model()
+        if layout_changed:
+            self.layout = self.parse_layout()
+        self.draw(self.nodes_only)
+
+    def parse_model(self) -> Subsystem:
+        """Parse the class model file"""
         self.logger.info("Parsing the model")
         # Parse the model
-        try:
-            self.model = ModelParser(model_file_path=self.xuml_model_path, debug=False)
-        except FlatlandIOException as e:
-            sys.exit(e)
-        try:
-            self.subsys = self.model.parse()
-        except ModelParseError as e:
-            sys.exit(e)
+        self.model = ModelParser(model_file_path=self.xuml_model_path, debug=False, model_text=self.model_text)
+        return self.model.parse()
 
+    def parse_layout(self) -> DiagramLayout:
+        """Parse the layout file"""
         self.logger.info("Parsing the layout")
         # Parse the layout
-        try:
-            self.layout = LayoutParser(layout_file_path=self.flatland_layout_path, debug=False)
-        except FlatlandIOException as e:
-            sys.exit(e)
-        try:
-            self.layout = self.layout.parse()
-        except LayoutParseError as e:
-            sys.exit(e)
+        layout_parser = LayoutParser(
+            layout_file_path=self.flatland_layout_path, debug=False, layout_text=self.layout_text)
+        return layout_parser.parse()
 
+    def draw(self, nodes_only: bool):
+        """Draw the parsed class model on a new canvas using the parsed layout and render the diagram"""
         # Draw the blank canvas of the appropriate size, diagram type and presentation style
         self.logger.info("Creating the canvas")
         self.flatland_canvas = self.create_canvas()
@@ -112,6 +153,7 @@ class XumlClassDiagram:
             orientation=lspec.orientation,
             diagram_padding=lspec.padding,
             drawoutput=self.diagram_file_path,
+            output_format=self.output_format,
             show_grid=self.show_grid,
             no_color=self.no_color,
             color=lspec.color,
@@ -256,8 +298,7 @@ class XumlClassDiagram:
             pnode = self.nodes[node_ref]
         except KeyError:
             missing_side = "p-stem" if not _reversed else "t-stem"
-            self.logger.error(f"In layout sheet {missing_side} of {rnum} class [{node_ref}] is not defined in model")
-            sys.exit(1)
+            raise LayoutModelMismatch(f"In layout sheet {missing_side} of {rnum} class [{node_ref}] is not defined in model") from None
         p_stem = New_Stem(stem_type='class mult', semantic=p_side['mult'] + ' mult',
                           node=pnode, face=pstem['face'],
                           anchor=pstem.get('anchor', None), stem_name=p_phrase)
@@ -267,17 +308,15 @@ class XumlClassDiagram:
             try:
                 semantic = association['assoc_mult'] + ' mult'
             except KeyError:
-                self.logger.error(
+                raise LayoutModelMismatch(
                     f"Layout sheet calls for ternary stem, but class model does not specify any"
-                    f" association class on association: {rnum}")
-                sys.exit(1)
+                    f" association class on association: {rnum}") from None
             try:
                 node= self.nodes[node_ref]
             except KeyError:
-                self.logger.error(
+                raise LayoutModelMismatch(
                     f"Association class [{node_ref}] is missing in relationship {rnum}"
-                )
-                sys.exit(1)
+                ) from None
             a_stem = New_Stem(stem_type='associative mult', semantic=semantic,
                               node=self.nodes[node_ref], face=astem['face'], anchor=astem.get('anchor', None),
                               stem_name=None)
@@ -341,8 +380,7 @@ class XumlClassDiagram:
             try:
                 node = self.nodes[name]
             except KeyError:
-                self.logger.error(f'Node name [{name}] missing placement in layout file.')
-                sys.exit(1)
+                raise LayoutModelMismatch(f'Node name [{name}] missing placement in layout file.') from None
             lstem = New_Stem(stem_type='subclass', semantic='subclass', node=self.nodes[name],
                              face=lfaces[name]['face'], anchor=anchor, stem_name=None)
             leaf_stems.add(lstem)
@@ -2,20 +2,19 @@
 xuml_statemachine_diagram.py – Generates a state machine diagram for an xuml model using the Flatland draw engine
 """
 
-import sys
 import logging
 from pathlib import Path
-from flatland.flatland_exceptions import FlatlandIOException
-from flatland.flatland_exceptions import LayoutParseError, ModelParseError
-from flatland.input.statemodel_parser import StateModelParser
-from flatland.input.layout_parser import LayoutParser
+from flatland.flatland_exceptions import LayoutModelMismatch
+from flatland.input.statemodel_parser import StateModelParser, StateModel
+from flatland.input.layout_parser import LayoutParser, DiagramLayout
 from flatland.node_subsystem.canvas import Canvas
+from flatland.xuml.build_cache import BuildCache
 from flatland.sheet_subsystem.frame import Frame
 from flatland.node_subsystem.single_cell_node import SingleCellNode
 from flatland.node_subsystem.spanning_node import SpanningNode
 from flatland.datatypes.geometry_types import Alignment, VertAlign, HorizAlign
 from flatland.datatypes.command_interface import New_Stem, New_Path, New_Compartment
-from typing import Dict
+from typing import Dict, Optional
 from flatland.connector_subsystem.unary_connector import UnaryConnector
 from flatland.connector_subsystem.straight_binary_connector import StraightBinaryConnector
 from flatland.connector_subsystem.bending_binary_connector import BendingBinaryConnector
@@ -34,37 +33,79 @@ def make_event_cname(ev_spec) -> str:
 class XumlStateMachineDiagram:
 
     def __init__(self, xuml_model_path: Path, flatland_layout_path: Path, diagram_file_path: Path,
-                 show_grid: bool, nodes_only: bool, no_color: bool):
-        """Constructor"""
+                 show_grid: bool, nodes_only: bool, no_color: bool, incremental: bool = False,
+                 model_text: Optional[str] = None, layout_text: Optional[str] = None,
+                 output_format: Optional[str] = None):
+        """
+        Constructor
+
+        The model and layout are normally read from their files. If their text is supplied instead,
+        the paths only name them in any error messages. Similarly, the diagram may be written to a binary
+        stream instead of a file, in which case the output format should be specified.
+        """
         self.logger = logging.getLogger(__name__)
         self.xuml_model_path = xuml_model_path
         self.flatland_layout_path = flatland_layout_path
         self.diagram_file_path = diagram_file_path
+        self.model_text = model_text
+        self.layout_text = layout_text
+        self.output_format = output_format
         self.show_grid = show_grid
         self.no_color = no_color
+        self.nodes_only = nodes_only
+        self.skipped = False
+
+        if incremental:
+            # Skip the whole thing if the diagram was already generated from the same inputs
+            from flatland.xuml.render import rendering_options  # The render module imports this one
+            try:
+                self.fingerprint = BuildCache.fingerprint(
+                    model_path=xuml_model_path, layout_path=flatland_layout_path,
+                    options=rendering_options(show_grid=show_grid, nodes_only=nodes_only, no_color=no_color)
+                )
+            except OSError:
+                incremental = False  # Let the parsers report the missing input file
+            if incremental and BuildCache.up_to_date(diagram_path=diagram_file_path, fingerprint=self.fingerprint):
+                self.logger.info(f"Diagram [{diagram_file_path}] is up to date")
+                self.skipped = True
+                return
+
+        self.statemodel = self.parse_model()
+        self.layout = self.parse_layout()
+        self.draw(nodes_only)
+        if incremental:
+            BuildCache.record(diagram_path=self.diagram_file_path, fingerprint=self.fingerprint)
+
+    def update(self, model_changed: bool, layout_changed: bool):
+        """
+        Reparse only the input files that changed and draw the diagram again
+
+        :param model_changed: The model file changed
+        :param layout_changed: The layout file changed
+        """
+        if model_changed:
+            self.statemodel = self.parse_model()
+        if layout_changed:
+            self.layout = self.parse_layout()
+        self.draw(self.nodes_only)
 
+    def parse_model(self) -> StateModel:
+        """Parse the state model file"""
         self.logger.info("Parsing the model")
         # Parse the model
-        try:
-            self.model = StateModelParser(model_file_path=self.xuml_model_path, debug=False)
-        except FlatlandIOException as e:
-            sys.exit(e)
-        try:
-            self.statemodel = self.model.parse()
-        except ModelParseError as e:
-            sys.exit(e)
+        self.model = StateModelParser(model_file_path=self.xuml_model_path, debug=False, model_text=self.model_text)
+        return self.model.parse()
 
+    def parse_layout(self) -> DiagramLayout:
+        """Parse the layout file"""
         self.logger.info("Parsing the layout")
         # Parse the layout
-        try:
-            self.layout = LayoutParser(layout_file_path=self.flatland_layout_path, debug=False)
-        except FlatlandIOException as e:
-            sys.exit(e)
-        try:
-            self.layout = self.layout.parse()
-        except LayoutParseError as e:
-            sys.exit(e)
+        layout_parser = LayoutParser(
+            layout_file_path=self.flatland_layout_path, debug=False, layout_text=self.layout_text)
+        return layout_parser.parse()
 
+    def draw(self, nodes_only: bool):
+        """Draw the parsed state model on a new canvas using the parsed layout and render the diagram"""
         # Draw the blank canvas of the appropriate size, diagram type and presentation style
         self.logger.info("Creating the canvas")
         self.flatland_canvas = self.create_canvas()
@@ -121,18 +162,16 @@ class XumlStateMachineDiagram:
                             except KeyError:
                                 # An event is being referenced in some state of the model file that does not correspond
                                 # to any event defined in the event specification list near the top of the file
-                                self.logger.error(
+                                raise LayoutModelMismatch(
                                     f'Undefined event [{evname}] used on transition from state [{s.name}]. '
                                     f'Check event list in model file.'
-                                )
-                                sys.exit(1)
+                                ) from None
                             try:
                                 # Note the and condition to ensure that there is, in fact, a connector name
                                 # before comparing. Initial transitions may not have an associated event
                                 t_place = [tp for tp in state_place if tp.get('cname') and tp['cname'] == evname][0]
                             except IndexError:
-                                self.logger.error(f'Model event [{cname}] does not name any connector in layout.')
-                                sys.exit(1)
+                                raise LayoutModelMismatch(f'Model event [{cname}] does not name any connector in layout.') from None
                             if t_place:
                                 self.draw_transition(cname, t_place)
 
@@ -164,8 +203,7 @@ class XumlStateMachineDiagram:
             evname_data = None if not creation_event else ConnectorName(
                 text=creation_event, side=cplace['dir'], bend=cplace['bend'], notch=cplace['notch'], wrap=cplace['wrap'])
         except KeyError:
-            self.logger.error(f'No placement defined for creation event [{creation_event}] entering state [{node_ref}]')
-            sys.exit(1)
+            raise LayoutModelMismatch(f'No placement defined for creation event [{creation_event}] entering state [{node_ref}]') from None
         UnaryConnector(
             self.flatland_canvas.Diagram,
             connector_type_name='initial transition',
@@ -185,8 +223,7 @@ class XumlStateMachineDiagram:
         try:
             node = self.nodes[node_ref]
         except KeyError:
-            self.logger.error(f'Transition connector [{evname}] refers to undeclared state node [{node_ref}]')
-            sys.exit(1)
+            raise LayoutModelMismatch(f'Transition connector [{evname}] refers to undeclared state node [{node_ref}]') from None
         p_stem = New_Stem(stem_type='to state', semantic='target state',
                           node=node, face=pstem['face'],
                           anchor=pstem.get('anchor', None), stem_name=None)
@@ -224,6 +261,7 @@ class XumlStateMachineDiagram:
             orientation=lspec.orientation,
             diagram_padding=lspec.padding,
             drawoutput=self.diagram_file_path,
+            output_format=self.output_format,
             show_grid=self.show_grid,
             no_color=self.no_color,
             color=lspec.color,
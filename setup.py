@@ -26,6 +26,7 @@ setuptools.setup(
     ],
     packages=setuptools.find_packages(),
     include_package_data=True,
-    install_requires=["pathlib", "SQLAlchemy", "pycairo", "Arpeggio", "numpy", "PyYAML"],
+    install_requires=["pathlib", "SQLAlchemy", "pycairo", "Arpeggio", "PyYAML"],
+    extras_require={"numpy": ["numpy"]},  # Optional, speeds up rotating large batches of symbols
     entry_points={"console_scripts": ["flatland=flatland.__main__:main"]},
 )
\ No newline at end of file